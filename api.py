@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import re
+import threading
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+from config import (
+    API_HOST, API_PORT, API_WORKERS,
+    QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL, DATA_VERSION_CHECK_INTERVAL,
+    API_METRICS_FILE, METRICS_FLUSH_INTERVAL
+)
+from backends import create_backend, BACKEND_ERRORS
+from metrics import Metrics
+from query_cache import QueryCache
+from scheduler import QueryScheduler
+from queries import (
+    KEY_METRICS_QUERY, DASHBOARD_QUERIES, TRANSACTION_QUERIES, USER_QUERIES,
+    GEO_ANALYSIS_TYPES, GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER,
+    geo_query, top_n_query, CASE_STUDIES
+)
+
+def slug(name):
+    """URL form of a query or case-study name, e.g. "Top 10 States" becomes top-10-states"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+# Page queries by slug, e.g. /api/queries/transaction-analysis/top-10-states-by-transaction-volume
+PAGE_QUERIES = {
+    slug(page): {slug(name): (name, query) for name, query in queries.items()}
+    for page, queries in [
+        ("Dashboard", DASHBOARD_QUERIES),
+        ("Transaction Analysis", TRANSACTION_QUERIES),
+        ("User Analysis", USER_QUERIES),
+    ]
+}
+GEO_METRIC_SLUGS = {slug(analysis_type): analysis_type for analysis_type in GEO_ANALYSIS_TYPES}
+CASE_STUDY_SLUGS = {
+    slug(case): (case, {slug(name): name for name in case_info["queries"]})
+    for case, case_info in CASE_STUDIES.items()
+}
+
+class AnalyticsService:
+    """Runs dashboard queries for the API through the same result cache, pool and metrics as the UI.
+
+    Blocking backend calls go to a thread pool; identical requests in flight
+    share one query through the scheduler's per-key futures.
+    """
+
+    def __init__(self, backend, cache, metrics, max_workers=API_WORKERS):
+        self.backend = backend
+        self.cache = cache
+        self.metrics = metrics
+        self.scheduler = QueryScheduler(max_workers=max_workers)
+
+    def _load(self, query, params):
+        return self.cache.get_or_load(
+            query, params,
+            lambda: self.metrics.measure_query(query, lambda: self.backend.read_frame(query, params)),
+            version_fn=self.backend.data_version,
+            namespace="frame"
+        )
+
+    async def records(self, query, params=None):
+        """Result rows as JSON text (an array of objects)"""
+        key = self.cache.make_key(query, params, "frame")
+        while True:
+            future = self.scheduler.submit(key, lambda: self._load(query, params), group="api")
+            try:
+                # Shielded so a disconnecting client doesn't cancel a query other requests share
+                df = await asyncio.shield(asyncio.wrap_future(future))
+                break
+            except asyncio.CancelledError:
+                # Another caller cancelled the shared future: submit afresh; our own cancellation propagates
+                if not future.cancelled():
+                    raise
+        return df.to_json(orient="records", date_format="iso")
+
+    def stats(self):
+        return {"cache": self.cache.stats(), "scheduler": self.scheduler.stats(), "pool": self.backend.stats()}
+
+def _json(data, status=200):
+    return web.Response(text=data if isinstance(data, str) else json.dumps(data, default=str),
+                        status=status, content_type="application/json")
+
+def _int(request, name, default=None):
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=json.dumps({"error": f"{name} must be an integer"}),
+                                 content_type="application/json")
+
+async def _respond(request, query, params=None):
+    try:
+        return _json(await request.app["service"].records(query, params))
+    except BACKEND_ERRORS as e:
+        return _json({"error": f"Error executing query: {e}"}, status=502)
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error serving {request.path}: {type(e).__name__}: {e}")
+        return _json({"error": f"Internal error: {type(e).__name__}"}, status=500)
+
+async def health(request):
+    return _json({"status": "ok"})
+
+async def stats(request):
+    return _json(request.app["service"].stats())
+
+async def key_metrics(request):
+    return await _respond(request, KEY_METRICS_QUERY)
+
+async def list_queries(request):
+    return _json({
+        "pages": {page: list(queries) for page, queries in PAGE_QUERIES.items()},
+        "case_studies": {case: list(names) for case, (_, names) in CASE_STUDY_SLUGS.items()},
+        "geo_metrics": list(GEO_METRIC_SLUGS),
+    })
+
+async def page_query(request):
+    entry = PAGE_QUERIES.get(request.match_info["page"], {}).get(request.match_info["name"])
+    if entry is None:
+        return _json({"error": "Unknown query"}, status=404)
+    return await _respond(request, entry[1])
+
+async def top_n(request):
+    try:
+        query, params = top_n_query(
+            request.match_info["level"], request.query.get("metric", "transactions"),
+            _int(request, "n", 10), _int(request, "year"), _int(request, "quarter")
+        )
+    except ValueError as e:
+        return _json({"error": str(e)}, status=400)
+    return await _respond(request, query, params)
+
+async def geo(request):
+    analysis_type = GEO_METRIC_SLUGS.get(request.match_info["metric"])
+    if analysis_type is None:
+        return _json({"error": "Unknown metric"}, status=404)
+    query, params = geo_query(analysis_type, _int(request, "year", GEO_DEFAULT_YEAR),
+                              _int(request, "quarter", GEO_DEFAULT_QUARTER))
+    return await _respond(request, query, params)
+
+async def case_study(request):
+    case, names = CASE_STUDY_SLUGS.get(request.match_info["case"], (None, {}))
+    name = names.get(request.match_info["name"])
+    if name is None:
+        return _json({"error": "Unknown case study query"}, status=404)
+    return await _respond(request, CASE_STUDIES[case]["queries"][name]["query"])
+
+def create_app(service):
+    if web is None:
+        raise RuntimeError("The JSON API requires the 'aiohttp' package")
+    app = web.Application()
+    app["service"] = service
+    app.add_routes([
+        web.get("/api/health", health),
+        web.get("/api/stats", stats),
+        web.get("/api/key-metrics", key_metrics),
+        web.get("/api/queries", list_queries),
+        web.get("/api/queries/{page}/{name}", page_query),
+        web.get("/api/top/{level}", top_n),
+        web.get("/api/geo/{metric}", geo),
+        web.get("/api/case-studies/{case}/{name}", case_study),
+    ])
+    return app
+
+def start_in_thread(service, host=API_HOST, port=API_PORT):
+    """Serve the API from a daemon thread with its own event loop, e.g. inside the Streamlit process"""
+    app = create_app(service)
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app)
+        try:
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, port).start())
+        except OSError as e:
+            print(f"Error starting API server on {host}:{port}: {e}")
+            return
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="api", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    """Serve the analytics API on its own: `python api.py --port 8600`"""
+    parser = argparse.ArgumentParser(description="JSON API over the PhonePe dashboard queries")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    try:
+        backend = create_backend()
+        cache = QueryCache(max_bytes=QUERY_CACHE_MAX_BYTES, ttl=QUERY_CACHE_TTL,
+                           version_check_interval=DATA_VERSION_CHECK_INTERVAL)
+        service = AnalyticsService(backend, cache, Metrics(path=API_METRICS_FILE, flush_interval=METRICS_FLUSH_INTERVAL))
+        app = create_app(service)
+    except (RuntimeError, ValueError) + BACKEND_ERRORS as e:
+        print(f"Error starting the API: {e}")
+        return
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
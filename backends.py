@@ -0,0 +1,182 @@
+import os
+import re
+import threading
+
+from mysql.connector import Error
+
+from config import (
+    DB_HOST, DB_NAME, DB_USER, DB_PASS,
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_PING_INTERVAL, DB_POOL_MAX_PREPARED,
+    ANALYTICS_BACKEND, PARQUET_DIR, DUCKDB_THREADS
+)
+from db_pool import ConnectionPool
+from columnar import fetch_dataframe
+from query_cache import read_data_version
+from metrics import phase
+from rollup import ROLLUPS, ensure_rollups, rollup_select_sql
+from materialize import MATERIALIZED, build_order, refresh_materialized
+from topk import TOPK_TABLE, ensure_topk, topk_view_sql
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Base tables the dashboard reads; the DuckDB backend expects one <table>.parquet each
+FACT_TABLES = [
+    "aggregated_transaction", "aggregated_insurance", "aggregated_user",
+    "map_transaction", "map_insurance", "map_user",
+    "top_transaction", "top_insurance", "top_user",
+]
+
+# Exceptions any backend may raise for a failed query
+BACKEND_ERRORS = (Error,) + ((duckdb.Error,) if duckdb is not None else ())
+
+class MySQLBackend:
+    """Runs queries on the MySQL server through the connection pool"""
+
+    name = "mysql"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def prepare(self):
+        self.pool.run(ensure_rollups)
+        self.pool.run(ensure_topk)
+        # Builds missing materialized tables and catches up on loads made while the app was down
+        self.pool.run(refresh_materialized)
+
+    def _query(self, query, params, read):
+        def fetch(conn):
+            if params is None:
+                cursor, statement = conn.cursor(), query
+            else:
+                # Bound parameters go through a server-side statement prepared once per connection
+                cursor, statement = self.pool.prepared(conn, query)
+            try:
+                with phase("db"):
+                    cursor.execute(statement, params)
+                with phase("fetch"):
+                    return read(cursor)
+            except Error:
+                if params is not None:
+                    self.pool.drop_prepared(conn, query)
+                raise
+            finally:
+                if params is None:
+                    cursor.close()
+        return self.pool.run(fetch)
+
+    def fetch_rows(self, query, params=None):
+        def read(cursor):
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+        return self._query(query, params, read)
+
+    def read_frame(self, query, params=None):
+        return self._query(query, params, fetch_dataframe)
+
+    def data_version(self):
+        return self.pool.run(read_data_version)
+
+    def stats(self):
+        return self.pool.stats()
+
+class DuckDBBackend:
+    """Runs the same SQL in-process with DuckDB over the Parquet files written by etl.py.
+
+    The fact tables are exposed as views over the Parquet files, and the rollup
+    and materialized tables as views over them, so page queries need no changes.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, parquet_dir, threads=None):
+        if duckdb is None:
+            raise RuntimeError("The duckdb backend requires the 'duckdb' package")
+        self.parquet_dir = parquet_dir
+        self._conn = duckdb.connect(database=":memory:")
+        if threads:
+            self._conn.execute(f"SET threads TO {int(threads)}")
+        self._local = threading.local()
+
+    def _parquet_path(self, table):
+        return os.path.join(self.parquet_dir, f"{table}.parquet")
+
+    def prepare(self):
+        for table in FACT_TABLES:
+            path = self._parquet_path(table)
+            if os.path.exists(path):
+                self._conn.execute(
+                    f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{path.replace(chr(39), chr(39) * 2)}')"
+                )
+        for name, spec in ROLLUPS.items():
+            if os.path.exists(self._parquet_path(spec["source"])):
+                self._conn.execute(f"CREATE OR REPLACE VIEW {name} AS {rollup_select_sql(spec)}")
+        available = [name for name, spec in ROLLUPS.items() if os.path.exists(self._parquet_path(spec["source"]))]
+        if available:
+            self._conn.execute(f"CREATE OR REPLACE VIEW {TOPK_TABLE} AS {topk_view_sql(available)}")
+        # Materialized case-study tables stay plain views here; DuckDB scans the Parquet files fast enough
+        created = set()
+        for name in build_order():
+            inputs = MATERIALIZED[name]["inputs"]
+            if all(table in created or os.path.exists(self._parquet_path(table)) for table in inputs):
+                self._conn.execute(f"CREATE OR REPLACE VIEW {name} AS {MATERIALIZED[name]['sql']}")
+                created.add(name)
+
+    def _cursor(self):
+        # DuckDB connections are not thread-safe; each thread gets its own cursor on the shared database
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._conn.cursor()
+        return cursor
+
+    @staticmethod
+    def _translate(query, params):
+        # MySQL-style %s placeholders become DuckDB's ?
+        if params is None:
+            return query
+        return re.sub(r"%s", "?", query)
+
+    def read_frame(self, query, params=None):
+        cursor = self._cursor()
+        with phase("db"):
+            result = cursor.execute(self._translate(query, params), params)
+        with phase("fetch"):
+            return result.df()
+
+    def fetch_rows(self, query, params=None):
+        return self.read_frame(query, params).to_dict("records")
+
+    def data_version(self):
+        # Rewriting the Parquet files is the load, so their mtimes are the version marker
+        mtimes = [
+            os.stat(self._parquet_path(table)).st_mtime_ns
+            for table in FACT_TABLES
+            if os.path.exists(self._parquet_path(table))
+        ]
+        return max(mtimes) if mtimes else 0
+
+    def stats(self):
+        return None
+
+def create_backend(name=ANALYTICS_BACKEND):
+    """Build the analytics backend selected in config.py"""
+    if name == "duckdb":
+        backend = DuckDBBackend(PARQUET_DIR, threads=DUCKDB_THREADS)
+    elif name == "mysql":
+        pool = ConnectionPool(
+            size=DB_POOL_SIZE,
+            timeout=DB_POOL_TIMEOUT,
+            ping_interval=DB_POOL_PING_INTERVAL,
+            max_prepared=DB_POOL_MAX_PREPARED,
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME
+        )
+        backend = MySQLBackend(pool)
+    else:
+        raise ValueError(f"Unknown analytics backend: {name}")
+    backend.prepare()
+    return backend
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backends import DuckDBBackend, BACKEND_ERRORS
+from queries import GEO_YEARS, GEO_QUARTERS, registered_queries
+from tables import TABLES
+
+# Row counts of the real Pulse extract (Phone_pay.ipynb import log); scale 1 matches them
+REAL_ROW_COUNTS = {
+    "aggregated_transaction": 5034,
+    "aggregated_insurance": 682,
+    "aggregated_user": 6732,
+    "map_user": 20608,
+    "map_transaction": 20604,
+    "map_insurance": 13876,
+}
+
+TRANSACTION_TYPES = ["Merchant payments", "Peer-to-peer payments", "Recharge & bill payments", "Financial Services", "Others"]
+BRANDS = ["Xiaomi", "Samsung", "Vivo", "Oppo", "Realme", "Apple", "Motorola", "OnePlus", "Huawei", "Lenovo", "Others"]
+DISTRICTS_PER_STATE = 21
+
+# The column each table varies within a state and period, and its values
+CATEGORY_COLUMNS = {
+    "aggregated_transaction": ("transaction_type", TRANSACTION_TYPES),
+    "aggregated_insurance": ("type", ["TOTAL"]),
+    "aggregated_user": ("brand", BRANDS),
+    "map_user": ("district", None),
+    "map_transaction": ("district", None),
+    "map_insurance": ("district", None),
+}
+
+BENCH_SCALES = [1, 10, 100]
+BENCH_REPEAT = 5
+
+def _measure(rng, col_type, n):
+    if col_type == "BIGINT":
+        return rng.integers(1, 10 ** 7, size=n, dtype=np.int64)
+    if col_type == "FLOAT":
+        return rng.random(n)
+    return rng.lognormal(mean=18, sigma=2, size=n)
+
+def synthetic_table(table, scale, rng):
+    """A DataFrame with the table's schema and scale x its real row count.
+
+    Keys are laid out as state x (year, quarter) x category, so extra rows come
+    from extra synthetic states over the dashboard's period range, and the
+    natural key stays unique at every scale.
+    """
+    n_rows = REAL_ROW_COUNTS[table] * scale
+    category_col, categories = CATEGORY_COLUMNS[table]
+    periods = [(year, quarter) for year in GEO_YEARS for quarter in GEO_QUARTERS]
+    n_categories = len(categories) if categories else DISTRICTS_PER_STATE
+
+    index = np.arange(n_rows)
+    state_index = index // (len(periods) * n_categories)
+    period_index = (index // n_categories) % len(periods)
+    category_index = index % n_categories
+
+    states = np.array([f"State {i:04d}" for i in range(state_index.max() + 1)], dtype=object)
+    data = {
+        "state": states[state_index],
+        "year": np.array([year for year, _ in periods], dtype=np.int64)[period_index],
+        "quarter": np.array([quarter for _, quarter in periods], dtype=np.int64)[period_index],
+    }
+    if categories:
+        data[category_col] = np.array(categories, dtype=object)[category_index]
+    else:
+        data[category_col] = np.char.add(
+            np.char.add(data["state"].astype(str), " District "), category_index.astype(str)
+        ).astype(object)
+    for col, col_type in TABLES[table]["columns"].items():
+        if col not in data:
+            data[col] = _measure(rng, col_type, n_rows)
+
+    df = pd.DataFrame(data, columns=list(TABLES[table]["columns"]))
+    for col in ["state", category_col]:
+        df[col] = df[col].astype("category")
+    return df
+
+def generate_dataset(data_dir, scale, seed=0):
+    """Write synthetic <table>.parquet files for every benchmarked table"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    counts = {}
+    for table in REAL_ROW_COUNTS:
+        df = synthetic_table(table, scale, rng)
+        df.to_parquet(os.path.join(data_dir, f"{table}.parquet"), index=False)
+        counts[table] = len(df)
+    return counts
+
+def benchmark_query(backend, sql, params=None, repeat=BENCH_REPEAT):
+    """Run a query once to warm up, then `repeat` timed runs; latency in milliseconds"""
+    df = backend.read_frame(sql, params)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = backend.read_frame(sql, params)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "rows": len(df),
+        "bytes": int(df.memory_usage(deep=True).sum()),
+    }
+
+def run_benchmarks(data_dir, scale, repeat=BENCH_REPEAT, seed=0):
+    """Generate data at one scale and benchmark every registered query against it"""
+    counts = generate_dataset(data_dir, scale, seed)
+    backend = DuckDBBackend(data_dir)
+    backend.prepare()
+    results = {}
+    for name, sql, params in registered_queries():
+        try:
+            results[name] = benchmark_query(backend, sql, params, repeat)
+        except BACKEND_ERRORS as e:
+            results[name] = {"error": str(e)}
+    return {"scale": scale, "row_counts": counts, "queries": results}
+
+def print_report(run):
+    total_rows = sum(run["row_counts"].values())
+    print(f"\nScale {run['scale']}x ({total_rows:,} source rows)")
+    print(f"{'query':<90} {'p50 ms':>9} {'p95 ms':>9} {'rows':>9} {'bytes':>12}")
+    for name, result in run["queries"].items():
+        if "error" in result:
+            print(f"{name[:90]:<90} error: {result['error']}")
+        else:
+            print(f"{name[:90]:<90} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['rows']:>9,} {result['bytes']:>12,}")
+
+def compare(runs, baseline, tolerance):
+    """Queries whose p95 exceeds the baseline's by more than the tolerance factor"""
+    regressions = []
+    previous = {run["scale"]: run for run in baseline}
+    for run in runs:
+        before = previous.get(run["scale"], {}).get("queries", {})
+        for name, result in run["queries"].items():
+            old = before.get(name)
+            if "error" in result and old and "error" not in old:
+                regressions.append(f"{run['scale']}x {name}: now fails ({result['error']})")
+            elif old and "error" not in old and "error" not in result \
+                    and result["p95_ms"] > old["p95_ms"] * tolerance:
+                regressions.append(f"{run['scale']}x {name}: p95 {old['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+    return regressions
+
+def main():
+    """Benchmark the dashboard SQL on synthetic data, e.g. `python bench.py --scale 1 --scale 10 --output bench.json`"""
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard queries on synthetic Pulse data with DuckDB")
+    parser.add_argument("--scale", type=int, action="append", help="Row-count multiplier (default: 1, 10 and 100)")
+    parser.add_argument("--repeat", type=int, default=BENCH_REPEAT, help="Timed runs per query")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", help="Keep the generated Parquet files here instead of a temporary directory")
+    parser.add_argument("--output", help="Write the results as JSON, e.g. to use as a later baseline")
+    parser.add_argument("--baseline", help="JSON results of an earlier run; exit 1 on p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed p95 slowdown factor against the baseline")
+    args = parser.parse_args()
+
+    runs = []
+    for scale in args.scale or BENCH_SCALES:
+        if args.data_dir:
+            run = run_benchmarks(os.path.join(args.data_dir, f"scale_{scale}"), scale, args.repeat, args.seed)
+        else:
+            with tempfile.TemporaryDirectory() as data_dir:
+                run = run_benchmarks(data_dir, scale, args.repeat, args.seed)
+        print_report(run)
+        runs.append(run)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(runs, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regression(s) found." if regressions else "No regressions against the baseline.")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
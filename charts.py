@@ -0,0 +1,370 @@
+import hashlib
+import json
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from config import CHART_LOD_MAX_POINTS, CHART_LOD_BINS, CHART_WEBGL_POINTS
+from geo import state_boundaries, feature_id_key
+from lod import zoom_frame, reduce_points
+
+# viz_type -> (build function, render at container width, level-of-detail scatter)
+RENDERERS = {}
+
+def renderer(viz_type, container_width=False, lod=False):
+    """Register a figure builder for a case-study viz_type.
+
+    lod renderers draw one marker per row: dense results are decimated before
+    they reach the builder, which gets params["render_mode"] to pass on to px.
+    """
+    def register(fn):
+        RENDERERS[viz_type] = (fn, container_width, lod)
+        return fn
+    return register
+
+def _title(col):
+    return col.replace('_', ' ').title()
+
+@renderer("choropleth")
+def choropleth(df, params):
+    if "state" not in df.columns:
+        return None
+    return px.choropleth_mapbox(
+        df,
+        geojson=state_boundaries(zoom=3),
+        locations='state',
+        featureidkey=feature_id_key("states"),
+        color=params["color_col"],
+        color_continuous_scale="Viridis",
+        mapbox_style="carto-positron",
+        zoom=3, center={"lat": 20.5937, "lon": 78.9629},
+        opacity=0.7,
+        title=params["title"]
+    )
+
+@renderer("bar")
+def bar(df, params):
+    return px.bar(df, x=params["x_col"], y=params["y_col"], title=params["title"])
+
+@renderer("advanced_bubble", lod=True)
+def advanced_bubble(df, params):
+    # Animated bubble chart with facets
+    fig = px.scatter(
+        df,
+        x=params["x_col"],
+        y=params["y_col"],
+        size=params["size_col"],
+        color=params["color_col"],
+        hover_name=params["hover_name"],
+        animation_frame=params.get("animation_col"),
+        animation_group=params.get("animation_group"),
+        facet_col=params.get("facet_col"),
+        render_mode=params.get("render_mode", "auto"),
+        size_max=60,
+        title=params["title"],
+        labels={col: _title(col) for col in [params["x_col"], params["y_col"], params["size_col"], params["color_col"]]},
+        color_discrete_map={
+            'Highly Engaged': '#1a9850',     # Green
+            'Moderately Engaged': '#91cf60', # Light green
+            'Slightly Engaged': '#fee08b',   # Light yellow
+            'Not Engaged': '#d73027'         # Red
+        },
+        height=600
+    )
+
+    # engagement_level travels in customdata for the hover text
+    fig.update_traces(
+        customdata=df[["top_brand", "top_brand_percentage", "policies_per_1000_users", params["color_col"]]],
+        hovertemplate=(
+            "<b>%{hovertext}</b><br><br>" +
+            "Transactions per User: %{x:.2f}<br>" +
+            "Total Registrations: %{y:,.0f}<br>" +
+            "Transaction Amount: ₹%{marker.size:,.0f}<br>" +
+            "Engagement: %{customdata[3]}<br><br>" +
+            "<extra></extra>"
+        )
+    )
+
+    # Reference quadrant lines and labels
+    x, y = df[params["x_col"]], df[params["y_col"]]
+    x_max, y_max = x.max(), y.max()
+    fig.add_shape(type="line", x0=x.median(), y0=0, x1=x.median(), y1=y_max * 1.05,
+                  line=dict(color="gray", width=1, dash="dash"))
+    fig.add_shape(type="line", x0=0, y0=y.median(), x1=x_max * 1.05, y1=y.median(),
+                  line=dict(color="gray", width=1, dash="dash"))
+    fig.update_layout(
+        annotations=[
+            dict(x=x_max * x_pos, y=y_max * y_pos, text=text, showarrow=False, font=dict(size=10, color="gray"))
+            for x_pos, y_pos, text in [
+                (0.25, 0.85, "High Registration<br>Low Engagement"),
+                (0.75, 0.85, "High Registration<br>High Engagement"),
+                (0.25, 0.15, "Low Registration<br>Low Engagement"),
+                (0.75, 0.15, "Low Registration<br>High Engagement"),
+            ]
+        ],
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    return fig
+
+@renderer("combo_bar_line")
+def combo_bar_line(df, params):
+    # Bars on the primary y-axis, line on the secondary one
+    bar_title = params.get("y_title_bar", params["y_col_bar"])
+    line_title = params.get("y_title_line", params["y_col_line"])
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(
+        go.Bar(x=df[params["x_col"]], y=df[params["y_col_bar"]], name=bar_title, marker_color='rgb(55, 83, 109)'),
+        secondary_y=False
+    )
+    fig.add_trace(
+        go.Scatter(x=df[params["x_col"]], y=df[params["y_col_line"]], name=line_title,
+                   marker_color='rgb(200, 50, 50)', mode='lines+markers'),
+        secondary_y=True
+    )
+
+    # Tooltip columns are attached once, with one hover line per column present
+    if "tooltip_cols" in params:
+        hovertemplate = "<b>%{x}</b><br><br>" + f"{bar_title}: %{{y:,.0f}}<br>"
+        present = [col for col in params["tooltip_cols"] if col in df.columns]
+        for col in present:
+            idx = params["tooltip_cols"].index(col)
+            hovertemplate += f"{_title(col)}: %{{customdata[{idx}]:,.0f}}<br>"
+        hovertemplate += "<extra></extra>"
+        bar_update = {"hovertemplate": hovertemplate}
+        if present:
+            bar_update["customdata"] = df[params["tooltip_cols"]]
+        fig.update_traces(selector=dict(type='bar'), **bar_update)
+
+    fig.update_layout(
+        title_text=params["title"],
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=60, b=20),
+        xaxis=dict(
+            title=_title(params["x_col"]),
+            categoryorder='total descending'  # Sorts by bar height
+        )
+    )
+    fig.update_yaxes(title_text=bar_title, secondary_y=False)
+    fig.update_yaxes(title_text=line_title, secondary_y=True)
+    return fig
+
+@renderer("dual_axis", container_width=True)
+def dual_axis(df, params):
+    # Count on the primary y-axis, value on the secondary one
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df[params["x_col"]],
+        y=df[params["y_col1"]],
+        name=_title(params["y_col1"]),
+        mode='lines+markers',
+        line=dict(color='#1f77b4', width=3),
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=df[params["x_col"]],
+        y=df[params["y_col2"]],
+        name=_title(params["y_col2"]),
+        mode='lines+markers',
+        line=dict(color='#ff7f0e', width=3),
+        marker=dict(size=8),
+        yaxis="y2"
+    ))
+    fig.update_layout(
+        title=params["title"],
+        xaxis_title=_title(params["x_col"]),
+        yaxis=dict(
+            title=params.get("y_title1", _title(params["y_col1"])),
+            side="left",
+            showgrid=True
+        ),
+        yaxis2=dict(
+            title=params.get("y_title2", _title(params["y_col2"])),
+            side="right",
+            showgrid=False,
+            overlaying="y"
+        ),
+        legend=dict(x=0.01, y=0.99, bordercolor="Black", borderwidth=1),
+        hovermode="x unified",
+        template="plotly_white"
+    )
+    # Range slider on a categorical x-axis
+    fig.update_layout(xaxis=dict(rangeslider=dict(visible=True), type="category"))
+    return fig
+
+@renderer("scatter_categories", lod=True)
+def scatter_categories(df, params):
+    # Scatter plot colored by growth category
+    fig = px.scatter(
+        df,
+        x=params["x_col"],
+        y=params["y_col"],
+        color=params["color_col"],
+        size=params.get("size_col"),
+        hover_name=params.get("hover_name"),
+        facet_col=params.get("facet_col"),
+        render_mode=params.get("render_mode", "auto"),
+        title=params["title"],
+        labels={col: _title(col) for col in [params["x_col"], params["y_col"], params["color_col"]]},
+        color_discrete_map={
+            'High Growth': '#1a9850',     # Green
+            'Moderate Growth': '#91cf60', # Light green
+            'Low Growth': '#d9ef8b',      # Yellow-green
+            'Stagnant': '#fee08b',        # Light yellow
+            'Declining': '#d73027'        # Red
+        },
+        category_orders={
+            "growth_category": ["High Growth", "Moderate Growth", "Low Growth", "Stagnant", "Declining"]
+        }
+    )
+    # Reference line at 0% growth
+    fig.add_shape(
+        type="line",
+        x0=0, y0=0,
+        x1=0, y1=1,
+        xref="x", yref="paper",
+        line=dict(color="black", width=1, dash="dash")
+    )
+    fig.update_layout(
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br><br>" +
+                      "Growth: %{x:.2f}%<br>" +
+                      "Current Users: %{y:,.0f}<br>" +
+                      "Absolute Growth: %{marker.size:,.0f}<br>" +
+                      "<extra></extra>"
+    )
+    return fig
+
+@renderer("group_bar_1")
+def group_bar_1(df, params):
+    return px.bar(df, x=params["x_col"], y=params["y_col"], color=params["color"], barmode="group", title=params["title"])
+
+@renderer("group_bar")
+def group_bar(df, params):
+    if not ("y_cols" in params and isinstance(params["y_cols"], list)):
+        # Standard grouped bar chart with a single y column and a color column
+        return px.bar(df, x=params["x_col"], y=params["y_col"], color=params.get("color"),
+                      title=params["title"], barmode="group")
+
+    # Several y columns (like registered_users and app_opens) side by side per state
+    df_melted = pd.melt(
+        df,
+        id_vars=["state", "gap"] if "gap" in df.columns else ["state"],
+        value_vars=params["y_cols"],
+        var_name="metric",
+        value_name="value"
+    )
+    fig = px.bar(
+        df_melted,
+        x="state",
+        y="value",
+        color="metric",
+        barmode="group",
+        title=params["title"],
+        labels={"value": "Count", "state": "State", "metric": params.get("color_name", "Metric")}
+    )
+    # If gap exists, sort by it
+    if "gap" in df.columns:
+        fig.update_layout(xaxis={'categoryorder': 'array', 'categoryarray': df.sort_values("gap", ascending=False)["state"]})
+    return fig
+
+@renderer("dual_axis_horizontal_bar")
+def dual_axis_horizontal_bar(df, params):
+    # Two horizontal bar traces over the same categories, on bottom and top x-axes
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=df[params["y_col"]],
+        x=df[params["x_col1"]],
+        name=params["x_title1"],
+        orientation='h',
+        marker=dict(color='blue')
+    ))
+    fig.add_trace(go.Bar(
+        y=df[params["y_col"]],
+        x=df[params["x_col2"]],
+        name=params["x_title2"],
+        orientation='h',
+        marker=dict(color='red'),
+        xaxis='x2'
+    ))
+    fig.update_layout(
+        title=params["title"],
+        xaxis=dict(title=params["x_title1"], side="bottom", anchor="y"),
+        xaxis2=dict(title=params["x_title2"], side="top", anchor="y", overlaying="x"),
+        barmode='group',
+        legend=dict(orientation="h", y=1.1)
+    )
+    return fig
+
+@renderer("lineplot")
+def lineplot(df, params):
+    return px.line(df, x=params["x_col"], y=params["y_col"], color=params.get("color"), title=params["title"])
+
+@renderer("pie")
+def pie(df, params):
+    return px.pie(df, values=params["values"], names=params["names"], title=params["title"])
+
+@renderer("scatter", lod=True)
+def scatter(df, params):
+    return px.scatter(df, x=params["x_col"], y=params["y_col"], color=params.get("color"),
+                      size=params.get("size"), render_mode=params.get("render_mode", "auto"),
+                      title=params["title"])
+
+def fingerprint(df):
+    """Content hash of a result frame: column names, dtypes and values"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def figure_key(viz_type, df, params, view=None):
+    return ("figure", viz_type, fingerprint(df), json.dumps(params, sort_keys=True, default=str),
+            json.dumps(view, sort_keys=True))
+
+def level_of_detail(df, params, view=None):
+    """Points a lod renderer draws: the zoomed region, decimated, and the trace mode for them"""
+    if view:
+        df = zoom_frame(df, params, view)
+    df = reduce_points(df, params, CHART_LOD_MAX_POINTS, CHART_LOD_BINS)
+    # px keeps animated figures on SVG under render_mode="auto"
+    return df, "webgl" if len(df) > CHART_WEBGL_POINTS else "svg"
+
+def figure_json(viz_type, df, params, cache=None, metrics=None, view=None):
+    """Serialized figure for a result, built by the viz_type's renderer or taken from the cache.
+
+    view limits lod renderers to a selected {"x": [x0, x1], "y": [y0, y1]} box.
+    Returns None for unknown viz types and results a renderer cannot draw.
+    """
+    if viz_type not in RENDERERS:
+        return None
+    start = time.perf_counter()
+    key = figure_key(viz_type, df, params, view)
+    text = cache.get(key) if cache is not None else None
+    cached = text is not None
+    if text is None:
+        build, _, lod = RENDERERS[viz_type]
+        if lod:
+            df, render_mode = level_of_detail(df, params, view)
+            params = dict(params, render_mode=render_mode)
+        fig = build(df, params)
+        if fig is None:
+            return None
+        text = pio.to_json(fig, validate=False)
+        if cache is not None:
+            cache.put(key, text)
+    if metrics is not None:
+        metrics.record_figure(viz_type, time.perf_counter() - start, cached)
+    return text
+
+def uses_container_width(viz_type):
+    return RENDERERS.get(viz_type, (None, False, False))[1]
+
+def uses_level_of_detail(viz_type):
+    return RENDERERS.get(viz_type, (None, False, False))[2]
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from mysql.connector import FieldType
+
+INTEGER_TYPES = {
+    FieldType.TINY, FieldType.SHORT, FieldType.INT24,
+    FieldType.LONG, FieldType.LONGLONG, FieldType.YEAR,
+}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE}
+# SUM() over integer columns comes back as DECIMAL
+DECIMAL_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL}
+STRING_TYPES = {FieldType.VARCHAR, FieldType.VAR_STRING, FieldType.STRING, FieldType.ENUM}
+
+FETCH_BATCH_SIZE = 10000
+
+def _batch_column(values, type_code):
+    """Convert one column of a fetched batch into a typed NumPy array"""
+    if type_code in INTEGER_TYPES:
+        try:
+            return np.array(values, dtype=np.int64)
+        except TypeError:
+            # NULLs present: fall back to float with NaN, as pandas would
+            return np.array(values, dtype=np.float64)
+    if type_code in FLOAT_TYPES or type_code in DECIMAL_TYPES:
+        return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+def _finish_column(parts, type_code):
+    if len(parts) == 1:
+        column = parts[0]
+    else:
+        column = np.concatenate(parts)
+    if type_code in DECIMAL_TYPES and len(column) and not np.isnan(column).any() \
+            and (np.mod(column, 1) == 0).all() and np.abs(column).max() < 2 ** 63:
+        return column.astype(np.int64)
+    if type_code in STRING_TYPES:
+        return pd.Categorical(column)
+    return column
+
+def _empty_column(type_code):
+    if type_code in INTEGER_TYPES:
+        return np.array([], dtype=np.int64)
+    if type_code in FLOAT_TYPES or type_code in DECIMAL_TYPES:
+        return np.array([], dtype=np.float64)
+    if type_code in STRING_TYPES:
+        return pd.Categorical([])
+    return np.array([], dtype=object)
+
+def fetch_dataframe(cursor, batch_size=FETCH_BATCH_SIZE):
+    """Build a DataFrame column by column from an executed (non-dictionary) cursor.
+
+    Rows are pulled in batches and transposed straight into typed arrays, with
+    dtypes taken from the result schema: integers to int64, DOUBLE/DECIMAL to
+    float64 (integral DECIMAL sums to int64) and VARCHAR to category.
+    """
+    if cursor.description is None:
+        return pd.DataFrame()
+    names = [column[0] for column in cursor.description]
+    type_codes = [column[1] for column in cursor.description]
+    parts = [[] for _ in names]
+
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for i, values in enumerate(zip(*batch)):
+            parts[i].append(_batch_column(values, type_codes[i]))
+
+    columns = [
+        _finish_column(column_parts, type_code) if column_parts else _empty_column(type_code)
+        for column_parts, type_code in zip(parts, type_codes)
+    ]
+    # Build from a positional dict so repeated column names survive
+    df = pd.DataFrame(dict(enumerate(columns)), copy=False)
+    df.columns = names
+    return df
@@ -0,0 +1,71 @@
+# Database connection parameters - update these with your actual credentials
+DB_HOST = 'localhost'
+DB_NAME = 'phonepe_transaction_insights'
+DB_USER = 'root'
+DB_PASS = '1234'
+
+# Query result cache
+QUERY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+QUERY_CACHE_TTL = 600  # seconds
+DATA_VERSION_CHECK_INTERVAL = 30  # seconds between data_version lookups
+
+# Connection pool
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+DB_POOL_PING_INTERVAL = 30  # idle seconds before a connection is pinged on checkout
+DB_POOL_MAX_PREPARED = 64  # prepared statements kept per connection (least recently used closed first)
+
+# Analytics backend: "mysql" queries the server, "duckdb" runs the same SQL
+# in-process over the Parquet files written by `python etl.py --format parquet`
+ANALYTICS_BACKEND = 'mysql'
+PARQUET_DIR = 'parquet'
+DUCKDB_THREADS = None  # defaults to the CPU count
+
+# Dashboard and Business Case Studies: queries run on a thread pool, each on its own pooled connection.
+# Background thread counts below are sized from DB_POOL_SIZE so together they never outnumber it.
+CASE_STUDY_WORKERS = max(1, DB_POOL_SIZE // 2)  # the other half serves inline page queries, warm-up and the API
+CASE_STUDY_PREFETCH = True  # run the other queries of the open case study in the background
+
+# Map boundaries: india_states.geojson plus the simplified levels from `python geo.py build`
+GEO_DIR = 'geo'
+
+# Transaction, User and Geographical Analysis pages are answered with pandas from
+# the six base tables held in memory (reloaded when the data version changes)
+DATASTORE_ENABLED = True
+
+# Result tables fetch and render one page of rows at a time
+TABLE_PAGE_SIZE = 50
+
+# Scatter and bubble charts: above CHART_LOD_MAX_POINTS points are grid-decimated
+# (box-select a region to see it in full detail); above CHART_WEBGL_POINTS they draw with WebGL
+CHART_LOD_MAX_POINTS = 2000
+CHART_LOD_BINS = 64  # grid cells per axis before coarsening
+CHART_WEBGL_POINTS = 1000
+
+# Serialized case-study figures
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FIGURE_CACHE_TTL = 3600  # seconds
+
+# Cache warm-up: on process start, background workers run every page query (and
+# the whole geo year/quarter space) once so first page views are cache hits
+WARMUP_ON_START = True
+WARMUP_WORKERS = max(1, DB_POOL_SIZE // 4)
+# Warm-up starts its next query only while more than this many pooled connections are free,
+# so it yields to interactive queries instead of making them wait on the pool
+WARMUP_FREE_CONNECTIONS = CASE_STUDY_WORKERS
+WARMUP_BACKOFF = 0.2  # seconds between checks while the pool is busy
+
+# JSON API (`python api.py`). With API_EMBEDDED the Streamlit process serves it
+# too, sharing its result cache, connection pool and metrics with the UI.
+API_HOST = '127.0.0.1'
+API_PORT = 8600
+API_WORKERS = DB_POOL_SIZE  # standalone server, which has its own pool
+# Embedded, the API gets the pooled connections the UI's background threads leave
+API_EMBEDDED_WORKERS = max(1, DB_POOL_SIZE - CASE_STUDY_WORKERS - WARMUP_WORKERS)
+API_EMBEDDED = False
+API_METRICS_FILE = 'metrics/phonepe_api.prom'  # standalone server only
+
+# Instrumentation: Prometheus text file rewritten every METRICS_FLUSH_INTERVAL seconds (None disables it)
+METRICS_FILE = 'metrics/phonepe_dashboard.prom'
+METRICS_FLUSH_INTERVAL = 15  # seconds
+METRICS_DEBUG_PANEL = True  # offer the sidebar debug panel
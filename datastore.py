@@ -0,0 +1,189 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from queries import (
+    TRANSACTION_QUERIES, USER_QUERIES,
+    GEO_METRICS, GEO_QUERY_TEMPLATES, GEO_TREND_QUERIES,
+    TOP_N_MAX, TOP_N_ALL_TIME, top_n_metrics
+)
+from rollup import ROLLUPS
+from tables import TABLES
+
+# Base tables held in memory; the rollups the page SQL reads are re-derived from them
+STORE_TABLES = [
+    "aggregated_transaction", "aggregated_insurance", "aggregated_user",
+    "map_transaction", "map_insurance", "map_user",
+]
+CATEGORY_COLUMNS = {"state", "district", "brand", "transaction_type", "type"}
+COMPACT_DTYPES = {"year": np.int16, "quarter": np.int8}
+
+def compact(df):
+    """Dictionary-encode the text dimensions and narrow year/quarter"""
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif col in COMPACT_DTYPES:
+            df[col] = df[col].astype(COMPACT_DTYPES[col])
+    return df
+
+def _sum(df, keys, sums, order=None, descending=False, limit=None):
+    """SELECT keys, SUM(col) AS name ... GROUP BY keys ORDER BY order LIMIT limit, over a frame"""
+    result = df.groupby(keys, observed=True, sort=False).agg(
+        **{name: (col, "sum") for name, col in sums.items()}
+    ).reset_index()
+    for key in keys:
+        # Plain values, as from the database, so charts don't see unused categories
+        if result[key].dtype == "category":
+            result[key] = result[key].astype(object)
+    if order:
+        result = result.sort_values(order, ascending=not descending, kind="stable")
+    if limit:
+        result = result.head(limit)
+    return result.reset_index(drop=True)
+
+def build_topk(tables, k=TOP_N_MAX):
+    """In-memory topk_index: {(level, metric, year, quarter): top k rows of name, value, numerator, denominator}"""
+    index = {}
+    for level, metric, table, dimension, numerator, denominator in top_n_metrics():
+        # Rollup measures keep their source column names, so the ranking reads the base table
+        df = tables[ROLLUPS[table]["source"]]
+        measures = [numerator] + ([denominator] if denominator else [])
+        for keys in (["year", "quarter"], []):
+            sums = df.groupby(keys + [dimension], observed=True, sort=False)[measures].sum().reset_index()
+            ranked = sums[keys].copy()
+            ranked["name"] = sums[dimension].astype(object)
+            ranked["numerator"] = sums[numerator]
+            if denominator:
+                ranked["denominator"] = sums[denominator]
+                # SQL division by zero gives NULL, ranked last
+                ranked["value"] = (sums[numerator] / sums[denominator]).replace([np.inf, -np.inf], np.nan)
+            else:
+                ranked["denominator"] = np.nan
+                ranked["value"] = sums[numerator]
+            ranked = ranked.sort_values(["value", "name"], ascending=[False, True], na_position="last", kind="stable")
+            if keys:
+                for (year, quarter), group in ranked.groupby(keys, sort=False):
+                    index[(level, metric, int(year), int(quarter))] = group.head(k).reset_index(drop=True)
+            else:
+                index[(level, metric) + TOP_N_ALL_TIME] = ranked.head(k).reset_index(drop=True)
+    return index
+
+def _ranking(level, metric, columns, limit=10):
+    """Answer reading the head of an all-time ranking; columns maps result names to topk_index columns"""
+    def answer(tables, params):
+        ranked = tables["topk_index"].get((level, metric) + TOP_N_ALL_TIME)
+        if ranked is None:
+            return pd.DataFrame(columns=list(columns))
+        top = ranked.head(limit)
+        return pd.DataFrame({name: top[col].to_numpy() for name, col in columns.items()})
+    return answer
+
+def _geo(table, column):
+    def answer(tables, params):
+        df = tables[table]
+        year, quarter = params
+        rows = df[(df["year"].to_numpy() == year) & (df["quarter"].to_numpy() == quarter)]
+        return _sum(rows, ["state"], {"value": column})
+    return answer
+
+def _geo_trend(table, column):
+    return lambda tables, params: _sum(tables[table], ["year", "quarter"], {"value": column}, ["year", "quarter"])
+
+# Page SQL -> equivalent over the in-memory tables, as fn(tables, params)
+ANSWERS = {
+    TRANSACTION_QUERIES["Quarterly Transaction Growth"]: lambda tables, params: _sum(
+        tables["aggregated_transaction"], ["year", "quarter"],
+        {"total_transactions": "count", "total_amount": "amount"}, ["year", "quarter"]),
+    TRANSACTION_QUERIES["Top 10 States by Transaction Volume"]: _ranking(
+        "states", "transactions", {"state": "name", "total_transactions": "value"}),
+    TRANSACTION_QUERIES["Top 10 Districts by Transaction Amount"]: _ranking(
+        "districts", "amount", {"district": "name", "total_amount": "value"}),
+    TRANSACTION_QUERIES["Transaction Type Distribution"]: lambda tables, params: _sum(
+        tables["aggregated_transaction"], ["transaction_type"],
+        {"total_transactions": "count", "total_amount": "amount"}, "total_transactions", descending=True),
+    TRANSACTION_QUERIES["Year-on-Year Growth"]: lambda tables, params: _sum(
+        tables["aggregated_transaction"], ["year"],
+        {"total_transactions": "count", "total_amount": "amount"}, "year"),
+    USER_QUERIES["Top 10 States by Registered Users"]: _ranking(
+        "states", "registered_users", {"state": "name", "total_users": "value"}),
+    USER_QUERIES["Top 10 Districts by App Opens"]: _ranking(
+        "districts", "app_opens", {"district": "name", "total_app_opens": "value"}),
+    USER_QUERIES["User Brand Distribution"]: lambda tables, params: _sum(
+        tables["aggregated_user"], ["brand"], {"user_count": "device_count"}, "user_count", descending=True),
+    USER_QUERIES["User Growth by Quarter"]: lambda tables, params: _sum(
+        tables["aggregated_user"], ["year", "quarter"], {"new_users": "registered_users"}, ["year", "quarter"]),
+    USER_QUERIES["States with Highest User Engagement"]: _ranking(
+        "states", "engagement",
+        {"state": "name", "total_users": "denominator", "total_app_opens": "numerator", "engagement_ratio": "value"}),
+}
+ANSWERS.update({GEO_QUERY_TEMPLATES[name]: _geo(*GEO_METRICS[name]) for name in GEO_METRICS})
+ANSWERS.update({query: _geo_trend(*GEO_METRICS[name]) for name, query in GEO_TREND_QUERIES.items()})
+
+class DataStore:
+    """The base tables loaded once per process into compact frames, answering page queries with pandas.
+
+    Frames are never modified after loading, so sessions share them without
+    locking; when the data version moves, a fresh set is loaded and swapped in
+    while readers keep using the old one.
+    """
+
+    def __init__(self, backend, version_check_interval):
+        self.backend = backend
+        self.version_check_interval = version_check_interval
+        self._reload_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._version_checked_at = time.monotonic()
+        self._stats = {"answers": 0, "reloads": 0}
+        self._version = backend.data_version()
+        self._tables = self._load()
+
+    def _load(self):
+        tables = {}
+        for table in STORE_TABLES:
+            columns = ", ".join(TABLES[table]["columns"])
+            tables[table] = compact(self.backend.read_frame(f"SELECT {columns} FROM {table}"))
+        # Rankings are built with the frames, so leaderboards read only their top rows
+        tables["topk_index"] = build_topk(tables)
+        return tables
+
+    def _refresh_if_stale(self):
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        # One thread checks and reloads; the others carry on with the current frames
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._version_checked_at = now
+            version = self.backend.data_version()
+            if version != self._version:
+                self._tables = self._load()
+                self._version = version
+                with self._lock:
+                    self._stats["reloads"] += 1
+        finally:
+            self._reload_lock.release()
+
+    def can_answer(self, query):
+        return query in ANSWERS
+
+    def answer(self, query, params=None):
+        """Result of a page query computed from memory, shaped like the database result"""
+        self._refresh_if_stale()
+        with self._lock:
+            self._stats["answers"] += 1
+        return ANSWERS[query](self._tables, params)
+
+    def stats(self):
+        tables = self._tables
+        with self._lock:
+            counts = dict(self._stats)
+        return dict(
+            counts,
+            rows=sum(len(tables[table]) for table in STORE_TABLES),
+            bytes=sum(int(tables[table].memory_usage(deep=True).sum()) for table in STORE_TABLES),
+            data_version=self._version,
+        )
@@ -0,0 +1,191 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections with per-query checkout, liveness pings and reconnects"""
+
+    def __init__(self, size, timeout, ping_interval, max_prepared=64, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.max_prepared = max_prepared
+        self.connect_args = connect_args
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        # id(conn) -> (server connection id, OrderedDict of statement -> prepared cursor, least recent first)
+        self._statements = {}
+        self._stats = {
+            "created": 0, "checkouts": 0, "waits": 0, "wait_seconds": 0.0,
+            "timeouts": 0, "pings": 0, "reconnects": 0, "discarded": 0,
+            "prepares": 0, "prepared_hits": 0, "prepared_evictions": 0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        self._count("created")
+        return conn
+
+    def _discard(self, conn):
+        self._count("discarded")
+        with self._lock:
+            self._statements.pop(id(conn), None)
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def _ensure_alive(self, conn):
+        """Ping a connection that sat idle; reconnect it, or replace it, if the server dropped it"""
+        self._count("pings")
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Error:
+            self._count("reconnects")
+        try:
+            conn.ping(reconnect=True, attempts=3, delay=1)
+            return conn
+        except Error:
+            self._discard(conn)
+            return self._connect()
+
+    def _acquire(self):
+        start = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            self._count("waits")
+            if not self._slots.acquire(timeout=self.timeout):
+                self._count("timeouts")
+                raise PoolError(f"No database connection available within {self.timeout}s (pool size {self.size})")
+        try:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            else:
+                if time.monotonic() - last_used >= self.ping_interval:
+                    conn = self._ensure_alive(conn)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += time.monotonic() - start
+            self._in_use += 1
+        return conn
+
+    def _release(self, conn, failed):
+        try:
+            if failed and not conn.is_connected():
+                self._discard(conn)
+            else:
+                # End the read snapshot so the next borrower sees freshly loaded rows
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, time.monotonic()))
+        except Error:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the with-block"""
+        conn = self._acquire()
+        failed = False
+        try:
+            yield conn
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(conn, failed)
+
+    def prepared(self, conn, statement):
+        """Server-side prepared cursor for a statement on this connection, prepared once and reused.
+
+        Returns (cursor, statement); execute the returned statement object, since
+        the connector only skips re-preparing when it gets the identical string.
+        Each connection keeps its max_prepared most recently used statements;
+        older ones are closed, which deallocates them on the server.
+        """
+        server_id = conn.connection_id
+        evicted = []
+        with self._lock:
+            entry = self._statements.get(id(conn))
+            if entry is None or entry[0] != server_id:
+                # New connection, or a reconnect dropped the server's statements
+                entry = self._statements[id(conn)] = (server_id, OrderedDict())
+            statements = entry[1]
+            cached = statements.get(statement)
+            if cached is None:
+                cached = statements[statement] = (conn.cursor(prepared=True), statement)
+                self._stats["prepares"] += 1
+                while len(statements) > self.max_prepared:
+                    evicted.append(statements.popitem(last=False)[1][0])
+                self._stats["prepared_evictions"] += len(evicted)
+            else:
+                statements.move_to_end(statement)
+                self._stats["prepared_hits"] += 1
+        # The caller holds this connection, so its old cursors can be closed here
+        for cursor in evicted:
+            try:
+                cursor.close()
+            except Error:
+                pass
+        return cached
+
+    def drop_prepared(self, conn, statement):
+        """Forget a prepared cursor after a failed execute so the next use prepares afresh"""
+        with self._lock:
+            entry = self._statements.get(id(conn))
+            cached = entry[1].pop(statement, None) if entry else None
+        if cached is not None:
+            try:
+                cached[0].close()
+            except Error:
+                pass
+
+    def run(self, fn, retries=1):
+        """Call fn(conn) on a pooled connection, retrying on a fresh one if the server dropped it"""
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    return fn(conn)
+            except (InterfaceError, OperationalError):
+                if attempt == retries:
+                    raise
+                self._count("reconnects")
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._stats["checkouts"]
+            return dict(
+                self._stats,
+                size=self.size,
+                in_use=self._in_use,
+                idle=self._idle.qsize(),
+                avg_wait_ms=self._stats["wait_seconds"] * 1000 / checkouts if checkouts else 0.0,
+            )
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Parsers turn one quarter.json document into row tuples in two steps: 'items'
+# lists the document's entries and 'rows' yields the row tuples of one entry, so
+# a malformed entry costs only its own rows. The state, year and quarter columns
+# come from the file path and are added by the worker.
+ITEM_ERRORS = (KeyError, IndexError, TypeError, AttributeError, ValueError)
+
+def _aggregated_transaction_items(content):
+    return content['data']['transactionData'] or []
+
+def _aggregated_transaction_rows(item):
+    instrument = item['paymentInstruments'][0]
+    yield (item['name'], instrument['count'], instrument['amount'])
+
+def _aggregated_insurance_items(content):
+    return content.get('data', {}).get('transactionData', []) or []
+
+def _aggregated_insurance_rows(txn):
+    if txn.get('name') == 'Insurance':
+        for pi in txn.get('paymentInstruments', []):
+            yield (pi.get('type'), pi.get('count'), pi.get('amount'))
+
+def _aggregated_user_items(content):
+    data = content.get('data', {})
+    aggregated = data.get('aggregated', {}) or {}
+    registered_users = aggregated.get('registeredUsers', 0)
+    app_opens = aggregated.get('appOpens', 0)
+    return [(device, registered_users, app_opens) for device in data.get('usersByDevice', []) or []]
+
+def _aggregated_user_rows(item):
+    device, registered_users, app_opens = item
+    yield (device.get('brand'), device.get('count'), device.get('percentage'), registered_users, app_opens)
+
+def _map_user_items(content):
+    return list((content.get('data', {}).get('hoverData', {}) or {}).items())
+
+def _map_user_rows(item):
+    district, values = item
+    yield (district.title(), values.get('registeredUsers', 0), values.get('appOpens', 0))
+
+def _hover_list_items(content):
+    return content.get('data', {}).get('hoverDataList', []) or []
+
+def _hover_list_rows(item):
+    metric = item.get('metric', [{}])[0]
+    yield (item.get('name', ''), metric.get('count', 0), metric.get('amount', 0))
+
+def _top_district_items(content):
+    return content.get('data', {}).get('districts', []) or []
+
+def _top_user_rows(district):
+    yield (district.get('name', ''), district.get('registeredUsers'))
+
+def _top_district_rows(item):
+    metric = item.get('metric', {}) or {}
+    yield (item.get('entityName'), metric.get('count'), metric.get('amount'))
+
+# Each dataset: directory under pulse/data, item and row parsers, parsed columns
+# with their dtypes, and the final column order (matching the MySQL table).
+DATASETS = {
+    'aggregated_transaction': {
+        'path': os.path.join('aggregated', 'transaction', 'country', 'india', 'state'),
+        'items': _aggregated_transaction_items,
+        'rows': _aggregated_transaction_rows,
+        'columns': {'transaction_type': object, 'count': np.int64, 'amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'transaction_type', 'count', 'amount'],
+    },
+    'aggregated_insurance': {
+        'path': os.path.join('aggregated', 'insurance', 'country', 'india', 'state'),
+        'items': _aggregated_insurance_items,
+        'rows': _aggregated_insurance_rows,
+        'columns': {'type': object, 'count': np.int64, 'amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'type', 'count', 'amount'],
+    },
+    'aggregated_user': {
+        'path': os.path.join('aggregated', 'user', 'country', 'india', 'state'),
+        'items': _aggregated_user_items,
+        'rows': _aggregated_user_rows,
+        'columns': {'brand': object, 'device_count': np.int64, 'device_percentage': np.float64,
+                    'registered_users': np.int64, 'app_opens': np.int64},
+        'order': ['state', 'year', 'quarter', 'brand', 'device_count', 'device_percentage',
+                  'registered_users', 'app_opens'],
+    },
+    'map_user': {
+        'path': os.path.join('map', 'user', 'hover', 'country', 'india', 'state'),
+        'items': _map_user_items,
+        'rows': _map_user_rows,
+        'columns': {'district': object, 'registered_users': np.int64, 'app_opens': np.int64},
+        'order': ['state', 'district', 'year', 'quarter', 'registered_users', 'app_opens'],
+    },
+    'map_transaction': {
+        'path': os.path.join('map', 'transaction', 'hover', 'country', 'india', 'state'),
+        'items': _hover_list_items,
+        'rows': _hover_list_rows,
+        'columns': {'district': object, 'transaction_count': np.int64, 'transaction_amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'district', 'transaction_count', 'transaction_amount'],
+    },
+    'map_insurance': {
+        'path': os.path.join('map', 'insurance', 'hover', 'country', 'india', 'state'),
+        'items': _hover_list_items,
+        'rows': _hover_list_rows,
+        'columns': {'district': object, 'policy_count': np.int64, 'insured_amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'district', 'policy_count', 'insured_amount'],
+    },
+    'top_user': {
+        'path': os.path.join('top', 'user', 'country', 'india', 'state'),
+        'items': _top_district_items,
+        'rows': _top_user_rows,
+        'columns': {'district': object, 'registered_users': np.int64},
+        'order': ['state', 'year', 'quarter', 'district', 'registered_users'],
+    },
+    'top_insurance': {
+        'path': os.path.join('top', 'insurance', 'country', 'india', 'state'),
+        'items': _top_district_items,
+        'rows': _top_district_rows,
+        'columns': {'district': object, 'policy_count': np.int64, 'insured_amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'district', 'policy_count', 'insured_amount'],
+    },
+    'top_transaction': {
+        'path': os.path.join('top', 'transaction', 'country', 'india', 'state'),
+        'items': _top_district_items,
+        'rows': _top_district_rows,
+        'columns': {'district': object, 'transaction_count': np.int64, 'transaction_amount': np.float64},
+        'order': ['state', 'year', 'quarter', 'district', 'transaction_count', 'transaction_amount'],
+    },
+}
+
+# Low-cardinality text columns, stored as categoricals after the merge
+CATEGORY_COLUMNS = {'state', 'district', 'transaction_type', 'type', 'brand'}
+
+def _to_array(values, dtype):
+    """Build a typed column, widening ints to float when the source has missing values"""
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+
+def state_name(state_dir):
+    """State name as stored in the tables, e.g. 'andaman-&-nicobar-islands' -> 'Andaman & Nicobar Islands'"""
+    return state_dir.replace('-', ' ').title()
+
+def quarter_files(state_path):
+    """Yield (year, quarter, file_path) for every year/quarter.json under a state directory"""
+    for year in sorted(os.listdir(state_path)):
+        year_path = os.path.join(state_path, year)
+        if not os.path.isdir(year_path):
+            continue
+        for quarter_file in sorted(os.listdir(year_path)):
+            if quarter_file.endswith('.json'):
+                yield int(year), int(os.path.splitext(quarter_file)[0]), os.path.join(year_path, quarter_file)
+
+def parse_document(dataset, content, errors=None):
+    """Row tuples of the dataset's parsed columns from one decoded quarter.json document.
+
+    An entry that doesn't parse is skipped, with a message appended to errors
+    when given, so the document's other rows are kept.
+    """
+    spec = DATASETS[dataset]
+    rows = []
+    for i, item in enumerate(spec['items'](content)):
+        try:
+            # Materialized first, so an entry failing part-way adds none of its rows
+            rows.extend(list(spec['rows'](item)))
+        except ITEM_ERRORS as e:
+            if errors is not None:
+                errors.append(f"skipped entry {i}: {type(e).__name__}: {e}")
+    return rows
+
+def parse_file(dataset, file_path, errors=None):
+    """Parse one quarter.json into row tuples of the dataset's parsed columns"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    return parse_document(dataset, content, errors)
+
+def build_chunk(dataset, files):
+    """Parse (state, year, quarter, file_path) entries into one columnar chunk.
+
+    Returns the chunk, the error messages and the paths of files that could not be parsed at all.
+    """
+    entries, errors, failed = [], [], []
+    for state, year, quarter, file_path in files:
+        item_errors = []
+        try:
+            entries.append((state, year, quarter, parse_file(dataset, file_path, item_errors)))
+        except Exception as e:
+            errors.append(f"Error in {file_path}: {e}")
+            failed.append(file_path)
+        errors.extend(f"Error in {file_path}: {error}" for error in item_errors)
+    return columns_chunk(dataset, entries), errors, failed
+
+def columns_chunk(dataset, entries):
+    """One columnar chunk from (state, year, quarter, row tuples) entries"""
+    spec = DATASETS[dataset]
+    parsed_columns = list(spec['columns'])
+    states, years, quarters, rows = [], [], [], []
+
+    for state, year, quarter, parsed in entries:
+        rows.extend(parsed)
+        states.extend([state] * len(parsed))
+        years.extend([year] * len(parsed))
+        quarters.extend([quarter] * len(parsed))
+
+    chunk = {
+        'state': np.asarray(states, dtype=object),
+        'year': np.asarray(years, dtype=np.int64),
+        'quarter': np.asarray(quarters, dtype=np.int64),
+    }
+    transposed = list(zip(*rows)) if rows else [()] * len(parsed_columns)
+    for name, values in zip(parsed_columns, transposed):
+        chunk[name] = _to_array(values, spec['columns'][name])
+    return chunk
+
+def extract_state(dataset, state_path):
+    """Parse every year/quarter.json of one state directory into a columnar chunk"""
+    state = state_name(os.path.basename(state_path))
+    files = [(state, year, quarter, file_path) for year, quarter, file_path in quarter_files(state_path)]
+    chunk, errors, _ = build_chunk(dataset, files)
+    return dataset, chunk, errors
+
+def merge_chunks(dataset, chunks):
+    """Concatenate columnar chunks of one dataset into a DataFrame in table column order"""
+    order = DATASETS[dataset]['order']
+    if not chunks:
+        return pd.DataFrame(columns=order)
+    columns = {}
+    for name in order:
+        parts = [chunk[name] for chunk in chunks]
+        # A chunk that widened to float forces the merged column to float as well
+        columns[name] = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    df = pd.DataFrame(columns, columns=order)
+    for name in order:
+        if name in CATEGORY_COLUMNS:
+            df[name] = df[name].astype('category')
+    return df
+
+def extract_files(dataset, files):
+    """Parse an explicit list of (state, year, quarter, file_path) entries into a DataFrame.
+
+    Returns the DataFrame and the paths of files that could not be parsed.
+    """
+    chunk, errors, failed = build_chunk(dataset, files)
+    for error in errors:
+        print(error)
+    return merge_chunks(dataset, [chunk]), failed
+
+def _state_tasks(pulse_root, dataset):
+    base_path = os.path.join(pulse_root, DATASETS[dataset]['path'])
+    if not os.path.isdir(base_path):
+        return []
+    return [
+        (dataset, os.path.join(base_path, state))
+        for state in sorted(os.listdir(base_path))
+        if os.path.isdir(os.path.join(base_path, state))
+    ]
+
+def extract_all(pulse_root, datasets=None, max_workers=None):
+    """Extract the given datasets (all by default) with one process-pool task per state"""
+    datasets = list(datasets or DATASETS)
+    tasks = [task for dataset in datasets for task in _state_tasks(pulse_root, dataset)]
+    chunks = {dataset: [] for dataset in datasets}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(extract_state, dataset, state_path) for dataset, state_path in tasks]
+        for future in futures:
+            dataset, chunk, errors = future.result()
+            for error in errors:
+                print(error)
+            chunks[dataset].append(chunk)
+
+    return {dataset: merge_chunks(dataset, chunks[dataset]) for dataset in datasets}
+
+def extract_dataset(pulse_root, dataset, max_workers=None):
+    """Extract a single dataset into a DataFrame"""
+    return extract_all(pulse_root, [dataset], max_workers)[dataset]
+
+def main():
+    """Rebuild the dataset CSVs from a pulse checkout, e.g. `python etl.py pulse/data`"""
+    parser = argparse.ArgumentParser(description="Extract the PhonePe Pulse JSON tree into CSV files")
+    parser.add_argument("pulse_root", help="Path to the pulse/data directory")
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS), help="Only extract this dataset")
+    parser.add_argument("--out-dir", default=os.getcwd())
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="parquet output feeds the duckdb analytics backend")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="pulse_root is a snapshot directory written by `python snapshot.py`")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from snapshot import extract_snapshot
+        frames = extract_snapshot(args.pulse_root, args.dataset, args.workers)
+    else:
+        frames = extract_all(args.pulse_root, args.dataset, args.workers)
+    os.makedirs(args.out_dir, exist_ok=True)
+    for dataset, df in frames.items():
+        output_path = os.path.join(args.out_dir, f"{dataset}.{args.format}")
+        if args.format == "parquet":
+            df.to_parquet(output_path, index=False)
+        else:
+            df.to_csv(output_path, index=False)
+        print(f"{dataset}.{args.format} saved with {len(df)} rows.")
+
+if __name__ == "__main__":
+    main()
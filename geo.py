@@ -0,0 +1,223 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import urllib.request
+from functools import lru_cache
+
+from config import GEO_DIR
+
+# Boundary layers served from GEO_DIR, prepared by `python geo.py build`: the
+# state file is downloaded from its original source, district boundaries have no
+# public download and are imported with --source districts=<file> (one feature
+# per district, named in "district"). Renders never fetch anything themselves.
+GEO_LAYERS = {
+    "states": {
+        "file": "india_states.geojson",
+        "url": "https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
+        "featureidkey": "properties.ST_NM",
+    },
+    "districts": {
+        "file": "india_districts.geojson",
+        "url": None,
+        "featureidkey": "properties.district",
+    },
+}
+
+# Douglas-Peucker tolerance (degrees) and coordinate precision of each detail level
+GEO_LEVELS = {
+    "full": {"tolerance": 0, "precision": None},
+    "high": {"tolerance": 0.005, "precision": 4},
+    "medium": {"tolerance": 0.02, "precision": 3},
+    "low": {"tolerance": 0.05, "precision": 3},
+}
+
+def level_for_zoom(zoom):
+    """Coarsest detail level whose tolerance stays under half a pixel at this map zoom"""
+    half_pixel = 360 / (256 * 2 ** zoom) / 2
+    suitable = [name for name, level in GEO_LEVELS.items() if level["tolerance"] <= half_pixel]
+    return max(suitable, key=lambda name: GEO_LEVELS[name]["tolerance"])
+
+def _distance(point, start, end):
+    (x, y), (x1, y1), (x2, y2) = point[:2], start[:2], end[:2]
+    dx, dy = x2 - x1, y2 - y1
+    norm = math.hypot(dx, dy)
+    if norm == 0:
+        return math.hypot(x - x1, y - y1)
+    return abs(dy * x - dx * y + x2 * y1 - y2 * x1) / norm
+
+def simplify_ring(points, tolerance):
+    """Douglas-Peucker simplification of one coordinate ring"""
+    if tolerance <= 0 or len(points) < 5:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance, index = 0.0, None
+        for i in range(first + 1, last):
+            distance = _distance(points[i], points[first], points[last])
+            if distance > max_distance:
+                max_distance, index = distance, i
+        if index is not None and max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    simplified = [point for point, kept in zip(points, keep) if kept]
+    # A ring needs 4 positions to stay a polygon; small islands keep their full outline
+    return simplified if len(simplified) >= 4 else points
+
+def _round_ring(ring, precision):
+    if precision is None:
+        return ring
+    return [[round(x, precision), round(y, precision)] for x, y, *_ in ring]
+
+def simplify_geometry(geometry, tolerance, precision=None):
+    """Simplify a Polygon or MultiPolygon geometry; other types are returned unchanged"""
+    if geometry is None:
+        return geometry
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return geometry
+    simplified = [
+        [_round_ring(simplify_ring(ring, tolerance), precision) for ring in polygon]
+        for polygon in polygons
+    ]
+    coordinates = simplified[0] if geometry["type"] == "Polygon" else simplified
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+def simplify_geojson(geojson, level):
+    """A copy of a FeatureCollection simplified to one of GEO_LEVELS"""
+    settings = GEO_LEVELS[level]
+    if settings["tolerance"] == 0 and settings["precision"] is None:
+        return geojson
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": feature.get("properties", {}),
+                "geometry": simplify_geometry(feature.get("geometry"), settings["tolerance"], settings["precision"]),
+            }
+            for feature in geojson["features"]
+        ],
+    }
+
+def asset_path(layer, level="full"):
+    name = GEO_LAYERS[layer]["file"]
+    if level != "full":
+        name = name.replace(".geojson", f".{level}.geojson")
+    return os.path.join(GEO_DIR, name)
+
+def _check_geojson(path):
+    with open(path, encoding="utf-8") as f:
+        json.load(f)
+
+def _write_atomic(path, write, check=None):
+    # A temp file renamed into place, so an interrupted or bad fetch never leaves a truncated asset
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        with open(path + ".tmp", "wb") as f:
+            write(f)
+        if check is not None:
+            check(path + ".tmp")
+    except (OSError, ValueError):
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+        raise
+    os.replace(path + ".tmp", path)
+
+def fetch_layer(layer, source=None):
+    """Put a layer's full-resolution file in place, from a local source file or its download URL"""
+    spec = GEO_LAYERS[layer]
+    if source is not None:
+        with open(source, "rb") as src:
+            _write_atomic(asset_path(layer), lambda f: shutil.copyfileobj(src, f), _check_geojson)
+    elif spec["url"] is not None:
+        with urllib.request.urlopen(spec["url"], timeout=30) as response:
+            _write_atomic(asset_path(layer), lambda f: shutil.copyfileobj(response, f), _check_geojson)
+    else:
+        raise FileNotFoundError(f"No boundaries for '{layer}' at {asset_path(layer)}; "
+                                f"import them with --source {layer}=<file>")
+
+@lru_cache(maxsize=None)
+def load_geojson(layer="states", level="full"):
+    """Parsed boundaries of a layer at a detail level, cached for the life of the process.
+
+    Prebuilt level files are read as they are; a missing level is simplified
+    from the full-resolution file. Nothing is downloaded here.
+    """
+    path = asset_path(layer, level)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if level != "full":
+        return simplify_geojson(load_geojson(layer, "full"), level)
+    raise FileNotFoundError(f"No boundaries for '{layer}' at {path}; run `python geo.py build`")
+
+def feature_id_key(layer="states"):
+    return GEO_LAYERS[layer]["featureidkey"]
+
+def state_boundaries(zoom):
+    """State boundaries simplified for the map zoom.
+
+    Before `python geo.py build` has run, the remote URL is returned instead,
+    so the browser fetches it rather than the server blocking on it.
+    """
+    try:
+        return load_geojson("states", level_for_zoom(zoom))
+    except (OSError, ValueError):
+        return GEO_LAYERS["states"]["url"]
+
+def build_assets(layers=None, sources=None):
+    """Fetch each layer's full-resolution file if needed, then write its simplified level files.
+
+    sources maps a layer to a local GeoJSON file imported in place of the download.
+    """
+    sources = sources or {}
+    sizes = {}
+    for layer in layers or GEO_LAYERS:
+        if layer in sources or not os.path.exists(asset_path(layer)):
+            fetch_layer(layer, sources.get(layer))
+            load_geojson.cache_clear()
+        full = load_geojson(layer, "full")
+        for level in GEO_LEVELS:
+            if level != "full":
+                data = json.dumps(simplify_geojson(full, level), separators=(",", ":")).encode("utf-8")
+                _write_atomic(asset_path(layer, level), lambda f: f.write(data))
+            sizes[(layer, level)] = os.path.getsize(asset_path(layer, level))
+    return sizes
+
+def main():
+    """Prepare the boundary assets, e.g. `python geo.py build --source districts=india_districts.geojson`"""
+    parser = argparse.ArgumentParser(description="Download or import the GeoJSON boundaries and build their simplified levels")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--layer", action="append", choices=list(GEO_LAYERS), help="Only build this layer")
+    parser.add_argument("--source", action="append", default=[], metavar="LAYER=PATH",
+                        help="Import a layer's full-resolution GeoJSON from a local file")
+    args = parser.parse_args()
+
+    sources = dict(source.split("=", 1) for source in args.source if "=" in source)
+    unknown = [layer for layer in sources if layer not in GEO_LAYERS]
+    if unknown or len(sources) != len(args.source):
+        parser.error("--source takes LAYER=PATH with LAYER one of " + ", ".join(GEO_LAYERS))
+    # Layers without a download URL are built only once they have been imported
+    layers = args.layer or [
+        layer for layer in GEO_LAYERS
+        if GEO_LAYERS[layer]["url"] or layer in sources or os.path.exists(asset_path(layer))
+    ]
+    try:
+        sizes = build_assets(layers, sources)
+    except (OSError, ValueError) as e:
+        print(f"Error building boundary assets: {e}")
+        return
+    for (layer, level), size in sizes.items():
+        print(f"{asset_path(layer, level)}: {size / 1024:,.0f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import re
+import sys
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from queries import registered_queries
+from tables import TABLES
+
+# Secondary indexes per fact table, derived from the filters, groupings and
+# measures of the registered queries. Trailing measure columns make them
+# covering, so those queries are answered from the index alone.
+INDEXES = {
+    "aggregated_transaction": {
+        # Geographical Analysis transaction metrics: WHERE year/quarter GROUP BY state; per-quarter rollup refresh
+        "idx_at_period_state": ["year", "quarter", "state", "count", "amount"],
+        # Case studies 1 and 4 state totals and trends, insurance penetration and contribution joins on state
+        "idx_at_state_cover": ["state", "year", "quarter", "count", "amount"],
+        # Payment Category-wise Trends
+        "idx_at_type_cover": ["transaction_type", "count", "amount"],
+    },
+    "aggregated_insurance": {
+        # Geographical Analysis insurance metrics and the insurance trend (GROUP BY year, quarter)
+        "idx_ai_period_state": ["year", "quarter", "state", "count", "amount"],
+        # Case study 3 state totals and low-uptake scan
+        "idx_ai_state_cover": ["state", "count", "amount"],
+    },
+    "aggregated_user": {
+        # Geographical Analysis registered users; per-quarter rollup refresh
+        "idx_au_period_state": ["year", "quarter", "state", "registered_users", "app_opens"],
+        # Case study 2 state totals and app-open gap
+        "idx_au_state_cover": ["state", "registered_users", "app_opens"],
+        # Brand Preference Analysis and the cohort device distribution
+        "idx_au_brand_cover": ["brand", "device_count", "device_percentage"],
+    },
+    "map_transaction": {
+        # Geographical / rollup refresh filters on a single quarter
+        "idx_mt_period": ["year", "quarter", "state", "district", "transaction_count", "transaction_amount"],
+        # Top districts and district contribution (GROUP BY state, district)
+        "idx_mt_state_district": ["state", "district", "transaction_count", "transaction_amount"],
+        # Cohort transaction metrics (GROUP BY state, year, quarter with COUNT(DISTINCT district))
+        "idx_mt_state_period": ["state", "year", "quarter", "district", "transaction_count", "transaction_amount"],
+    },
+    "map_user": {
+        # Geographical Analysis app opens: WHERE year/quarter GROUP BY state; rollup refresh
+        "idx_mu_period": ["year", "quarter", "state", "district", "registered_users", "app_opens"],
+        # Registration analysis, YoY growth and cohort CTEs (GROUP BY state[, year, quarter], distinct districts)
+        "idx_mu_state_period": ["state", "year", "quarter", "district", "registered_users", "app_opens"],
+    },
+    "map_insurance": {
+        # District-wise insurance and the cohort insurance adoption CTE
+        "idx_mi_state_period": ["state", "year", "quarter", "district", "policy_count", "insured_amount"],
+        "idx_mi_state_district": ["state", "district", "policy_count", "insured_amount"],
+    },
+}
+
+# District-level tables that get RANGE partitioning by year
+PARTITIONED_TABLES = ["map_transaction", "map_user"]
+
+def existing_indexes(conn, table):
+    """All indexes of a table as {name: [columns]}"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT index_name, column_name
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+        ORDER BY index_name, seq_in_index
+    """, (table,))
+    indexes = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column_name)
+    cursor.close()
+    return indexes
+
+def plan_indexes(conn, tables):
+    """ALTER statements that bring the given tables in line with INDEXES"""
+    statements = []
+    for table in tables:
+        current = existing_indexes(conn, table)
+        clauses = []
+        for name, columns in INDEXES.get(table, {}).items():
+            if current.get(name) == columns:
+                continue
+            if name in current:
+                clauses.append(f"DROP INDEX {name}")
+            clauses.append(f"ADD INDEX {name} ({', '.join(columns)})")
+        if clauses:
+            statements.append(f"ALTER TABLE {table} " + ", ".join(clauses))
+    return statements
+
+def is_partitioned(conn, table):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL
+    """, (table,))
+    (count,) = cursor.fetchone()
+    cursor.close()
+    return count > 0
+
+def plan_partitioning(conn, table):
+    """Statements that RANGE-partition a table by year, one partition per year present"""
+    if is_partitioned(conn, table):
+        return []
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(year), MAX(year) FROM {table}")
+    first_year, last_year = cursor.fetchone()
+    cursor.close()
+    if first_year is None:
+        return []
+    partitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in range(first_year, last_year + 1)]
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return [
+        # Every unique key must contain the partitioning column, so year joins the primary key
+        f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, year)",
+        f"ALTER TABLE {table} PARTITION BY RANGE (year) ({', '.join(partitions)})",
+    ]
+
+def _queries_for(tables):
+    pattern = re.compile(r"\b(" + "|".join(map(re.escape, tables)) + r")\b")
+    return [(name, sql, params) for name, sql, params in registered_queries() if pattern.search(sql)]
+
+def explain(conn, sql, params=None):
+    """Traditional EXPLAIN rows as dicts (table, type, key, rows, Extra, ...)"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("EXPLAIN " + sql.strip().rstrip(";"), params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+def time_query(conn, sql, params=None, repeat=3):
+    """Best-of-N wall time in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        cursor.close()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _plan_summary(rows, tables):
+    parts = []
+    for row in rows:
+        if row.get("table") in tables or not tables:
+            parts.append(f"{row.get('table')}:{row.get('type')}/{row.get('key') or '-'}")
+    return ", ".join(parts) or "-"
+
+def report(conn, tables, repeat=3):
+    """EXPLAIN summary and timing for every registered query touching the tables"""
+    results = {}
+    for name, sql, params in _queries_for(tables):
+        try:
+            results[name] = {
+                "plan": _plan_summary(explain(conn, sql, params), tables),
+                "ms": time_query(conn, sql, params, repeat),
+            }
+        except Error as e:
+            results[name] = {"plan": f"error: {e}", "ms": None}
+    return results
+
+def print_comparison(before, after):
+    for name in before:
+        b, a = before[name], after.get(name, {})
+        b_ms = f"{b['ms']:.1f} ms" if b.get("ms") is not None else "n/a"
+        a_ms = f"{a['ms']:.1f} ms" if a.get("ms") is not None else "n/a"
+        print(f"{name}\n    before: {b['plan']} ({b_ms})\n    after:  {a.get('plan', '-')} ({a_ms})")
+
+def verify(conn, tables):
+    """Return a list of problems: missing or mismatched indexes, unpartitioned tables, full scans"""
+    problems = []
+    for table in tables:
+        current = existing_indexes(conn, table)
+        for name, columns in INDEXES.get(table, {}).items():
+            if current.get(name) != columns:
+                problems.append(f"{table}: index {name} missing or not on ({', '.join(columns)})")
+        if table in PARTITIONED_TABLES and not is_partitioned(conn, table):
+            problems.append(f"{table}: not partitioned by year")
+    for name, sql, params in _queries_for(tables):
+        try:
+            for row in explain(conn, sql, params):
+                if row.get("table") in tables and row.get("type") == "ALL":
+                    problems.append(f"{name}: full scan of {row['table']}")
+        except Error as e:
+            problems.append(f"{name}: EXPLAIN failed ({e})")
+    return problems
+
+def main():
+    """Create, verify and report on fact table indexes, e.g. `python indexes.py apply --partition`"""
+    parser = argparse.ArgumentParser(description="Manage indexes and partitions of the PhonePe fact tables")
+    parser.add_argument("command", choices=["plan", "apply", "verify"])
+    parser.add_argument("--table", action="append", choices=list(TABLES), help="Limit to this table")
+    parser.add_argument("--partition", action="store_true", help="Also RANGE-partition map_transaction/map_user by year")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per query (best is reported)")
+    args = parser.parse_args()
+    tables = args.table or [table for table in TABLES if table in INDEXES]
+
+    try:
+        connection = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASS, database=DB_NAME)
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        sys.exit(1)
+
+    statements = plan_indexes(connection, tables)
+    if args.partition:
+        for table in PARTITIONED_TABLES:
+            if table in tables:
+                statements += plan_partitioning(connection, table)
+
+    if args.command == "plan":
+        print("\n".join(statements) if statements else "Schema is up to date.")
+    elif args.command == "apply":
+        before = report(connection, tables, args.repeat)
+        cursor = connection.cursor()
+        for statement in statements:
+            print(statement)
+            cursor.execute(statement)
+        cursor.close()
+        after = report(connection, tables, args.repeat)
+        print_comparison(before, after)
+    else:
+        problems = verify(connection, tables)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} problem(s) found." if problems else "All indexes verified.")
+        connection.close()
+        sys.exit(1 if problems else 0)
+    connection.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import csv
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from tables import TABLES, create_table_sql, measure_columns
+from rollup import create_rollup_tables, refresh_rollups
+from topk import create_topk_table, refresh_topk
+from materialize import mark_changed, refresh_materialized
+from query_cache import bump_data_version
+
+LOAD_CHUNK_SIZE = 5000
+# Loads of at least this many rows drop the secondary indexes and rebuild them once at the end
+DEFER_INDEXES_MIN_ROWS = 100000
+
+def _python_rows(df, columns):
+    """Rows of plain Python values (NULL for missing) that the connector can bind"""
+    values = df[columns].astype(object)
+    values = values.where(pd.notna(values), None)
+    return list(values.itertuples(index=False, name=None))
+
+def _upsert_sql(table, columns, row_count):
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    updates = ", ".join(f"{col} = VALUES({col})" for col in measure_columns(table))
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        + ", ".join([placeholders] * row_count)
+        + f" ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+def secondary_indexes(conn, table):
+    """Non-unique secondary indexes of a table as {name: definition}.
+
+    Definitions are the KEY lines of SHOW CREATE TABLE, so prefix lengths,
+    ordering and index options survive a drop and re-add.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SHOW CREATE TABLE {table}")
+    create_sql = cursor.fetchone()[1]
+    cursor.close()
+    indexes = {}
+    for line in create_sql.splitlines():
+        match = re.match(r"\s*((?:FULLTEXT |SPATIAL )?KEY `([^`]+)`.*?),?$", line)
+        if match:
+            indexes[match.group(2)] = match.group(1)
+    return indexes
+
+def _drop_indexes(conn, table, indexes):
+    if indexes:
+        cursor = conn.cursor()
+        cursor.execute(f"ALTER TABLE {table} " + ", ".join(f"DROP INDEX `{name}`" for name in indexes))
+        cursor.close()
+
+def _restore_indexes(conn, table, indexes):
+    # One ALTER rebuilds every index in a single sorted pass instead of per-row maintenance
+    if indexes:
+        cursor = conn.cursor()
+        cursor.execute(f"ALTER TABLE {table} " + ", ".join(f"ADD {definition}" for definition in indexes.values()))
+        cursor.close()
+
+def _load_multirow(conn, table, df, columns, chunk_size):
+    cursor = conn.cursor()
+    rows = _python_rows(df, columns)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        cursor.execute(_upsert_sql(table, columns, len(chunk)), [v for row in chunk for v in row])
+    cursor.close()
+
+def _load_infile(conn, table, df, columns):
+    # REPLACE makes LOAD DATA upsert on the table's unique natural key
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8") as f:
+        path = f.name
+        writer = csv.writer(f, lineterminator="\n")
+        for row in _python_rows(df, columns):
+            writer.writerow(["\\N" if v is None else v for v in row])
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s
+            REPLACE INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+        """, (path,))
+        cursor.close()
+    finally:
+        os.remove(path)
+
+def _delete_partitions(conn, table, partitions):
+    # Rows of a re-extracted (state, year, quarter) that vanished from the source must go too
+    cursor = conn.cursor()
+    for state, year, quarter in partitions:
+        cursor.execute(f"DELETE FROM {table} WHERE state = %s AND year = %s AND quarter = %s", (state, year, quarter))
+    cursor.close()
+
+def load_table(conn, table, df, method="insert", chunk_size=LOAD_CHUNK_SIZE, replace=None, defer_indexes=None):
+    """Upsert a DataFrame into a fact table and return load statistics.
+
+    With defer_indexes, non-unique secondary indexes are dropped for the load
+    and rebuilt once at the end; by default only loads of DEFER_INDEXES_MIN_ROWS
+    rows or more do so, and smaller ones maintain the indexes row by row. The
+    natural-key unique index always stays so reruns update rows in place.
+    `replace` lists (state, year, quarter) partitions whose existing rows are
+    deleted in the same transaction before the new rows go in.
+    """
+    columns = list(TABLES[table]["columns"])
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"DataFrame for '{table}' is missing columns: {missing}")
+
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute(create_table_sql(table))
+    cursor.close()
+
+    if defer_indexes is None:
+        defer_indexes = len(df) >= DEFER_INDEXES_MIN_ROWS
+    indexes = secondary_indexes(conn, table) if defer_indexes else {}
+    _drop_indexes(conn, table, indexes)
+    try:
+        if replace:
+            _delete_partitions(conn, table, replace)
+        if method == "infile":
+            _load_infile(conn, table, df, columns)
+        else:
+            _load_multirow(conn, table, df, columns, chunk_size)
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        _restore_indexes(conn, table, indexes)
+
+    seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows": len(df),
+        "seconds": seconds,
+        "rows_per_sec": len(df) / seconds if seconds else 0.0,
+        "periods": sorted({(int(y), int(q)) for y, q in zip(df["year"], df["quarter"])}
+                          | {(int(y), int(q)) for _, y, q in replace or []}),
+    }
+
+def load_frames(conn, frames, method="insert", chunk_size=LOAD_CHUNK_SIZE, replace=None, defer_indexes=None):
+    """Load {table: DataFrame}, then refresh the affected rollup and top-K periods and bump the data version.
+
+    `replace` optionally maps a table to the partitions passed on to load_table,
+    and defer_indexes is passed on as is.
+    """
+    results = []
+    for table, df in frames.items():
+        result = load_table(conn, table, df, method, chunk_size, (replace or {}).get(table), defer_indexes)
+        print(f"Loaded {result['rows']:,} rows into '{table}' in {result['seconds']:.2f}s "
+              f"({result['rows_per_sec']:,.0f} rows/sec).")
+        results.append(result)
+
+    periods = sorted({period for result in results for period in result["periods"]})
+    if periods:
+        create_rollup_tables(conn)
+        refresh_rollups(conn, periods, sources=set(frames))
+        create_topk_table(conn)
+        refresh_topk(conn, periods, sources=set(frames))
+    # Only the materialized case-study tables reading the loaded tables are rebuilt
+    mark_changed(conn, list(frames))
+    refresh_materialized(conn)
+    bump_data_version(conn)
+    return results
+
+def main():
+    """Load extracted data, e.g. `python loader.py --csv-dir .`, `--pulse-root pulse/data` or `--snapshot snapshot`"""
+    parser = argparse.ArgumentParser(description="Bulk-load PhonePe Pulse data into MySQL")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv-dir", help="Directory with <table>.csv files written by etl.py")
+    source.add_argument("--pulse-root", help="Extract straight from a pulse/data checkout")
+    source.add_argument("--snapshot", help="Extract from a snapshot directory written by snapshot.py")
+    parser.add_argument("--table", action="append", choices=list(TABLES), help="Only load this table")
+    parser.add_argument("--method", choices=["insert", "infile"], default="insert",
+                        help="Chunked multi-row upserts, or LOAD DATA LOCAL INFILE")
+    parser.add_argument("--chunk-size", type=int, default=LOAD_CHUNK_SIZE)
+    parser.add_argument("--defer-indexes", action=argparse.BooleanOptionalAction, default=None,
+                        help=f"Drop secondary indexes during the load and rebuild them after "
+                             f"(default: for tables of {DEFER_INDEXES_MIN_ROWS:,}+ rows)")
+    args = parser.parse_args()
+
+    tables = args.table or list(TABLES)
+    if args.pulse_root:
+        from etl import extract_all
+        frames = extract_all(args.pulse_root, tables)
+    elif args.snapshot:
+        from snapshot import extract_snapshot
+        frames = extract_snapshot(args.snapshot, tables)
+    else:
+        frames = {}
+        for table in tables:
+            path = os.path.join(args.csv_dir, f"{table}.csv")
+            if os.path.exists(path):
+                df = pd.read_csv(path)
+                columns = list(TABLES[table]["columns"])
+                # Notebook CSVs use headers like 'State'/'DeviceCount' in table column order
+                if list(df.columns) != columns and len(df.columns) == len(columns):
+                    df.columns = columns
+                frames[table] = df
+            else:
+                print(f"File not found: {path}")
+
+    try:
+        connection = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME,
+            allow_local_infile=args.method == "infile"
+        )
+        results = load_frames(connection, frames, args.method, args.chunk_size, defer_indexes=args.defer_indexes)
+        connection.close()
+        total_rows = sum(result["rows"] for result in results)
+        total_seconds = sum(result["seconds"] for result in results)
+        print(f"Load completed: {total_rows:,} rows in {total_seconds:.2f}s "
+              f"({total_rows / total_seconds if total_seconds else 0:,.0f} rows/sec).")
+    except (Error, ValueError) as e:
+        print(f"Error importing data: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import pandas as pd
+
+def lod_columns(params):
+    """(x, y, size, group columns) of a scatter-style chart's viz_params"""
+    size = params.get("size_col") or params.get("size")
+    groups = [params.get(key) for key in ("color_col", "color", "facet_col", "animation_col")]
+    return params["x_col"], params["y_col"], size, [col for col in groups if col]
+
+def zoom_frame(df, params, view):
+    """Rows inside a selected box, view = {"x": [x0, x1], "y": [y0, y1]}"""
+    x, y, _, _ = lod_columns(params)
+    mask = pd.Series(True, index=df.index)
+    for col, bounds in ((x, view.get("x")), (y, view.get("y"))):
+        if bounds and pd.api.types.is_numeric_dtype(df[col]):
+            low, high = sorted(bounds)
+            mask &= df[col].between(low, high)
+    return df[mask]
+
+def _cell(values, bins):
+    low, high = values.min(), values.max()
+    if high == low:
+        return pd.Series(0, index=values.index)
+    return ((values - low) / (high - low) * bins).clip(upper=bins - 1).fillna(-1).astype(int)
+
+def reduce_points(df, params, max_points, bins=64):
+    """Grid-decimate a scatter frame to at most about max_points rows.
+
+    Points are binned on an x/y grid within each color, facet and animation
+    group; the largest point of every occupied cell is kept whole, so hover
+    columns survive. The grid gets coarser until the result fits.
+    """
+    x, y, size, groups = lod_columns(params)
+    if len(df) <= max_points or not all(pd.api.types.is_numeric_dtype(df[col]) for col in (x, y)):
+        return df
+    ordered = df.sort_values(size, ascending=False) if size else df
+    reduced = df
+    while bins >= 2:
+        cells = [ordered[col] for col in groups] + [_cell(ordered[x], bins), _cell(ordered[y], bins)]
+        reduced = ordered[~pd.concat(cells, axis=1).duplicated()]
+        if len(reduced) <= max_points:
+            break
+        bins //= 2
+    # Keep the original row order (frames and categories plot in that order)
+    return reduced.sort_index()
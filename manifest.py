@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from etl import DATASETS, quarter_files, state_name, extract_files, merge_chunks
+from loader import load_frames
+
+MANIFEST_TABLE = "etl_manifest"
+
+def create_manifest_table(conn):
+    """Create the manifest of processed pulse files if it doesn't exist"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+            path VARCHAR(512) PRIMARY KEY,
+            dataset VARCHAR(50) NOT NULL,
+            state VARCHAR(100) NOT NULL,
+            year INT NOT NULL,
+            quarter INT NOT NULL,
+            size BIGINT NOT NULL,
+            mtime_ns BIGINT NOT NULL,
+            content_hash CHAR(64) NOT NULL,
+            loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.close()
+
+def read_manifest(conn):
+    """Manifest rows as {path: {dataset, state, year, quarter, size, mtime_ns, content_hash}}"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(f"SELECT path, dataset, state, year, quarter, size, mtime_ns, content_hash FROM {MANIFEST_TABLE}")
+    manifest = {row.pop("path"): row for row in cursor.fetchall()}
+    cursor.close()
+    return manifest
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def scan_pulse_tree(pulse_root, datasets=None):
+    """Stat every year/quarter.json of the given datasets as {relative path: entry}"""
+    files = {}
+    for dataset in datasets or DATASETS:
+        base_path = os.path.join(pulse_root, DATASETS[dataset]["path"])
+        if not os.path.isdir(base_path):
+            continue
+        for state_dir in sorted(os.listdir(base_path)):
+            state_path = os.path.join(base_path, state_dir)
+            if not os.path.isdir(state_path):
+                continue
+            state = state_name(state_dir)
+            for year, quarter, file_path in quarter_files(state_path):
+                stat = os.stat(file_path)
+                # Relative paths keep the manifest valid when the checkout moves
+                files[os.path.relpath(file_path, pulse_root).replace(os.sep, "/")] = {
+                    "dataset": dataset, "state": state, "year": year, "quarter": quarter,
+                    "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "file_path": file_path,
+                }
+    return files
+
+def plan_changes(files, manifest, full=False):
+    """Split scanned files into (changed, touched, removed) against the manifest.
+
+    A file whose size and mtime match its manifest row is skipped without being
+    read. Otherwise it is hashed: a new hash means it is reloaded (changed), an
+    equal hash only refreshes the stored size and mtime (touched).
+    """
+    changed, touched = {}, {}
+    for path, entry in files.items():
+        known = manifest.get(path)
+        if not full and known and known["size"] == entry["size"] and known["mtime_ns"] == entry["mtime_ns"]:
+            continue
+        entry["content_hash"] = file_hash(entry["file_path"])
+        if not full and known and known["content_hash"] == entry["content_hash"]:
+            touched[path] = entry
+        else:
+            changed[path] = entry
+    datasets = {entry["dataset"] for entry in files.values()}
+    removed = {
+        path: known for path, known in manifest.items()
+        if path not in files and known["dataset"] in datasets
+    }
+    return changed, touched, removed
+
+def _record(conn, entries):
+    cursor = conn.cursor()
+    for path, entry in entries.items():
+        cursor.execute(f"""
+            INSERT INTO {MANIFEST_TABLE} (path, dataset, state, year, quarter, size, mtime_ns, content_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE size = VALUES(size), mtime_ns = VALUES(mtime_ns),
+                content_hash = VALUES(content_hash), loaded_at = CURRENT_TIMESTAMP
+        """, (path, entry["dataset"], entry["state"], entry["year"], entry["quarter"],
+              entry["size"], entry["mtime_ns"], entry["content_hash"]))
+    cursor.close()
+
+def _forget(conn, paths):
+    cursor = conn.cursor()
+    for path in paths:
+        cursor.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE path = %s", (path,))
+    cursor.close()
+
+def incremental_load(conn, pulse_root, datasets=None, full=False, dry_run=False, method="insert"):
+    """Parse and load only the pulse files that are new or changed since the last run.
+
+    Each affected (state, year, quarter) partition is replaced: its old rows are
+    deleted and the re-extracted rows inserted in one transaction per table,
+    with the secondary indexes kept in place rather than rebuilt.
+    A file that fails to parse keeps its old rows and stays out of the manifest,
+    so the next run retries it.
+    Rollups are refreshed for the affected periods and the data version bumped.
+    """
+    start = time.perf_counter()
+    create_manifest_table(conn)
+    files = scan_pulse_tree(pulse_root, datasets)
+    changed, touched, removed = plan_changes(files, read_manifest(conn), full)
+    print(f"{len(files):,} files scanned: {len(changed):,} new or changed, "
+          f"{len(touched):,} touched only, {len(removed):,} removed.")
+    if dry_run:
+        for path in sorted(changed):
+            print(f"  load    {path}")
+        for path in sorted(removed):
+            print(f"  remove  {path}")
+        return {"changed": changed, "touched": touched, "removed": removed, "failed": [], "results": []}
+
+    frames, replace, bad_files = {}, {}, set()
+    for dataset in DATASETS:
+        entries = [entry for entry in changed.values() if entry["dataset"] == dataset]
+        gone = [entry for entry in removed.values() if entry["dataset"] == dataset]
+        if entries:
+            frame, bad = extract_files(dataset, [
+                (entry["state"], entry["year"], entry["quarter"], entry["file_path"]) for entry in entries
+            ])
+            bad_files.update(bad)
+            entries = [entry for entry in entries if entry["file_path"] not in bad_files]
+        else:
+            frame = merge_chunks(dataset, [])
+        if not entries and not gone:
+            continue
+        frames[dataset] = frame
+        replace[dataset] = sorted({(entry["state"], entry["year"], entry["quarter"]) for entry in entries + gone})
+
+    failed = sorted(path for path, entry in changed.items() if entry["file_path"] in bad_files)
+    if failed:
+        print(f"{len(failed):,} files failed to parse; their old rows are kept and the next run retries them.")
+    results = load_frames(conn, frames, method, replace=replace, defer_indexes=False) if frames else []
+    _record(conn, {path: entry for path, entry in changed.items() if path not in failed})
+    _record(conn, touched)
+    _forget(conn, removed)
+    conn.commit()
+    print(f"Incremental load finished in {time.perf_counter() - start:.2f}s.")
+    return {"changed": changed, "touched": touched, "removed": removed, "failed": failed, "results": results}
+
+def main():
+    """Load new or changed pulse files, e.g. `python manifest.py pulse/data`"""
+    parser = argparse.ArgumentParser(description="Incrementally load the PhonePe Pulse JSON tree into MySQL")
+    parser.add_argument("pulse_root", help="Path to the pulse/data directory")
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS), help="Only consider this dataset")
+    parser.add_argument("--full", action="store_true", help="Reload every file regardless of the manifest")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be loaded without touching the tables")
+    parser.add_argument("--method", choices=["insert", "infile"], default="insert")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME,
+            allow_local_infile=args.method == "infile"
+        )
+        incremental_load(connection, args.pulse_root, args.dataset, args.full, args.dry_run, args.method)
+        connection.close()
+    except (Error, ValueError) as e:
+        print(f"Error in incremental load: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from query_cache import bump_data_version
+
+TABLE_VERSIONS_TABLE = "table_versions"
+MATERIALIZED_STATE_TABLE = "materialized_state"
+
+# Intermediate results of the heavy case-study CTEs, stored as tables. "inputs"
+# are the tables each one reads (base tables or other materialized results);
+# it is rebuilt only when one of their versions moved since its last build.
+MATERIALIZED = {
+    "mv_yearly_registrations": {
+        "inputs": ["map_user"],
+        "index": ["state", "year"],
+        "sql": """
+            SELECT state, year, SUM(registered_users) AS yearly_users
+            FROM map_user
+            GROUP BY state, year
+        """,
+    },
+    "mv_registration_trends": {
+        "inputs": ["map_user"],
+        "index": ["state", "year", "quarter"],
+        "sql": """
+            SELECT
+                state, year, quarter,
+                SUM(registered_users) AS total_registrations,
+                SUM(app_opens) AS total_app_opens,
+                COUNT(DISTINCT district) AS active_districts
+            FROM map_user
+            GROUP BY state, year, quarter
+        """,
+    },
+    "mv_transaction_metrics": {
+        "inputs": ["map_transaction"],
+        "index": ["state", "year", "quarter"],
+        "sql": """
+            SELECT
+                state, year, quarter,
+                SUM(transaction_count) AS total_transactions,
+                SUM(transaction_amount) AS total_amount,
+                SUM(transaction_count)/COUNT(DISTINCT district) AS avg_transactions_per_district
+            FROM map_transaction
+            GROUP BY state, year, quarter
+        """,
+    },
+    "mv_device_distribution": {
+        "inputs": ["aggregated_user"],
+        "index": ["state", "year", "quarter"],
+        "sql": """
+            SELECT
+                state, year, quarter, brand,
+                SUM(device_count) AS total_devices,
+                SUM(device_count*device_percentage)/SUM(device_count) AS weighted_percentage
+            FROM aggregated_user
+            GROUP BY state, year, quarter, brand
+        """,
+    },
+    "mv_dominant_brands": {
+        "inputs": ["mv_device_distribution"],
+        "index": ["state", "year", "quarter"],
+        "sql": """
+            SELECT DISTINCT
+                state, year, quarter,
+                FIRST_VALUE(brand) OVER (
+                    PARTITION BY state, year, quarter
+                    ORDER BY total_devices DESC
+                ) AS top_brand,
+                FIRST_VALUE(weighted_percentage) OVER (
+                    PARTITION BY state, year, quarter
+                    ORDER BY total_devices DESC
+                ) AS top_brand_percentage
+            FROM mv_device_distribution
+        """,
+    },
+    "mv_insurance_adoption": {
+        "inputs": ["map_insurance"],
+        "index": ["state", "year", "quarter"],
+        "sql": """
+            SELECT
+                state, year, quarter,
+                SUM(policy_count) AS total_policies,
+                SUM(insured_amount) AS total_insured_amount,
+                COUNT(DISTINCT district) AS districts_with_insurance
+            FROM map_insurance
+            GROUP BY state, year, quarter
+        """,
+    },
+}
+
+def build_order(names=None):
+    """Materialized results in dependency order (inputs before the results reading them)"""
+    order = []
+
+    def visit(name):
+        if name in order:
+            return
+        for source in MATERIALIZED[name]["inputs"]:
+            if source in MATERIALIZED:
+                visit(source)
+        order.append(name)
+
+    for name in names or MATERIALIZED:
+        visit(name)
+    return order
+
+def create_state_tables(conn):
+    """Create the table-version and materialization bookkeeping tables if they don't exist"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_VERSIONS_TABLE} (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MATERIALIZED_STATE_TABLE} (
+            name VARCHAR(64) PRIMARY KEY,
+            input_versions TEXT NOT NULL,
+            row_count BIGINT,
+            seconds DOUBLE,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.close()
+
+def mark_changed(conn, tables):
+    """Bump the version of tables whose rows changed; call after every load"""
+    create_state_tables(conn)
+    cursor = conn.cursor()
+    for table in tables:
+        cursor.execute(f"""
+            INSERT INTO {TABLE_VERSIONS_TABLE} (table_name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+        """, (table,))
+    conn.commit()
+    cursor.close()
+
+def _table_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT table_name, version FROM {TABLE_VERSIONS_TABLE}")
+    versions = dict(cursor.fetchall())
+    cursor.close()
+    return versions
+
+def _built_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT name, input_versions FROM {MATERIALIZED_STATE_TABLE}")
+    built = {name: json.loads(inputs) for name, inputs in cursor.fetchall()}
+    cursor.close()
+    return built
+
+def _exists(conn, name):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (name,)
+    )
+    (count,) = cursor.fetchone()
+    cursor.close()
+    return count > 0
+
+def stale(conn):
+    """Names whose table is missing or whose inputs changed since it was built, in build order"""
+    versions = _table_versions(conn)
+    built = _built_versions(conn)
+    result = []
+    for name in build_order():
+        current = {table: versions.get(table, 0) for table in MATERIALIZED[name]["inputs"]}
+        # An input rebuilt earlier in this pass counts as changed too
+        if name not in built or built[name] != current or not _exists(conn, name) \
+                or any(table in result for table in MATERIALIZED[name]["inputs"]):
+            result.append(name)
+    return result
+
+def rebuild(conn, name):
+    """Rebuild one materialized table beside the live one and swap it in atomically"""
+    spec = MATERIALIZED[name]
+    start = time.perf_counter()
+    versions = _table_versions(conn)
+    input_versions = {table: versions.get(table, 0) for table in spec["inputs"]}
+
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {name}__new, {name}__old")
+    cursor.execute(f"CREATE TABLE {name}__new (INDEX idx_{name} ({', '.join(spec['index'])})) AS {spec['sql']}")
+    if _exists(conn, name):
+        cursor.execute(f"RENAME TABLE {name} TO {name}__old, {name}__new TO {name}")
+        cursor.execute(f"DROP TABLE {name}__old")
+    else:
+        cursor.execute(f"RENAME TABLE {name}__new TO {name}")
+    cursor.execute(f"SELECT COUNT(*) FROM {name}")
+    (row_count,) = cursor.fetchone()
+    seconds = time.perf_counter() - start
+    cursor.execute(f"""
+        INSERT INTO {MATERIALIZED_STATE_TABLE} (name, input_versions, row_count, seconds)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE input_versions = VALUES(input_versions),
+            row_count = VALUES(row_count), seconds = VALUES(seconds)
+    """, (name, json.dumps(input_versions, sort_keys=True), row_count, seconds))
+    conn.commit()
+    cursor.close()
+    # Results built on this one see it as a changed input
+    mark_changed(conn, [name])
+    return {"name": name, "rows": row_count, "seconds": seconds}
+
+def refresh_materialized(conn, force=False):
+    """Rebuild the materialized tables whose inputs changed (all of them with force)"""
+    create_state_tables(conn)
+    names = build_order() if force else stale(conn)
+    return [rebuild(conn, name) for name in names]
+
+def main():
+    """Rebuild stale materialized case-study tables, e.g. from cron: `python materialize.py`"""
+    parser = argparse.ArgumentParser(description="Refresh the materialized case-study tables")
+    parser.add_argument("--force", action="store_true", help="Rebuild every table, changed inputs or not")
+    parser.add_argument("--status", action="store_true", help="Only list the tables that need a rebuild")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME
+        )
+        create_state_tables(connection)
+        if args.status:
+            names = stale(connection)
+            print("Stale: " + ", ".join(names) if names else "All materialized tables are up to date.")
+        else:
+            results = refresh_materialized(connection, args.force)
+            for result in results:
+                print(f"Rebuilt {result['name']}: {result['rows']:,} rows in {result['seconds']:.2f}s")
+            if results:
+                bump_data_version(connection)
+            else:
+                print("All materialized tables are up to date.")
+        connection.close()
+    except Error as e:
+        print(f"Error refreshing materialized tables: {e}")
+
+if __name__ == "__main__":
+    main()
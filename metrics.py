@@ -0,0 +1,230 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from query_cache import normalize_sql, estimate_size
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+_local = threading.local()
+
+def fingerprint_sql(query):
+    """Short stable id for a query shape: literals become ? before hashing"""
+    shape = normalize_sql(query)
+    shape = re.sub(r"'(?:[^'\\]|\\.)*'", "?", shape)
+    shape = re.sub(r"\b\d+(?:\.\d+)?\b", "?", shape)
+    return hashlib.sha1(shape.lower().encode("utf-8")).hexdigest()[:12]
+
+@contextmanager
+def phase(name):
+    """Time a step of the query being measured on this thread (no-op outside measure_query)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span = getattr(_local, "span", None)
+        if span is not None:
+            span[name] = span.get(name, 0.0) + time.perf_counter() - start
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+
+    def lines(self, name, **labels):
+        out = []
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            out.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        out.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {self.count}")
+        out.append(f"{name}_sum{_labels(**labels)} {self.sum:.6f}")
+        out.append(f"{name}_count{_labels(**labels)} {self.count}")
+        return out
+
+class Metrics:
+    """Process-wide timings of queries, figure builds and page renders.
+
+    Totals are kept per SQL fingerprint, viz type and page, the latest events in
+    a bounded list for the debug panel, and everything is periodically written
+    to a Prometheus text file (e.g. for node_exporter's textfile collector).
+    """
+
+    def __init__(self, path=None, flush_interval=15, recent=200):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self._queries = {}
+        self._figures = {}
+        self._pages = {}
+        self._flushed_at = time.monotonic()
+
+    def begin_page(self, name):
+        """Attribute the queries of this thread to a page and start timing its render"""
+        _local.page = name
+        _local.page_start = time.perf_counter()
+
+    def end_page(self):
+        name = getattr(_local, "page", None)
+        if name is None:
+            return
+        seconds = time.perf_counter() - _local.page_start
+        _local.page = None
+        with self._lock:
+            self._pages.setdefault(name, _Histogram()).observe(seconds)
+        self.flush_if_due()
+
+    def current_page(self):
+        """Page being rendered on this thread, to attribute work handed to other threads"""
+        return getattr(_local, "page", None)
+
+    def measure_query(self, query, loader, page=None):
+        """Run loader() for a query, recording total, DB and fetch time, rows and bytes"""
+        previous, _local.span = getattr(_local, "span", None), {}
+        start = time.perf_counter()
+        try:
+            result = loader()
+        finally:
+            span, _local.span = _local.span, previous
+        seconds = time.perf_counter() - start
+        self.record_query(query, seconds, span, result, page)
+        return result
+
+    def record_query(self, query, seconds, span, result, page=None):
+        fingerprint = fingerprint_sql(query)
+        rows = len(result) if result is not None else 0
+        size = estimate_size(result) if result is not None else 0
+        event = {
+            "time": time.strftime("%H:%M:%S"),
+            "kind": "query",
+            "page": page or getattr(_local, "page", None) or "background",
+            "name": fingerprint,
+            "total_ms": seconds * 1000,
+            "db_ms": span.get("db", 0.0) * 1000,
+            "fetch_ms": span.get("fetch", 0.0) * 1000,
+            "rows": rows,
+            "bytes": size,
+            "sql": normalize_sql(query)[:200],
+        }
+        with self._lock:
+            stats = self._queries.get(fingerprint)
+            if stats is None:
+                stats = self._queries[fingerprint] = {
+                    "latency": _Histogram(), "db": 0.0, "fetch": 0.0, "rows": 0, "bytes": 0, "sql": event["sql"],
+                }
+            stats["latency"].observe(seconds)
+            stats["db"] += span.get("db", 0.0)
+            stats["fetch"] += span.get("fetch", 0.0)
+            stats["rows"] += rows
+            stats["bytes"] += size
+            self._recent.append(event)
+        self.flush_if_due()
+
+    def record_figure(self, viz_type, seconds, cached):
+        with self._lock:
+            stats = self._figures.setdefault(viz_type, {"build": _Histogram(), "hits": 0})
+            if cached:
+                stats["hits"] += 1
+            else:
+                stats["build"].observe(seconds)
+            self._recent.append({
+                "time": time.strftime("%H:%M:%S"),
+                "kind": "figure (cached)" if cached else "figure",
+                "page": getattr(_local, "page", None) or "background",
+                "name": viz_type,
+                "total_ms": seconds * 1000,
+            })
+
+    def recent(self):
+        with self._lock:
+            return list(self._recent)
+
+    def slowest_queries(self, limit=10):
+        """Fingerprints ordered by total time spent, as dicts for display"""
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": fingerprint,
+                    "calls": stats["latency"].count,
+                    "total_ms": stats["latency"].sum * 1000,
+                    "avg_ms": stats["latency"].sum * 1000 / stats["latency"].count,
+                    "db_ms": stats["db"] * 1000,
+                    "fetch_ms": stats["fetch"] * 1000,
+                    "rows": stats["rows"],
+                    "bytes": stats["bytes"],
+                    "sql": stats["sql"],
+                }
+                for fingerprint, stats in self._queries.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)[:limit]
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            lines += ["# HELP phonepe_query_duration_seconds Query load time on a cache miss",
+                      "# TYPE phonepe_query_duration_seconds histogram"]
+            for fingerprint, stats in self._queries.items():
+                lines += stats["latency"].lines("phonepe_query_duration_seconds", fingerprint=fingerprint)
+            for metric, key, help_text in [
+                ("phonepe_query_db_seconds_total", "db", "Time spent executing queries on the database"),
+                ("phonepe_query_fetch_seconds_total", "fetch", "Time spent fetching and converting results"),
+                ("phonepe_query_rows_total", "rows", "Rows returned"),
+                ("phonepe_query_bytes_total", "bytes", "Approximate in-memory size of results"),
+            ]:
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for fingerprint, stats in self._queries.items():
+                    lines.append(f"{metric}{_labels(fingerprint=fingerprint)} {stats[key]}")
+            lines += ["# HELP phonepe_figure_build_seconds Figure construction time on a figure cache miss",
+                      "# TYPE phonepe_figure_build_seconds histogram"]
+            for viz_type, stats in self._figures.items():
+                lines += stats["build"].lines("phonepe_figure_build_seconds", viz_type=viz_type)
+            lines += ["# HELP phonepe_figure_cache_hits_total Figures served from the figure cache",
+                      "# TYPE phonepe_figure_cache_hits_total counter"]
+            for viz_type, stats in self._figures.items():
+                lines.append(f"phonepe_figure_cache_hits_total{_labels(viz_type=viz_type)} {stats['hits']}")
+            lines += ["# HELP phonepe_page_render_seconds Full script run time per page",
+                      "# TYPE phonepe_page_render_seconds histogram"]
+            for page, histogram in self._pages.items():
+                lines += histogram.lines("phonepe_page_render_seconds", page=page)
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Rewrite the metrics file in place; a rename keeps scrapers from reading half a file"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, self.path)
+
+    def flush_if_due(self):
+        now = time.monotonic()
+        with self._lock:
+            if not self.path or now - self._flushed_at < self.flush_interval:
+                return
+            self._flushed_at = now
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"Error writing metrics file: {e}")
@@ -0,0 +1,141 @@
+import re
+
+import pandas as pd
+
+# Filter conditions offered on result tables, as SQL over a result column and one bound value
+FILTER_OPERATORS = {
+    "contains": "LOWER(CAST({col} AS CHAR)) LIKE LOWER(%s)",
+    "equals": "CAST({col} AS CHAR) = %s",
+    ">=": "{col} >= %s",
+    "<=": "{col} <= %s",
+}
+NUMERIC_OPERATORS = (">=", "<=")
+
+def _top_level(sql):
+    """Per-character flag: outside parentheses, quotes and -- comments"""
+    flags = []
+    depth, quote, comment = 0, None, False
+    for i, ch in enumerate(sql):
+        if comment:
+            comment = ch != "\n"
+        elif quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif sql.startswith("--", i):
+            comment = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        flags.append(depth == 0 and not quote and not comment)
+    return flags
+
+def split_order_by(query):
+    """Split a statement's final ORDER BY off as (statement, order clause or None).
+
+    A trailing LIMIT keeps the ORDER BY in place (it picks the rows); the clause
+    is still returned so the paged outer query can repeat the same order.
+    Qualified names like rt.year become plain output column names.
+    """
+    sql = query.strip().rstrip(";").rstrip()
+    flags = _top_level(sql)
+    matches = [m for m in re.finditer(r"\bORDER\s+BY\b", sql, re.IGNORECASE) if flags[m.start()]]
+    if not matches:
+        return sql, None
+    start = matches[-1].start()
+    limit = [m for m in re.finditer(r"\bLIMIT\b", sql[start:], re.IGNORECASE) if flags[start + m.start()]]
+    clause_end = start + limit[0].start() if limit else len(sql)
+    clause = sql[matches[-1].end():clause_end]
+    clause = re.sub(r"--[^\n]*", "", clause)
+    clause = re.sub(r"\b\w+\.(\w+)\b", r"\1", " ".join(clause.split())).rstrip(";").strip()
+    inner = sql if limit else sql[:start].rstrip()
+    return inner, clause or None
+
+def _wrap(inner):
+    # The newline keeps a trailing -- comment from swallowing the closing parenthesis
+    return f"SELECT * FROM (\n{inner}\n) AS result"
+
+def column_probe_sql(query):
+    """Statement returning no rows but the result's columns"""
+    inner, _ = split_order_by(query)
+    return f"{_wrap(inner)} LIMIT 0"
+
+def numeric_columns(df):
+    """Columns of a result frame that hold numbers, from its dtypes (also set on an empty probe)"""
+    return [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+def _where(columns, filters, numeric=None):
+    """WHERE clause and values for filters; numeric lists the columns the numeric operators may compare"""
+    conditions, values = [], []
+    for column, operator, value in filters:
+        if column not in columns or not re.fullmatch(r"\w+", column):
+            raise ValueError(f"Unknown column: {column}")
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter: {operator}")
+        if operator in NUMERIC_OPERATORS:
+            if numeric is not None and column not in numeric:
+                raise ValueError(f"{column} is not a numeric column")
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"'{value}' is not a number")
+        elif operator == "contains":
+            value = f"%{value}%"
+        conditions.append(FILTER_OPERATORS[operator].format(col=column))
+        values.append(value)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), values
+
+def filter_frame(df, filters=()):
+    """In-memory counterpart of the WHERE clause built for filters"""
+    _where(list(df.columns), filters, numeric_columns(df))
+    for column, operator, value in filters:
+        values = df[column]
+        if operator == "contains":
+            df = df[values.astype(str).str.contains(str(value), case=False, regex=False)]
+        elif operator == "equals":
+            df = df[values.astype(str) == str(value)]
+        elif operator == ">=":
+            df = df[values >= float(value)]
+        else:
+            df = df[values <= float(value)]
+    return df
+
+def page_frame(df, sort=None, descending=False, page=0, page_size=50):
+    """One page of an in-memory result, sorted stably so the result's own order breaks ties"""
+    if sort is not None:
+        if sort not in df.columns:
+            raise ValueError(f"Unknown column: {sort}")
+        df = df.sort_values(sort, ascending=not descending, kind="stable")
+    start = int(page) * int(page_size)
+    return df.iloc[start:start + int(page_size)]
+
+def count_statement(query, params, columns, filters=(), numeric=None):
+    """(sql, params) counting the filtered rows of a query"""
+    inner, _ = split_order_by(query)
+    where, values = _where(columns, filters, numeric)
+    return f"SELECT COUNT(*) AS total FROM (\n{inner}\n) AS result{where}", list(params or []) + values
+
+def page_statement(query, params, columns, sort=None, descending=False, filters=(), page=0, page_size=50,
+                   numeric=None):
+    """(sql, params) for one page of a query's result, sorted and filtered in SQL.
+
+    The query's own ORDER BY (or else the first column) breaks ties after the
+    chosen sort column, so pages stay stable between requests.
+    """
+    inner, default_order = split_order_by(query)
+    where, values = _where(columns, filters, numeric)
+    order = []
+    if sort is not None:
+        if sort not in columns or not re.fullmatch(r"\w+", sort):
+            raise ValueError(f"Unknown column: {sort}")
+        order.append(f"{sort} {'DESC' if descending else 'ASC'}")
+    if default_order:
+        order.append(default_order)
+    else:
+        # Without any order, LIMIT/OFFSET pages may overlap between requests
+        order.append("1")
+    order_by = f" ORDER BY {', '.join(order)}" if order else ""
+    sql = f"{_wrap(inner)}{where}{order_by} LIMIT %s OFFSET %s"
+    return sql, list(params or []) + values + [int(page_size), int(page) * int(page_size)]
@@ -0,0 +1,176 @@
+import argparse
+import json
+import re
+import sys
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from indexes import explain
+from query_cache import normalize_sql
+from queries import registered_queries
+
+PLAN_BASELINE_FILE = "plan_baseline.json"
+
+# EXPLAIN access types from best to worst
+ACCESS_TYPES = [
+    "system", "const", "eq_ref", "ref", "fulltext", "ref_or_null", "index_merge",
+    "unique_subquery", "index_subquery", "range", "index", "ALL",
+]
+
+# Flags that fail a check when a query gains them
+FLAGS = {
+    "full_scan": "full table scan",
+    "temporary": "temporary table",
+    "filesort": "filesort",
+    "subquery": "uncorrelated subquery (materialized once per execution)",
+    "dependent_subquery": "correlated subquery re-run per outer row",
+    "repeated_subquery": "same subquery text appears more than once",
+}
+
+def _rank(access_type):
+    return ACCESS_TYPES.index(access_type) if access_type in ACCESS_TYPES else -1
+
+def _subqueries(sql):
+    """Text of every parenthesized SELECT in a statement, normalized"""
+    found = []
+    for match in re.finditer(r"\(\s*SELECT\b", sql, re.IGNORECASE):
+        depth = 0
+        for i in range(match.start(), len(sql)):
+            if sql[i] == "(":
+                depth += 1
+            elif sql[i] == ")":
+                depth -= 1
+                if depth == 0:
+                    found.append(normalize_sql(sql[match.start():i + 1]).lower())
+                    break
+    return found
+
+def _analyze(conn, sql, params=None):
+    """Actual time (ms) and rows of the root node from EXPLAIN ANALYZE (MySQL 8.0.18+)"""
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN ANALYZE " + sql.strip().rstrip(";"), params)
+    text = "\n".join(row[0] for row in cursor.fetchall())
+    cursor.close()
+    match = re.search(r"actual time=[\d.]+\.\.([\d.]+) rows=([\d.]+) loops=(\d+)", text)
+    if not match:
+        return None
+    return {"actual_ms": float(match.group(1)) * int(match.group(3)), "actual_rows": float(match.group(2))}
+
+def audit_query(conn, sql, params=None, analyze=False):
+    """Plan summary of one statement: access type per table, estimated rows and flags"""
+    rows = explain(conn, sql, params)
+    access, flags, estimated_rows = {}, set(), 0
+    for row in rows:
+        table = row.get("table") or "-"
+        access_type = row.get("type")
+        extra = row.get("Extra") or ""
+        select_type = row.get("select_type") or ""
+        if access_type:
+            # Keep the worst access if a table is read more than once
+            previous = access.get(table)
+            if previous is None or _rank(access_type) > _rank(previous):
+                access[table] = access_type
+        # <derivedN>/<subqueryN> scans read already-materialized intermediates
+        if access_type == "ALL" and not table.startswith("<"):
+            flags.add("full_scan")
+        if "Using temporary" in extra:
+            flags.add("temporary")
+        if "Using filesort" in extra:
+            flags.add("filesort")
+        if select_type == "SUBQUERY":
+            flags.add("subquery")
+        if select_type in ("DEPENDENT SUBQUERY", "UNCACHEABLE SUBQUERY"):
+            flags.add("dependent_subquery")
+        estimated_rows += int(row.get("rows") or 0)
+    subqueries = _subqueries(sql)
+    if len(subqueries) != len(set(subqueries)):
+        flags.add("repeated_subquery")
+    result = {"access": access, "flags": sorted(flags), "estimated_rows": estimated_rows}
+    if analyze:
+        result.update(_analyze(conn, sql, params) or {})
+    return result
+
+def audit(conn, analyze=False):
+    """Audit every registered query as {name: plan summary}; failures are recorded as errors"""
+    results = {}
+    for name, sql, params in registered_queries():
+        try:
+            results[name] = audit_query(conn, sql, params, analyze)
+        except Error as e:
+            results[name] = {"error": str(e)}
+    return results
+
+def regressions(current, baseline, tolerance=2.0):
+    """Plans that got worse than the baseline: new flags, worse access types, row estimates beyond tolerance"""
+    problems = []
+    for name, plan in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if "error" in plan:
+            if "error" not in before:
+                problems.append(f"{name}: EXPLAIN now fails ({plan['error']})")
+            continue
+        if "error" in before:
+            continue
+        for flag in sorted(set(plan["flags"]) - set(before["flags"])):
+            problems.append(f"{name}: new {FLAGS[flag]}")
+        for table, access_type in plan["access"].items():
+            old = before["access"].get(table)
+            if old is not None and _rank(access_type) > _rank(old) >= 0:
+                problems.append(f"{name}: {table} access {old} -> {access_type}")
+        if before["estimated_rows"] and plan["estimated_rows"] > before["estimated_rows"] * tolerance:
+            problems.append(f"{name}: estimated rows {before['estimated_rows']:,} -> {plan['estimated_rows']:,}")
+    return problems
+
+def print_report(results):
+    for name, plan in results.items():
+        if "error" in plan:
+            print(f"{name}\n    error: {plan['error']}")
+            continue
+        access = ", ".join(f"{table}:{access_type}" for table, access_type in plan["access"].items()) or "-"
+        timing = f", {plan['actual_ms']:.1f} ms actual" if "actual_ms" in plan else ""
+        print(f"{name}\n    {access} (~{plan['estimated_rows']:,} rows{timing})")
+        for flag in plan["flags"]:
+            print(f"    ! {FLAGS[flag]}")
+
+def main():
+    """Audit query plans, e.g. `python plan_audit.py baseline` once, then `python plan_audit.py check` in CI"""
+    parser = argparse.ArgumentParser(description="EXPLAIN every registered dashboard query and flag costly plans")
+    parser.add_argument("command", choices=["report", "baseline", "check"])
+    parser.add_argument("--baseline", default=PLAN_BASELINE_FILE, help="Baseline plan file to write or compare against")
+    parser.add_argument("--analyze", action="store_true", help="Also run EXPLAIN ANALYZE for actual times")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="Allowed growth factor of estimated rows")
+    args = parser.parse_args()
+
+    try:
+        connection = mysql.connector.connect(host=DB_HOST, user=DB_USER, password=DB_PASS, database=DB_NAME)
+    except Error as e:
+        print(f"Error connecting to MySQL: {e}")
+        sys.exit(1)
+    results = audit(connection, args.analyze)
+    connection.close()
+
+    if args.command == "report":
+        print_report(results)
+    elif args.command == "baseline":
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Plans of {len(results)} queries saved to {args.baseline}")
+    else:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except OSError as e:
+            print(f"Error reading baseline: {e}")
+            sys.exit(1)
+        problems = regressions(results, baseline, args.tolerance)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} plan regression(s) found." if problems else "No plan regressions.")
+        sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
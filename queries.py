@@ -0,0 +1,753 @@
+# SQL behind every page of the dashboard. The definitions live here rather than
+# inside the page functions so the maintenance tools can enumerate them.
+
+# Dashboard
+KEY_METRICS_QUERY = """
+    SELECT
+        (SELECT SUM(count) FROM rollup_transaction_period) as total_transactions,
+        (SELECT SUM(amount) FROM rollup_transaction_period) as total_amount,
+        (SELECT SUM(registered_users) FROM rollup_user_period) as total_users
+"""
+
+DASHBOARD_QUERIES = {
+    "Transaction Type Distribution": """
+        SELECT transaction_type, SUM(count) as total
+        FROM rollup_transaction_type
+        GROUP BY transaction_type
+        ORDER BY total DESC
+    """,
+    "Top 10 Device Brands": """
+        SELECT brand, SUM(device_count) as total
+        FROM rollup_user_brand
+        GROUP BY brand
+        ORDER BY total DESC
+        LIMIT 10
+    """,
+    "Quarterly Transaction Trends": """
+        SELECT year, quarter, SUM(count) as transactions, SUM(amount) as amount
+        FROM rollup_transaction_period
+        GROUP BY year, quarter
+        ORDER BY year, quarter
+    """
+}
+
+# Transaction Analysis
+TRANSACTION_QUERIES = {
+    "Quarterly Transaction Growth": """
+        SELECT year, quarter, SUM(count) as total_transactions, 
+        SUM(amount) as total_amount
+        FROM rollup_transaction_period
+        GROUP BY year, quarter
+        ORDER BY year, quarter
+    """,
+    "Top 10 States by Transaction Volume": """
+        SELECT name as state, value as total_transactions
+        FROM topk_index
+        WHERE level = 'states' AND metric = 'transactions' AND year = 0 AND quarter = 0
+        ORDER BY total_transactions DESC
+        LIMIT 10
+    """,
+    "Top 10 Districts by Transaction Amount": """
+        SELECT name as district, value as total_amount
+        FROM topk_index
+        WHERE level = 'districts' AND metric = 'amount' AND year = 0 AND quarter = 0
+        ORDER BY total_amount DESC
+        LIMIT 10
+    """,
+    "Transaction Type Distribution": """
+        SELECT transaction_type, SUM(count) as total_transactions,
+        SUM(amount) as total_amount
+        FROM rollup_transaction_type
+        GROUP BY transaction_type
+        ORDER BY total_transactions DESC
+    """,
+    "Year-on-Year Growth": """
+        SELECT year, SUM(count) as total_transactions,
+        SUM(amount) as total_amount
+        FROM rollup_transaction_period
+        GROUP BY year
+        ORDER BY year
+    """
+}
+
+# User Analysis
+USER_QUERIES = {
+    "Top 10 States by Registered Users": """
+        SELECT name as state, value as total_users
+        FROM topk_index
+        WHERE level = 'states' AND metric = 'registered_users' AND year = 0 AND quarter = 0
+        ORDER BY total_users DESC
+        LIMIT 10
+    """,
+    "Top 10 Districts by App Opens": """
+        SELECT name as district, value as total_app_opens
+        FROM topk_index
+        WHERE level = 'districts' AND metric = 'app_opens' AND year = 0 AND quarter = 0
+        ORDER BY total_app_opens DESC
+        LIMIT 10
+    """,
+    "User Brand Distribution": """
+        SELECT brand, SUM(device_count) as user_count
+        FROM rollup_user_brand
+        GROUP BY brand
+        ORDER BY user_count DESC
+    """,
+    "User Growth by Quarter": """
+        SELECT year, quarter, SUM(registered_users) as new_users
+        FROM rollup_user_period
+        GROUP BY year, quarter
+        ORDER BY year, quarter
+    """,
+    "States with Highest User Engagement": """
+        SELECT name as state, denominator as total_users,
+        numerator as total_app_opens, value as engagement_ratio
+        FROM topk_index
+        WHERE level = 'states' AND metric = 'engagement' AND year = 0 AND quarter = 0
+        ORDER BY engagement_ratio DESC
+        LIMIT 10
+    """
+}
+
+# Geographical Analysis
+GEO_YEARS = [2018, 2019, 2020, 2021, 2022, 2023, 2024]
+GEO_QUARTERS = [1, 2, 3, 4]
+GEO_DEFAULT_YEAR = 2022
+GEO_DEFAULT_QUARTER = 4
+
+# Table and measure behind each Geographical Analysis metric
+GEO_METRICS = {
+    "Transaction Count": ("aggregated_transaction", "count"),
+    "Transaction Amount": ("aggregated_transaction", "amount"),
+    "Registered Users": ("aggregated_user", "registered_users"),
+    "App Opens": ("map_user", "app_opens"),
+    "Insurance Policies": ("aggregated_insurance", "count"),
+    "Insurance Amount": ("aggregated_insurance", "amount"),
+}
+GEO_ANALYSIS_TYPES = list(GEO_METRICS)
+
+# One fixed statement text per metric, so the server prepares each only once;
+# year and quarter are always bound as parameters
+GEO_QUERY_TEMPLATES = {
+    analysis_type: f"""
+        SELECT state, SUM({column}) as value
+        FROM {table}
+        WHERE year = %s AND quarter = %s
+        GROUP BY state
+    """
+    for analysis_type, (table, column) in GEO_METRICS.items()
+}
+
+# Quarterly trend shown under the insurance metrics
+GEO_TREND_QUERIES = {
+    analysis_type: f"""
+        SELECT year, quarter, SUM({column}) as value
+        FROM {table}
+        GROUP BY year, quarter
+        ORDER BY year, quarter
+    """
+    for analysis_type, (table, column) in GEO_METRICS.items()
+    if table == "aggregated_insurance"
+}
+
+def geo_query(analysis_type, year, quarter):
+    """Statement template and bound (year, quarter) parameters for one Geographical Analysis metric"""
+    if analysis_type not in GEO_QUERY_TEMPLATES:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+    return GEO_QUERY_TEMPLATES[analysis_type], (int(year), int(quarter))
+
+def geo_trend_query(analysis_type):
+    """Quarterly trend query shown under the insurance metrics"""
+    return GEO_TREND_QUERIES[analysis_type]
+
+# Top-N rankings, precomputed into topk_index by topk.py: level -> metric -> (rollup table, dimension, measure)
+TOP_N_METRICS = {
+    "states": {
+        "transactions": ("rollup_transaction_state", "state", "count"),
+        "amount": ("rollup_transaction_state", "state", "amount"),
+        "registered_users": ("rollup_user_state", "state", "registered_users"),
+        "app_opens": ("rollup_user_state", "state", "app_opens"),
+    },
+    "districts": {
+        "transactions": ("rollup_district_transaction", "district", "transaction_count"),
+        "amount": ("rollup_district_transaction", "district", "transaction_amount"),
+        "registered_users": ("rollup_district_user", "district", "registered_users"),
+        "app_opens": ("rollup_district_user", "district", "app_opens"),
+    },
+}
+# Rankings by a ratio of two measures: level -> metric -> (rollup table, dimension, numerator, denominator)
+TOP_N_RATIOS = {
+    "states": {
+        "engagement": ("rollup_user_state", "state", "app_opens", "registered_users"),
+    },
+}
+TOP_N_MAX = 100  # also the depth of topk_index
+TOP_N_ALL_TIME = (0, 0)  # year and quarter of the all-time rankings in topk_index
+
+def top_n_metrics():
+    """Yield (level, metric, rollup table, dimension, numerator, denominator or None) for every ranking"""
+    for level, metrics in TOP_N_METRICS.items():
+        for metric, (table, dimension, column) in metrics.items():
+            yield level, metric, table, dimension, column, None
+    for level, metrics in TOP_N_RATIOS.items():
+        for metric, spec in metrics.items():
+            yield (level, metric) + spec
+
+def top_n_query(level, metric, n=10, year=None, quarter=None):
+    """Statement and bound parameters reading the top n of a ranking from topk_index, over all periods or one"""
+    dimensions = {(level, metric): dimension for level, metric, _, dimension, _, _ in top_n_metrics()}
+    if (level, metric) not in dimensions:
+        raise ValueError(f"Unknown ranking: {level} by {metric}")
+    if (year is None) != (quarter is None):
+        raise ValueError("Give both year and quarter, or neither")
+    if not 1 <= int(n) <= TOP_N_MAX:
+        raise ValueError(f"n must be between 1 and {TOP_N_MAX}")
+    year, quarter = (int(year), int(quarter)) if year is not None else TOP_N_ALL_TIME
+    query = f"""
+        SELECT name as {dimensions[level, metric]}, value as total
+        FROM topk_index
+        WHERE level = %s AND metric = %s AND year = %s AND quarter = %s
+        ORDER BY rank_no
+        LIMIT %s
+    """
+    return query, (level, metric, year, quarter, int(n))
+
+# Business Case Studies: descriptions, SQL queries with their visualizations, and insights
+CASE_STUDIES = {
+    "1. Decoding Transaction Dynamics on PhonePe": {
+        "description": "Analyzing patterns and trends in user transactions to uncover key insights driving PhonePe's digital payment ecosystem.",
+        "queries": {
+            "State-wise Transaction Trends": {
+                "query": """
+                    SELECT 
+                        state,
+                        year,
+                        quarter,
+                        SUM(count) AS total_transactions,
+                        SUM(amount) AS total_transaction_value
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        state, year, quarter
+                    ORDER BY 
+                        state, year, quarter;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "State-wise Transaction Trends"}
+            },
+            "Quarter-wise Transaction Trends": {
+                "query": """
+                    SELECT 
+                        quarter,
+                        SUM(amount) AS total_value,
+                        SUM(count) AS total_count
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        quarter
+                    ORDER BY 
+                        quarter ASC;
+                """,
+                "viz_type": "dual_axis",
+                "viz_params": {"x_col": "quarter", "y_col1": "total_count", "y_col2": "total_value", "title": "Quarter-wise Transaction Trends","y_title1": "Transaction Count","y_title2": "Transaction Value (₹)"}
+            },
+            "Payment Category-wise Trends": {
+                "query": """
+                    SELECT 
+                        transaction_type,
+                        SUM(amount) AS total_value,
+                        SUM(count) AS total_count
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        transaction_type
+                    ORDER BY 
+                        total_value DESC;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "transaction_type", "y_col": "total_value", "title": "Payment Category-wise Trends"}
+            },
+            "State + Quarter Combination Analysis": {
+                "query": """
+                    SELECT 
+                        state,
+                        year,
+                        quarter,
+                        SUM(amount) AS total_value,
+                        SUM(count) AS total_count
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        state, quarter,year
+                    ORDER BY 
+                        state, quarter,year;
+                """,
+                "viz_type": "group_bar_1",
+                "viz_params": {"x_col": "state", "y_col": "total_value", "color": "year", "title": "Transaction Values by State, Year and Quarter"}
+            }
+        },
+        "insights": """
+            - Digital Commerce Leadership: Average transaction of ₹1.47K with Merchant Payments dominating indicates PhonePe has become essential infrastructure for everyday retail, from street vendors to small businesses across India.
+            - Economic Hub Concentration: Top states (Maharashtra, Karnataka, UP) align with major economic centers, while remote regions (Mizoram, Lakshadweep, Andaman) show significant growth potential in underserved markets.
+            - Mainstream Adoption: The moderate transaction value suggests successful penetration beyond urban elites into middle-class daily commerce, replacing cash for routine purchases and bill payments.
+        """
+    },
+    "2. User Engagement and Growth Strategy": {
+        "description": "Identifying user behavior patterns and strategic levers to enhance engagement, retention, and overall growth on the PhonePe platform.",
+        "queries": {
+            "State-wise Total Registered Users and App Opens": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(registered_users) AS total_registered_users,
+                        SUM(app_opens) AS total_app_opens
+                    FROM 
+                        aggregated_user
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_registered_users DESC;
+
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_registered_users", "title": "State-wise Total Registered Users and App Opens"}
+            },
+            "District-wise Total Registered Users": {
+                "query": """
+                   SELECT 
+                        state,
+                        district,
+                        SUM(registered_users) AS total_registered_users
+                    FROM 
+                        map_user
+                    GROUP BY 
+                        state, district
+                    ORDER BY 
+                        total_registered_users DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "district", "y_col": "total_registered_users", "title": "District-wise Total Registered Users"}
+            },
+            "Top 10 States with Highest App Opens": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(app_opens) AS total_app_opens
+                    FROM 
+                        aggregated_user
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_app_opens DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_app_opens", "title": "Top 10 States with Highest App Opens"}
+            },
+            "States with Low Registered Users but High App Opens": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(registered_users) AS total_registered_users,
+                        SUM(app_opens) AS total_app_opens,
+                        (SUM(app_opens) - SUM(registered_users)) AS gap
+                    FROM 
+                        aggregated_user
+                    GROUP BY 
+                        state
+                    HAVING 
+                        gap > 0
+                    ORDER BY 
+                        gap DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "group_bar",
+                "viz_params": {"x_col": "state", "y_cols": ["total_registered_users", "total_app_opens"],"title": "Top 10 States: App Opens vs Registered Users Gap","color_name": "Metric"}
+            }
+        },
+        "insights": """
+            - States like Maharashtra, Uttar Pradesh, and Karnataka have the highest number of registered users and app opens, indicating strong engagement
+            - Lower-performing states could be targeted for marketing campaigns
+            - Districts like Bangalore Urban and Pune dominate user registration, suggesting dense urban adoption
+            - States like Maharashtra and Karnataka show the maximum app activity, reflecting higher user engagement and potential for upselling services
+        """
+    },
+
+    "3. Insurance Engagement Analysis": {
+        "description": "Analyzing user interaction and adoption trends to evaluate the effectiveness and growth potential of insurance services on PhonePe.",
+        "queries": {
+            "State-wise Total Insurance Transactions and Values": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(count) AS total_insurance_transactions,
+                        SUM(amount) AS total_insurance_value
+                    FROM 
+                        aggregated_insurance
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_insurance_transactions DESC;
+
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_insurance_transactions", "title": "State-wise Total Insurance Transactions and Values"}
+            },
+            "District-wise Total Insurance Transactions": {
+                "query": """
+                    SELECT 
+                        state,
+                        district,
+                        SUM(policy_count) AS total_insurance_transactions,
+                        SUM(insured_amount) AS total_insurance_value
+                    FROM 
+                        map_insurance
+                    GROUP BY 
+                        state, district
+                    ORDER BY 
+                        total_insurance_transactions DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "district", "y_col": "total_insurance_transactions", "title": "District-wise Total Insurance Transactions"}
+            },
+            "Top 10 States by Insurance Transaction Value": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(amount) AS total_insurance_value
+                    FROM 
+                        aggregated_insurance
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_insurance_value DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_insurance_value", "title": "Top 10 States by Insurance Transaction Value"}
+            },
+            "Find States with Low Insurance Uptake": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(count) AS total_insurance_transactions
+                    FROM 
+                        aggregated_insurance
+                    GROUP BY 
+                        state
+                    HAVING 
+                        SUM(count) < 50000
+                    ORDER BY 
+                        total_insurance_transactions ASC;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_insurance_transactions", "title": "States with Low Insurance Uptake"}
+            },
+            "State-wise Insurance Penetration (%)": {
+                "query": """
+                    SELECT 
+                        ins.state,
+                        (SUM(ins.amount) / SUM(trx.amount)) * 100 AS insurance_percentage
+                    FROM 
+                        aggregated_insurance ins
+                    JOIN 
+                        aggregated_transaction trx 
+                    ON 
+                        ins.state = trx.state
+                    GROUP BY 
+                        ins.state
+                    ORDER BY 
+                        insurance_percentage DESC;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "insurance_percentage", "title": "State-wise Insurance Penetration (%)"}
+            }
+        },
+        "insights": """
+            - States like Karnataka, Maharashtra, and Tamil Nadu lead in insurance transactions and value, suggesting higher insurance awareness among users
+            - Urban centers like Bangalore Urban and Pune show high insurance engagement, aligning with financial literacy trends
+            - States with the highest insurance transaction value represent mature markets; further cross-selling of premium plans can be explored
+            - The analysis highlights that states like Lakshadweep, Ladakh, and others have the lowest insurance transaction counts. This indicates a major growth opportunity where PhonePe can target insurance marketing campaigns, customized offerings, or awareness programs to increase insurance penetration
+            - States with low insurance penetration (e.g., Andra Pradesh and Madhya Pradesh) represent significant opportunities for insurance marketing and user education
+        """
+    },
+
+    "4.Transaction Analysis Across States and Districts": {
+        "description": "Examining regional transaction trends to uncover geographic patterns, usage intensity, and growth opportunities across Indian states and districts on PhonePe.",
+        "queries": {
+            "Top States by Total Transaction Value": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(count) AS total_transactions,
+                        SUM(amount) AS total_transaction_value
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_transaction_value DESC
+                    LIMIT 10;
+
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "Top States by Total Transaction Value"}
+            },
+            "Top Districts by Total Transaction Value": {
+                "query": """
+                    SELECT 
+                        state,
+                        district,
+                        SUM(transaction_count) AS total_transactions,
+                        SUM(transaction_amount) AS total_transaction_value
+                    FROM 
+                        map_transaction
+                    GROUP BY 
+                        state, district
+                    ORDER BY 
+                        total_transaction_value DESC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "district", "y_col": "total_transaction_value", "title": "Top Districts by Total Transaction Value"}
+            },
+            "Bottom 10 States (Low Transaction Value)": {
+                "query": """
+                    SELECT 
+                        state,
+                        SUM(count) AS total_transactions,
+                        SUM(amount) AS total_transaction_value
+                    FROM 
+                        aggregated_transaction
+                    GROUP BY 
+                        state
+                    ORDER BY 
+                        total_transaction_value ASC
+                    LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "Bottom 10 States (Low Transaction Value)"}
+            },
+            "contribution percentage of a district in state total!": {
+                "query": """
+                    SELECT 
+                        m.state,
+                        m.district,
+                        SUM(m.transaction_amount) AS district_total,
+                        (SUM(m.transaction_amount) / s.state_total) * 100 AS contribution_percentage
+                    FROM 
+                        map_transaction m
+                    JOIN 
+                        (SELECT 
+                            state, 
+                            SUM(amount) AS state_total 
+                        FROM 
+                            aggregated_transaction 
+                        GROUP BY 
+                            state) s
+                        ON 
+                            m.state = s.state
+                        GROUP BY 
+                            m.state, m.district, s.state_total
+                        ORDER BY 
+                            contribution_percentage DESC
+                        LIMIT 10;
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "district", "y_col": "contribution_percentage", "title": "contribution percentage of a district in state total"}
+            }
+        },
+        "insights": """
+            - States like Maharashtra, Karnataka, and Telangana dominate the transaction value, indicating a mature and digitally active user base
+            - Districts like Bengaluru Urban, Pune, and Hyderabad are key transaction hubs — these regions can be leveraged for premium services
+            - States like Lakshadweep, Mizoram, and Andaman and Nicobar Island show low transaction volumes, suggesting a potential for targeted marketing campaigns and partnership building
+            - Some states show heavy dependence on just 1-2 districts (example: Chandigarh District drives a big chunk of Punjabs transactions). Such states should diversify focus beyond just top cities
+        """
+    },
+
+    "5.User Registration Analysis": {
+        "description": "Analyzing user registration trends to understand adoption patterns, regional growth, and onboarding effectiveness on the PhonePe platform.",
+        "queries": {
+            "Brand Preference Analysis": {
+                "query": """
+                    SELECT 
+                        brand,
+                        SUM(device_count) as total_devices,
+                        ROUND(AVG(device_percentage) * 100, 2) as average_percentage
+                    FROM aggregated_user
+                    GROUP BY brand
+                    ORDER BY total_devices DESC
+                    LIMIT 10;
+
+                """,
+                "viz_type": "bar",
+                "viz_params": {"x_col": "brand", "y_col": "average_percentage", "title": "Top Brands by Registered Users on PhonePe"}
+            },
+            "Comprehensive Registration Analysis with Multiple Metrics": {
+                "query": """
+                    SELECT 
+                        m.state,
+                        SUM(m.registered_users) as total_registered_users,
+                        COUNT(DISTINCT m.district) as districts_count,
+                        ROUND(SUM(m.registered_users) / COUNT(DISTINCT m.district), 0) as avg_users_per_district,
+                        (SELECT SUM(transaction_count) 
+                            FROM map_transaction mt 
+                            ) as total_transactions
+                    FROM map_user m
+                    GROUP BY m.state
+                    ORDER BY total_registered_users DESC;
+                """,
+                "viz_type": "combo_bar_line",
+                "viz_params": {"x_col": "state", "y_col_bar": "total_registered_users","y_col_line": "avg_users_per_district","tooltip_cols": ["districts_count", "total_transactions"],"title": "State-wise User Registration with Average per District","y_title_bar": "Total Registered Users","y_title_line": "Avg Users per District"}
+            },
+            "Year-on-Year Growth in User Registration by State": {
+                "query": """
+                    -- Yearly totals per state are read from the materialized mv_yearly_registrations
+                    WITH yearly_growth AS (
+                        SELECT 
+                            current.state,
+                            current.year as current_year,
+                            current.yearly_users as current_year_users,
+                            prev.year as previous_year,
+                            prev.yearly_users as previous_year_users,
+                            (current.yearly_users - prev.yearly_users) as absolute_growth,
+                            CASE 
+                                WHEN prev.yearly_users > 0 
+                                THEN ROUND((current.yearly_users - prev.yearly_users) * 100.0 / prev.yearly_users, 2)
+                                ELSE NULL
+                            END as growth_percentage
+                        FROM mv_yearly_registrations current
+                        LEFT JOIN mv_yearly_registrations prev 
+                            ON current.state = prev.state AND current.year = prev.year + 1
+                        WHERE prev.yearly_users IS NOT NULL  -- Ensure there's a previous year to compare with
+                    )
+                    SELECT 
+                        state,
+                        current_year,
+                        previous_year,
+                        current_year_users,
+                        previous_year_users,
+                        absolute_growth,
+                        growth_percentage,
+                        CASE
+                            WHEN growth_percentage > 50 THEN 'High Growth'
+                            WHEN growth_percentage > 20 THEN 'Moderate Growth'
+                            WHEN growth_percentage > 0 THEN 'Low Growth'
+                            WHEN growth_percentage = 0 THEN 'Stagnant'
+                            ELSE 'Declining'
+                        END as growth_category
+                    FROM yearly_growth
+                    ORDER BY current_year, growth_percentage DESC;
+                """,
+                "viz_type": "scatter_categories",
+                "viz_params": {"x_col": "growth_percentage", "y_col": "current_year_users","color_col": "growth_category","hover_name": "state","size_col": "absolute_growth","facet_col": "current_year","title": "User Growth Analysis by State and Year"}
+            },
+            "multi-dimensional cohort analysis of PhonePe user": {
+                "query": """
+                    -- Per-period registration, transaction, device and insurance
+                    -- metrics come from the materialized mv_* tables (materialize.py)
+                    SELECT
+                        -- Basic identifiers
+                        rt.state,
+                        rt.year,
+                        rt.quarter,
+
+                        -- Registration metrics
+                        rt.total_registrations,
+                        rt.total_app_opens,
+                        rt.active_districts,
+                        ROUND(rt.total_app_opens/NULLIF(rt.total_registrations, 0), 2) AS app_opens_per_user,
+
+                        -- Transaction metrics
+                        tm.total_transactions,
+                        tm.total_amount,
+                        ROUND(tm.total_transactions/NULLIF(rt.total_registrations, 0), 2) AS transactions_per_user,
+                        tm.avg_transactions_per_district,
+
+                        -- Device metrics
+                        db.top_brand,
+                        ROUND(db.top_brand_percentage * 100, 1) AS top_brand_percentage,
+
+                        -- Insurance metrics
+                        ia.total_policies,
+                        ia.total_insured_amount,
+                        ROUND(ia.total_policies/NULLIF(rt.total_registrations, 0) * 1000, 2) AS policies_per_1000_users,
+
+                        -- Derived/calculated metrics
+                        CASE
+                            WHEN rt.total_registrations > 1000000 THEN 'Very High'
+                            WHEN rt.total_registrations > 500000 THEN 'High'
+                            WHEN rt.total_registrations > 100000 THEN 'Medium'
+                            ELSE 'Low'
+                        END AS registration_tier,
+
+                        CASE
+                            WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 5 THEN 'Highly Engaged'
+                            WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 2 THEN 'Moderately Engaged'
+                            WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 0 THEN 'Slightly Engaged'
+                            ELSE 'Not Engaged'
+                        END AS engagement_level,
+
+                        -- Market penetration metric (comparing districts with any activity vs districts with insurance)
+                        ROUND(ia.districts_with_insurance/NULLIF(rt.active_districts, 0) * 100, 1) AS insurance_district_coverage_percent
+
+                    FROM mv_registration_trends rt
+                    LEFT JOIN mv_transaction_metrics tm 
+                        ON rt.state = tm.state AND rt.year = tm.year AND rt.quarter = tm.quarter
+                    LEFT JOIN mv_dominant_brands db 
+                        ON rt.state = db.state AND rt.year = db.year AND rt.quarter = db.quarter
+                    LEFT JOIN mv_insurance_adoption ia 
+                        ON rt.state = ia.state AND rt.year = ia.year AND rt.quarter = ia.quarter
+                    WHERE rt.year BETWEEN 2018 AND 2024  -- Adjust years as needed
+                    ORDER BY 
+                        rt.year DESC, 
+                        rt.quarter DESC, 
+                        rt.total_registrations DESC;
+                """,
+                "viz_type": "advanced_bubble",
+                "viz_params": {
+                    "x_col": "transactions_per_user", 
+                    "y_col": "total_registrations",
+                    "size_col": "total_amount",
+                    "color_col": "engagement_level",
+                    "hover_name": "state",
+                    "animation_col": "year",
+                    "animation_group": "state",
+                    "facet_col": "quarter",
+                    "title": "State Performance Dashboard: Engagement vs Registration"
+                }
+            }
+        },
+        "insights": """
+            - High users but low avg per district       --  Spread thin    --     User concentration is low; marketing can focus on dense areas
+            - High users, high transactions      --          Good conversion  --   Indicates strong onboarding and active users
+            - High districts, low total users    --          Untapped potential --   Launch district-focused campaigns
+            - Low/Negative growth -- Stagnation — investigate reasons (e.g., saturation, competition)
+            - Growth category -- Segment states for tailored marketing (e.g., retention in low-growth vs. onboarding in high-growth)
+        """
+    }
+
+}
+
+def registered_queries(year=GEO_DEFAULT_YEAR, quarter=GEO_DEFAULT_QUARTER):
+    """Yield (name, sql, params) for every query the dashboard can run, with geo filters at one period"""
+    yield "Key Metrics", KEY_METRICS_QUERY, None
+    for name, query in DASHBOARD_QUERIES.items():
+        yield f"Dashboard / {name}", query, None
+    for name, query in TRANSACTION_QUERIES.items():
+        yield f"Transaction Analysis / {name}", query, None
+    for name, query in USER_QUERIES.items():
+        yield f"User Analysis / {name}", query, None
+    for analysis_type in GEO_ANALYSIS_TYPES:
+        query, params = geo_query(analysis_type, year, quarter)
+        yield f"Geographical Analysis / {analysis_type}", query, params
+        if analysis_type in GEO_TREND_QUERIES:
+            yield f"Geographical Analysis / {analysis_type} Trend", geo_trend_query(analysis_type), None
+    for level, metrics in TOP_N_METRICS.items():
+        for metric in metrics:
+            query, params = top_n_query(level, metric, 10, year, quarter)
+            yield f"API / Top {level} by {metric}", query, params
+    for case_name, case in CASE_STUDIES.items():
+        for query_name, query_info in case["queries"].items():
+            yield f"{case_name} / {query_name}", query_info["query"], None
@@ -0,0 +1,156 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from mysql.connector import Error
+
+# Single-row marker table; every load bumps the version so cached results are dropped
+DATA_VERSION_TABLE = "data_version"
+
+def normalize_sql(query):
+    """Collapse whitespace and drop the trailing semicolon so formatting doesn't split cache keys"""
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+def estimate_size(value):
+    """Approximate the in-memory size of a cached result in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+def read_data_version(conn):
+    """Return the current data version, or 0 when no load has recorded one yet"""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT version FROM {DATA_VERSION_TABLE} WHERE id = 1")
+        row = cursor.fetchone()
+        cursor.close()
+        return row[0] if row else 0
+    except Error:
+        return 0
+
+def bump_data_version(conn):
+    """Record that the underlying data changed; call after every load"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+            id TINYINT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(f"""
+        INSERT INTO {DATA_VERSION_TABLE} (id, version) VALUES (1, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """)
+    conn.commit()
+    cursor.close()
+
+class QueryCache:
+    """Process-wide LRU cache of query results bounded by bytes, with a TTL and data-version invalidation"""
+
+    def __init__(self, max_bytes, ttl, version_check_interval):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @staticmethod
+    def make_key(query, params=None, namespace=None):
+        return (namespace, normalize_sql(query), tuple(params) if params is not None else None)
+
+    def _check_version(self, version_fn):
+        if version_fn is None:
+            return
+        # Claim the check under the lock so concurrent callers run one probe, not one each
+        with self._lock:
+            now = time.monotonic()
+            if now - self._version_checked_at < self.version_check_interval:
+                return
+            self._version_checked_at = now
+        version = version_fn()
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._clear()
+                self._stats["invalidations"] += 1
+            self._version = version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            value, size, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, query, params, loader, version_fn=None, namespace=None):
+        """Return the cached result for query/params, running loader() on a miss.
+
+        The namespace keeps results of different shapes (row dicts vs frames) for the same SQL apart.
+        """
+        self._check_version(version_fn)
+        key = self.make_key(query, params, namespace)
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.put(key, value)
+        # Hand out copies of frames so callers can add columns without touching the cache
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hit_ratio=self._stats["hits"] / lookups if lookups else 0.0,
+                data_version=self._version,
+            )
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
@@ -0,0 +1,149 @@
+import argparse
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from query_cache import bump_data_version
+
+# Summary tables keyed by year and quarter. Measures keep the source column
+# names, so a page query only swaps its FROM clause to read the rollup.
+ROLLUPS = {
+    "rollup_transaction_period": {
+        "source": "aggregated_transaction",
+        "dimensions": {},
+        "measures": {"count": "BIGINT", "amount": "DOUBLE"},
+    },
+    "rollup_transaction_state": {
+        "source": "aggregated_transaction",
+        "dimensions": {"state": "VARCHAR(100)"},
+        "measures": {"count": "BIGINT", "amount": "DOUBLE"},
+    },
+    "rollup_transaction_type": {
+        "source": "aggregated_transaction",
+        "dimensions": {"transaction_type": "VARCHAR(100)"},
+        "measures": {"count": "BIGINT", "amount": "DOUBLE"},
+    },
+    "rollup_user_period": {
+        "source": "aggregated_user",
+        "dimensions": {},
+        "measures": {"registered_users": "BIGINT", "app_opens": "BIGINT"},
+    },
+    "rollup_user_state": {
+        "source": "aggregated_user",
+        "dimensions": {"state": "VARCHAR(100)"},
+        "measures": {"registered_users": "BIGINT", "app_opens": "BIGINT"},
+    },
+    "rollup_user_brand": {
+        "source": "aggregated_user",
+        "dimensions": {"brand": "VARCHAR(100)"},
+        "measures": {"device_count": "BIGINT"},
+    },
+    "rollup_district_transaction": {
+        "source": "map_transaction",
+        "dimensions": {"district": "VARCHAR(100)"},
+        "measures": {"transaction_count": "BIGINT", "transaction_amount": "DOUBLE"},
+    },
+    "rollup_district_user": {
+        "source": "map_user",
+        "dimensions": {"district": "VARCHAR(100)"},
+        "measures": {"registered_users": "BIGINT", "app_opens": "BIGINT"},
+    },
+}
+
+def _create_table_sql(name, spec):
+    columns = [f"{col} {col_type}" for col, col_type in spec["dimensions"].items()]
+    columns += ["year INT", "quarter INT"]
+    columns += [f"{col} {col_type}" for col, col_type in spec["measures"].items()]
+    key = list(spec["dimensions"]) + ["year", "quarter"]
+    return f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            {', '.join(columns)},
+            PRIMARY KEY ({', '.join(key)})
+        )
+    """
+
+def rollup_select_sql(spec, where=""):
+    """SELECT producing the rows of one rollup from its source table"""
+    group_cols = list(spec["dimensions"]) + ["year", "quarter"]
+    measures = [f"SUM({col}) AS {col}" for col in spec["measures"]]
+    return f"""
+        SELECT {', '.join(group_cols + measures)}
+        FROM {spec["source"]}
+        {where}
+        GROUP BY {', '.join(group_cols)}
+    """
+
+def _insert_sql(name, spec, per_period):
+    columns = list(spec["dimensions"]) + ["year", "quarter"] + list(spec["measures"])
+    where = "WHERE year = %s AND quarter = %s" if per_period else ""
+    return f"INSERT INTO {name} ({', '.join(columns)}) {rollup_select_sql(spec, where)}"
+
+def create_rollup_tables(conn):
+    """Create the rollup tables if they don't exist"""
+    cursor = conn.cursor()
+    for name, spec in ROLLUPS.items():
+        cursor.execute(_create_table_sql(name, spec))
+    cursor.close()
+
+def refresh_rollups(conn, periods=None, sources=None):
+    """Rebuild rollup rows for the given (year, quarter) periods, or all rows when periods is None.
+
+    Pass the loaded tables as sources to limit the refresh to rollups built from them.
+    """
+    cursor = conn.cursor()
+    for name, spec in ROLLUPS.items():
+        if sources is not None and spec["source"] not in sources:
+            continue
+        if periods is None:
+            cursor.execute(f"DELETE FROM {name}")
+            cursor.execute(_insert_sql(name, spec, per_period=False))
+        else:
+            for year, quarter in periods:
+                cursor.execute(f"DELETE FROM {name} WHERE year = %s AND quarter = %s", (year, quarter))
+                cursor.execute(_insert_sql(name, spec, per_period=True), (year, quarter))
+    conn.commit()
+    cursor.close()
+
+def ensure_rollups(conn):
+    """Create the rollup tables and populate any that are still empty"""
+    create_rollup_tables(conn)
+    cursor = conn.cursor()
+    empty = []
+    for name in ROLLUPS:
+        cursor.execute(f"SELECT 1 FROM {name} LIMIT 1")
+        if not cursor.fetchall():
+            empty.append(ROLLUPS[name]["source"])
+    cursor.close()
+    if empty:
+        refresh_rollups(conn, sources=set(empty))
+
+def main():
+    """Refresh the rollups after a load, e.g. `python rollup.py --year 2024 --quarter 4`"""
+    parser = argparse.ArgumentParser(description="Refresh PhonePe rollup tables")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--quarter", type=int)
+    parser.add_argument("--source", action="append", help="Only refresh rollups of this base table")
+    args = parser.parse_args()
+
+    if (args.year is None) != (args.quarter is None):
+        parser.error("--year and --quarter must be given together")
+    periods = [(args.year, args.quarter)] if args.year is not None else None
+
+    try:
+        connection = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME
+        )
+        create_rollup_tables(connection)
+        refresh_rollups(connection, periods, set(args.source) if args.source else None)
+        bump_data_version(connection)
+        connection.close()
+        print("Rollup tables refreshed" + (f" for {args.year} Q{args.quarter}." if periods else "."))
+    except Error as e:
+        print(f"Error refreshing rollups: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class QueryScheduler:
+    """Runs query loaders on a small thread pool, each worker on its own pooled connection.
+
+    Work is keyed (by query cache key), so a query that is already queued or
+    running is shared rather than submitted twice, and tagged with a group so
+    a session can cancel whatever it queued but no longer needs.
+    """
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self._lock = threading.RLock()
+        self._futures = {}
+        self._groups = {}
+        self._stats = {"submitted": 0, "shared": 0, "cancelled": 0}
+
+    def submit(self, key, fn, group=None):
+        """Future for fn(), reusing the pending or running future already under this key"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.cancelled():
+                self._stats["shared"] += 1
+            else:
+                future = self._executor.submit(fn)
+                self._futures[key] = future
+                self._stats["submitted"] += 1
+                future.add_done_callback(lambda done, key=key: self._forget(key, done))
+            if group is not None:
+                self._groups.setdefault(group, set()).add(key)
+            return future
+
+    def _forget(self, key, future):
+        # Finished results live in the query cache; only in-flight work is tracked here
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+            for keys in self._groups.values():
+                keys.discard(key)
+
+    def cancel(self, group, keep=()):
+        """Cancel the group's queued work except the keys in keep; running queries finish.
+
+        A key that another group still waits on is only dropped from this group.
+        """
+        cancelled = 0
+        with self._lock:
+            keys = self._groups.get(group, set())
+            for key in list(keys - set(keep)):
+                keys.discard(key)
+                if any(key in other for other in self._groups.values()):
+                    continue
+                future = self._futures.get(key)
+                if future is not None and future.cancel():
+                    cancelled += 1
+            if not keys:
+                self._groups.pop(group, None)
+            self._stats["cancelled"] += cancelled
+        return cancelled
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=sum(not f.running() for f in self._futures.values()),
+                        running=sum(f.running() for f in self._futures.values()))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
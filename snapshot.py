@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from etl import DATASETS, quarter_files, state_name, parse_document, columns_chunk, merge_chunks
+
+# A snapshot directory holds one <dataset>.ndjson per dataset, each quarter.json
+# re-serialized onto a single line, plus index.json mapping every line to its
+# (state, year, quarter) and byte range.
+INDEX_FILE = "index.json"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BATCH_SIZE = 512  # documents decoded per parser call
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _dumps(content):
+    # Compact output never contains a raw newline, so one document is one line
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def load_index(snapshot_dir):
+    path = os.path.join(snapshot_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {"version": SNAPSHOT_VERSION, "datasets": {}}
+    with open(path, "rb") as f:
+        index = _loads(f.read())
+    if index.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {index.get('version')}")
+    return index
+
+def pack_dataset(pulse_root, dataset, snapshot_dir):
+    """Write every quarter.json of one dataset to <dataset>.ndjson and return its index entries"""
+    base_path = os.path.join(pulse_root, DATASETS[dataset]['path'])
+    file_name = f"{dataset}.ndjson"
+    path = os.path.join(snapshot_dir, file_name)
+    entries, errors = [], []
+    offset = 0
+    with open(path + ".tmp", "wb") as out:
+        states = sorted(os.listdir(base_path)) if os.path.isdir(base_path) else []
+        for state_dir in states:
+            state_path = os.path.join(base_path, state_dir)
+            if not os.path.isdir(state_path):
+                continue
+            for year, quarter, file_path in quarter_files(state_path):
+                try:
+                    with open(file_path, "rb") as f:
+                        line = _dumps(_loads(f.read()))
+                except (OSError, ValueError) as e:
+                    errors.append(f"Error in {file_path}: {e}")
+                    continue
+                out.write(line + b"\n")
+                entries.append([state_name(state_dir), year, quarter, offset, len(line)])
+                offset += len(line) + 1
+    os.replace(path + ".tmp", path)
+    return dataset, {"file": file_name, "bytes": offset, "entries": entries}, errors
+
+def pack(pulse_root, snapshot_dir, datasets=None, max_workers=None):
+    """Pack the given datasets (all by default) of a pulse checkout, one process per dataset"""
+    datasets = list(datasets or DATASETS)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    index = load_index(snapshot_dir)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(pack_dataset, pulse_root, dataset, snapshot_dir) for dataset in datasets]
+        for future in futures:
+            dataset, entry, errors = future.result()
+            for error in errors:
+                print(error)
+            index["datasets"][dataset] = entry
+    # The index is replaced last, so readers never see it point past a file's end
+    path = os.path.join(snapshot_dir, INDEX_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(path + ".tmp", path)
+    return index
+
+def _decode_batch(data, batch):
+    """Documents of a run of consecutive index entries, decoded with one parser call"""
+    start = batch[0][3]
+    end = batch[-1][3] + batch[-1][4]
+    try:
+        return _loads(b"[" + data[start:end].replace(b"\n", b",") + b"]")
+    except ValueError:
+        # Fall back to one document at a time so a single bad line costs only itself
+        documents = []
+        for _, _, _, offset, length in batch:
+            try:
+                documents.append(_loads(data[offset:offset + length]))
+            except ValueError:
+                documents.append(None)
+        return documents
+
+def extract_packed(snapshot_dir, dataset, entry, batch_size=SNAPSHOT_BATCH_SIZE):
+    """Parse one packed dataset into a columnar chunk with a single sequential read"""
+    with open(os.path.join(snapshot_dir, entry["file"]), "rb") as f:
+        data = f.read()
+    entries = entry["entries"]
+    parsed, errors = [], []
+    for i in range(0, len(entries), batch_size):
+        batch = entries[i:i + batch_size]
+        for (state, year, quarter, offset, _), content in zip(batch, _decode_batch(data, batch)):
+            location = f"{entry['file']} at byte {offset} ({state} {year} Q{quarter})"
+            item_errors = []
+            try:
+                if content is None:
+                    raise ValueError("invalid JSON")
+                parsed.append((state, year, quarter, parse_document(dataset, content, item_errors)))
+            except Exception as e:
+                errors.append(f"Error in {location}: {e}")
+            errors.extend(f"Error in {location}: {error}" for error in item_errors)
+    return dataset, columns_chunk(dataset, parsed), errors
+
+def extract_snapshot(snapshot_dir, datasets=None, max_workers=None, batch_size=SNAPSHOT_BATCH_SIZE):
+    """Extract datasets from a snapshot into DataFrames, like etl.extract_all does from the JSON tree"""
+    datasets = list(datasets or DATASETS)
+    index = load_index(snapshot_dir)
+    chunks = {dataset: [] for dataset in datasets}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for dataset in datasets:
+            entry = index["datasets"].get(dataset)
+            if entry is None:
+                print(f"{dataset} is not in the snapshot at {snapshot_dir}")
+                continue
+            futures.append(pool.submit(extract_packed, snapshot_dir, dataset, entry, batch_size))
+        for future in futures:
+            dataset, chunk, errors = future.result()
+            for error in errors:
+                print(error)
+            chunks[dataset].append(chunk)
+    return {dataset: merge_chunks(dataset, chunks[dataset]) for dataset in datasets}
+
+def main():
+    """Pack a pulse checkout for fast full rebuilds, e.g. `python snapshot.py pulse/data --out snapshot`"""
+    parser = argparse.ArgumentParser(description="Pack the PhonePe Pulse JSON tree into one indexed file per dataset")
+    parser.add_argument("pulse_root", help="Path to the pulse/data directory")
+    parser.add_argument("--out", default="snapshot", help="Snapshot directory")
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS), help="Only pack this dataset")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+
+    index = pack(args.pulse_root, args.out, args.dataset, args.workers)
+    for dataset in args.dataset or DATASETS:
+        entry = index["datasets"][dataset]
+        print(f"{entry['file']}: {len(entry['entries']):,} documents, {entry['bytes'] / 1048576:,.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,42 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import mysql.connector
-from mysql.connector import Error
+import plotly.io as pio
 import json
+import math
+import uuid
+from concurrent.futures import CancelledError, as_completed
 from datetime import datetime
 import numpy as np
 import seaborn as sns
-from plotly.subplots import make_subplots
+
+from config import (
+    ANALYTICS_BACKEND,
+    QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL, DATA_VERSION_CHECK_INTERVAL,
+    CASE_STUDY_WORKERS, CASE_STUDY_PREFETCH,
+    FIGURE_CACHE_MAX_BYTES, FIGURE_CACHE_TTL,
+    METRICS_FILE, METRICS_FLUSH_INTERVAL, METRICS_DEBUG_PANEL,
+    TABLE_PAGE_SIZE, CHART_LOD_MAX_POINTS, API_EMBEDDED, API_EMBEDDED_WORKERS,
+    WARMUP_ON_START, WARMUP_FREE_CONNECTIONS, DATASTORE_ENABLED
+)
+from query_cache import QueryCache
+from scheduler import QueryScheduler
+from geo import state_boundaries, feature_id_key
+from charts import figure_json, uses_container_width, uses_level_of_detail
+from metrics import Metrics
+from api import AnalyticsService, start_in_thread
+from warmup import Warmup, warmup_queries
+from pagination import (
+    FILTER_OPERATORS, column_probe_sql, count_statement, page_statement, filter_frame, page_frame,
+    numeric_columns
+)
+from datastore import DataStore
+from backends import create_backend, BACKEND_ERRORS
+from queries import (
+    KEY_METRICS_QUERY, DASHBOARD_QUERIES, TRANSACTION_QUERIES, USER_QUERIES,
+    GEO_YEARS, GEO_QUARTERS, GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER, GEO_ANALYSIS_TYPES,
+    geo_query, geo_trend_query, CASE_STUDIES
+)
 
 # Set page configuration
 st.set_page_config(
@@ -65,33 +94,273 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Database connection function
+# Analytics backend shared by all sessions (MySQL pool or embedded DuckDB, see config.py)
 @st.cache_resource
-def create_db_connection():
+def get_backend():
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",  
-            password="1234",  
-            database="phonepe_transaction_insights"  
-        )
-        if conn.is_connected():
-            return conn
-    except Error as e:
-        st.error(f"Error connecting to MySQL: {e}")
+        # Opens the first connection and prepares rollups up front so bad settings fail here
+        return create_backend()
+    except (RuntimeError, ValueError) + BACKEND_ERRORS as e:
+        st.error(f"Error connecting to the {ANALYTICS_BACKEND} backend: {e}")
+        return None
+
+# Query result cache shared by all sessions of this process
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(
+        max_bytes=QUERY_CACHE_MAX_BYTES,
+        ttl=QUERY_CACHE_TTL,
+        version_check_interval=DATA_VERSION_CHECK_INTERVAL
+    )
+
+# Serialized case-study figures keyed by result fingerprint and viz params, shared by all sessions
+@st.cache_resource
+def get_figure_cache():
+    # Keys already carry the data fingerprint, so no data-version check is needed
+    return QueryCache(max_bytes=FIGURE_CACHE_MAX_BYTES, ttl=FIGURE_CACHE_TTL, version_check_interval=0)
+
+# Query, figure and page timings shared by all sessions of this process
+@st.cache_resource
+def get_metrics():
+    return Metrics(path=METRICS_FILE, flush_interval=METRICS_FLUSH_INTERVAL)
+
+# JSON API served from this process, sharing its result cache, pool and metrics
+@st.cache_resource
+def get_api_server(_backend):
+    try:
+        return start_in_thread(AnalyticsService(_backend, get_query_cache(), get_metrics(),
+                                                max_workers=API_EMBEDDED_WORKERS))
+    except RuntimeError as e:
+        st.warning(f"JSON API not started: {e}")
         return None
 
-# Execute SQL query function
-def execute_query(conn, query):
+# Base tables held in memory once per process, shared read-only by all sessions
+@st.cache_resource
+def get_datastore(_backend):
+    if not DATASTORE_ENABLED:
+        return None
+    try:
+        return DataStore(_backend, version_check_interval=DATA_VERSION_CHECK_INTERVAL)
+    except BACKEND_ERRORS as e:
+        print(f"Error loading the in-memory datastore: {e}")
+        return None
+
+# Cached columnar replacement for pd.read_sql_query; errors propagate to the caller.
+# Page queries the datastore covers are answered from memory instead.
+def read_sql_cached(backend, query, params=None):
+    metrics = get_metrics()
+    store = get_datastore(backend)
+    if store is not None and store.can_answer(query):
+        return metrics.measure_query(query, lambda: store.answer(query, params))
+    return get_query_cache().get_or_load(
+        query, params,
+        lambda: metrics.measure_query(query, lambda: backend.read_frame(query, params)),
+        version_fn=backend.data_version,
+        namespace="frame"
+    )
+
+# Execute SQL query and return a typed DataFrame, built column by column
+def query_dataframe(backend, query, params=None):
+    try:
+        return read_sql_cached(backend, query, params)
+    except BACKEND_ERRORS as e:
+        st.error(f"Error executing query: {e}")
+        return pd.DataFrame()
+
+# Result table that fetches one page at a time, with sort and filter pushed down to SQL
+# (or applied to the in-memory result for queries the datastore answers)
+def paged_table(backend, query, params=None, key="table", page_size=TABLE_PAGE_SIZE):
+    store = get_datastore(backend)
+    result = None
     try:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
-    except Error as e:
+        if store is not None and store.can_answer(query):
+            result = read_sql_cached(backend, query, params)
+            columns, numeric = list(result.columns), numeric_columns(result)
+        else:
+            probe = read_sql_cached(backend, column_probe_sql(query), params)
+            columns, numeric = list(probe.columns), numeric_columns(probe)
+    except BACKEND_ERRORS as e:
         st.error(f"Error executing query: {e}")
-        return []
+        return
+    
+    with st.expander("Sort and filter"):
+        col1, col2, col3, col4 = st.columns(4)
+        sort = col1.selectbox("Sort by", ["(default)"] + columns, key=f"{key}_sort")
+        descending = col1.checkbox("Descending", key=f"{key}_desc")
+        filter_col = col2.selectbox("Filter column", ["(none)"] + columns, key=f"{key}_filter_col")
+        operator = col3.selectbox("Condition", list(FILTER_OPERATORS), key=f"{key}_filter_op")
+        value = col4.text_input("Value", key=f"{key}_filter_value")
+    filters = [(filter_col, operator, value)] if filter_col != "(none)" and value != "" else []
+    sort = None if sort == "(default)" else sort
+    
+    try:
+        if result is not None:
+            result = filter_frame(result, filters)
+            total = len(result)
+        else:
+            count_sql, count_params = count_statement(query, params, columns, filters, numeric)
+            total = int(read_sql_cached(backend, count_sql, count_params).iloc[0, 0])
+        pages = max(1, math.ceil(total / page_size))
+        # Clamp a page left over from a wider filter before the widget sees it
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page") if pages > 1 else 1
+        if result is not None:
+            df = page_frame(result, sort, descending, page - 1, page_size)
+        else:
+            page_sql, page_params = page_statement(
+                query, params, columns, sort, descending, filters, page - 1, page_size, numeric)
+            df = read_sql_cached(backend, page_sql, page_params)
+    except ValueError as e:
+        st.warning(f"Invalid filter: {e}")
+        return
+    except BACKEND_ERRORS as e:
+        st.error(f"Error executing query: {e}")
+        return
+    
+    st.dataframe(df, use_container_width=True)
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {first_row + 1 if total else 0:,}–{first_row + len(df):,} of {total:,}")
+
+# Background query scheduler shared by all sessions of this process
+@st.cache_resource
+def get_scheduler():
+    return QueryScheduler(max_workers=CASE_STUDY_WORKERS)
+
+# Background warm-up of the result cache, started once per process
+@st.cache_resource
+def get_warmup(_backend):
+    store = get_datastore(_backend)
+    # Queries answered from memory never reach the result cache
+    tasks = [
+        (name, scheduled_loader(_backend, query, params, namespace)[1])
+        for name, query, params, namespace in warmup_queries()
+        if store is None or not store.can_answer(query)
+    ]
+
+    def pool_busy():
+        # Interactive queries come first: hold off while few pooled connections are free
+        stats = _backend.stats()
+        return stats is not None and stats["size"] - stats["in_use"] <= WARMUP_FREE_CONNECTIONS
+
+    return Warmup(tasks, throttle=pool_busy).start()
+
+# Per-session tag for scheduled work, so a session only cancels its own queries
+def session_group():
+    if "query_group" not in st.session_state:
+        st.session_state["query_group"] = uuid.uuid4().hex
+    return st.session_state["query_group"]
+
+# Cache key and thread-safe loader of a query for the scheduler: no st.* calls, errors propagate
+def scheduled_loader(backend, query, params=None, namespace="frame"):
+    cache = get_query_cache()
+    metrics = get_metrics()
+    page = metrics.current_page()
+    fetch = backend.fetch_rows if namespace == "rows" else backend.read_frame
+
+    def loader():
+        return cache.get_or_load(
+            query, params,
+            lambda: metrics.measure_query(query, lambda: fetch(query, params), page=page),
+            version_fn=backend.data_version,
+            namespace=namespace
+        )
+    return cache.make_key(query, params, namespace), loader
+
+# Queue the case study's queries: the viewed one first, the rest as background prefetch
+def schedule_case_queries(backend, selected_case, query_name):
+    scheduler = get_scheduler()
+    queries = CASE_STUDIES[selected_case]["queries"]
+    names = [query_name] + [name for name in queries if name != query_name and CASE_STUDY_PREFETCH]
+
+    futures, keys = {}, []
+    for name in names:
+        key, loader = scheduled_loader(backend, queries[name]["query"])
+        futures[name] = scheduler.submit(key, loader, group=session_group())
+        keys.append(key)
+    # Whatever this session still has queued for another case study is no longer needed
+    scheduler.cancel(session_group(), keep=keys)
+    return futures
+
+# Result of a scheduled query; work cancelled by another session is rerun inline
+def wait_for_query(backend, future, query):
+    try:
+        return future.result()
+    except CancelledError:
+        return read_sql_cached(backend, query)
+
+# Warm-up progress in the sidebar while it runs
+def display_warmup_progress():
+    if not WARMUP_ON_START:
+        return
+    progress = get_warmup(get_backend()).progress()
+    if progress["running"]:
+        st.sidebar.progress(
+            progress["done"] / progress["total"],
+            text=f"Warming cache: {progress['done']:,}/{progress['total']:,} queries"
+        )
+    elif progress["failed"]:
+        with st.sidebar.expander(f"Cache warm-up: {progress['failed']} failed"):
+            for name, error in progress["errors"]:
+                st.caption(f"{name}: {error}")
+
+# Cache hit/miss statistics in the sidebar
+def display_cache_stats():
+    stats = get_query_cache().stats()
+    with st.sidebar.expander("Query Cache"):
+        st.caption(
+            f"Hits: {stats['hits']:,} | Misses: {stats['misses']:,} | "
+            f"Hit ratio: {stats['hit_ratio']:.0%}"
+        )
+        st.caption(
+            f"Entries: {stats['entries']:,} | "
+            f"Size: {stats['bytes']/1048576:,.1f} / {stats['max_bytes']/1048576:,.0f} MB"
+        )
+        st.caption(
+            f"Evictions: {stats['evictions']:,} | Expired: {stats['expirations']:,} | "
+            f"Invalidations: {stats['invalidations']:,}"
+        )
+
+# In-memory datastore size and use in the sidebar
+def display_datastore_stats(backend):
+    store = get_datastore(backend)
+    if store is None:
+        return
+    stats = store.stats()
+    with st.sidebar.expander("In-memory Data"):
+        st.caption(f"Rows: {stats['rows']:,} | Size: {stats['bytes']/1048576:,.1f} MB")
+        st.caption(f"Queries answered: {stats['answers']:,} | Reloads: {stats['reloads']:,}")
+
+# Connection pool metrics in the sidebar (MySQL backend only)
+def display_pool_stats(backend):
+    stats = backend.stats()
+    if stats is None:
+        return
+    with st.sidebar.expander("Connection Pool"):
+        st.caption(f"In use: {stats['in_use']} | Idle: {stats['idle']} | Size: {stats['size']}")
+        st.caption(
+            f"Checkouts: {stats['checkouts']:,} | Waits: {stats['waits']:,} | "
+            f"Avg wait: {stats['avg_wait_ms']:,.1f} ms | Timeouts: {stats['timeouts']:,}"
+        )
+        st.caption(
+            f"Created: {stats['created']:,} | Pings: {stats['pings']:,} | "
+            f"Reconnects: {stats['reconnects']:,} | Discarded: {stats['discarded']:,}"
+        )
+        st.caption(f"Prepared statements: {stats['prepares']:,} | Reused: {stats['prepared_hits']:,} "
+                   f"| Evicted: {stats['prepared_evictions']:,}")
+
+# Slowest query shapes and the latest timed events, behind a sidebar toggle
+def display_debug_panel():
+    if not METRICS_DEBUG_PANEL or not st.sidebar.checkbox("Show debug metrics"):
+        return
+    metrics = get_metrics()
+    with st.sidebar.expander("Debug Metrics", expanded=True):
+        st.caption("Slowest queries (cache misses, by total time)")
+        st.dataframe(pd.DataFrame(metrics.slowest_queries()), use_container_width=True)
+        st.caption("Recent events")
+        st.dataframe(pd.DataFrame(metrics.recent()[::-1]), use_container_width=True)
+        if METRICS_FILE:
+            st.caption(f"Prometheus metrics: {METRICS_FILE}")
 
 # Header with logo and title
 def display_header():
@@ -105,97 +374,146 @@ def display_header():
     """)
     st.divider()
 
-# Display key metrics in a dashboard format
-def display_key_metrics(conn):
+# Display key metrics (rows of KEY_METRICS_QUERY) in a dashboard format
+def display_key_metrics(metrics):
     st.markdown('<div class="sub-header">Key Metrics</div>', unsafe_allow_html=True)
     
-    # Execute queries for key metrics
-    total_transactions = execute_query(conn, "SELECT SUM(count) as total FROM aggregated_transaction")
-    total_amount = execute_query(conn, "SELECT SUM(amount) as total FROM aggregated_transaction")
-    total_users = execute_query(conn, "SELECT SUM(registered_users) as total FROM aggregated_user")
+    if not metrics:
+        st.warning("No data available for key metrics.")
+        return
+    total_transactions = metrics[0]["total_transactions"]
+    total_amount = metrics[0]["total_amount"]
+    total_users = metrics[0]["total_users"]
     
     # Display metrics in columns
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">{total_transactions[0]["total"]:,}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{total_transactions:,}</div>', unsafe_allow_html=True)
         st.markdown('<div class="metric-label">Total Transactions</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
         
     with col2:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">₹{total_amount[0]["total"]/10000000:,.2f}Cr</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">₹{total_amount/10000000:,.2f}Cr</div>', unsafe_allow_html=True)
         st.markdown('<div class="metric-label">Total Transaction Amount</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
         
     with col3:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-        st.markdown(f'<div class="metric-value">{total_users[0]["total"]:,}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{total_users:,}</div>', unsafe_allow_html=True)
         st.markdown('<div class="metric-label">Registered Users</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
+# Quick Insights: transaction type distribution
+def display_transaction_types(df):
+    fig = px.pie(
+        df,
+        values='total',
+        names='transaction_type',
+        title='Transaction Type Distribution',
+        color_discrete_sequence=px.colors.sequential.Purples
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    st.plotly_chart(fig, use_container_width=True)
+
+# Quick Insights: brand distribution
+def display_top_brands(df):
+    fig = px.bar(
+        df,
+        x='brand',
+        y='total',
+        title='Top 10 Device Brands',
+        color='total',
+        color_continuous_scale='Purples'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# Quarterly trends
+def display_quarterly_trends(df):
+    df['period'] = df['year'].astype(str) + ' Q' + df['quarter'].astype(str)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['period'],
+        y=df['transactions'],
+        mode='lines+markers',
+        name='Transaction Count',
+        line=dict(color='rgb(103, 57, 183)', width=3)
+    ))
+    fig.add_trace(go.Scatter(
+        x=df['period'],
+        y=df['amount'],
+        mode='lines+markers',
+        name='Transaction Amount',
+        line=dict(color='rgb(255, 161, 90)', width=3),
+        yaxis='y2'
+    ))
+    fig.update_layout(
+        title='Quarterly Transaction Trends',
+        xaxis=dict(title='Period'),
+        yaxis=dict(title='Transaction Count', side='left'),
+        yaxis2=dict(title='Transaction Amount (₹)', side='right', overlaying='y', showgrid=False),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# Dashboard: all queries are issued at once and each widget is drawn as its data lands,
+# so the page waits for the slowest query rather than for their sum
+def dashboard(backend):
+    scheduler = get_scheduler()
+    sections = {
+        "Key Metrics": (KEY_METRICS_QUERY, "rows", display_key_metrics),
+        "Transaction Type Distribution": (DASHBOARD_QUERIES["Transaction Type Distribution"], "frame", display_transaction_types),
+        "Top 10 Device Brands": (DASHBOARD_QUERIES["Top 10 Device Brands"], "frame", display_top_brands),
+        "Quarterly Transaction Trends": (DASHBOARD_QUERIES["Quarterly Transaction Trends"], "frame", display_quarterly_trends),
+    }
+    futures, loaders = {}, {}
+    for name, (query, namespace, _) in sections.items():
+        key, loaders[name] = scheduled_loader(backend, query, namespace=namespace)
+        futures[scheduler.submit(key, loaders[name], group=session_group())] = name
+    
+    # Placeholders keep the page layout fixed whatever order the results arrive in
+    slots = {"Key Metrics": st.empty()}
+    st.markdown('<div class="sub-header">Quick Insights</div>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    slots["Transaction Type Distribution"] = col1.empty()
+    slots["Top 10 Device Brands"] = col2.empty()
+    slots["Quarterly Transaction Trends"] = st.empty()
+    for slot in slots.values():
+        slot.caption("Loading...")
+    
+    for future in as_completed(futures):
+        name = futures[future]
+        with slots[name].container():
+            try:
+                # Work cancelled by another session is rerun inline
+                result = loaders[name]() if future.cancelled() else future.result()
+            except BACKEND_ERRORS as e:
+                st.error(f"Error executing query: {e}")
+                continue
+            sections[name][2](result)
+
 # Transaction Analysis
-def transaction_analysis(conn):
+def transaction_analysis(backend):
     st.markdown('<div class="sub-header">Transaction Analysis</div>', unsafe_allow_html=True)
     
-    # Query options
-    query_options = {
-        "Quarterly Transaction Growth": """
-            SELECT year, quarter, SUM(count) as total_transactions, 
-            SUM(amount) as total_amount
-            FROM aggregated_transaction
-            GROUP BY year, quarter
-            ORDER BY year, quarter
-        """,
-        "Top 10 States by Transaction Volume": """
-            SELECT state, SUM(count) as total_transactions
-            FROM aggregated_transaction
-            GROUP BY state
-            ORDER BY total_transactions DESC
-            LIMIT 10
-        """,
-        "Top 10 Districts by Transaction Amount": """
-            SELECT district, SUM(transaction_amount) as total_amount
-            FROM map_transaction
-            GROUP BY district
-            ORDER BY total_amount DESC
-            LIMIT 10
-        """,
-        "Transaction Type Distribution": """
-            SELECT transaction_type, SUM(count) as total_transactions,
-            SUM(amount) as total_amount
-            FROM aggregated_transaction
-            GROUP BY transaction_type
-            ORDER BY total_transactions DESC
-        """,
-        "Year-on-Year Growth": """
-            SELECT year, SUM(count) as total_transactions,
-            SUM(amount) as total_amount
-            FROM aggregated_transaction
-            GROUP BY year
-            ORDER BY year
-        """
-    }
-    
     # Select analysis type
-    selected_query = st.selectbox("Select Analysis Type", list(query_options.keys()))
+    selected_query = st.selectbox("Select Analysis Type", list(TRANSACTION_QUERIES.keys()))
     
     # Execute selected query
-    results = execute_query(conn, query_options[selected_query])
+    df = query_dataframe(backend, TRANSACTION_QUERIES[selected_query])
     
-    if not results:
+    if df.empty:
         st.warning("No data available for this analysis.")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(results)
-    
     # Display results based on query type
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        st.dataframe(df, use_container_width=True)
+        paged_table(backend, TRANSACTION_QUERIES[selected_query], key="transaction_table")
     
     with col2:
         if selected_query == "Quarterly Transaction Growth":
@@ -297,71 +615,30 @@ def transaction_analysis(conn):
             st.plotly_chart(fig, use_container_width=True)
 
 # User Analysis
-def user_analysis(conn):
+def user_analysis(backend):
     st.markdown('<div class="sub-header">User Analysis</div>', unsafe_allow_html=True)
     
-    # Query options
-    query_options = {
-        "Top 10 States by Registered Users": """
-            SELECT state, SUM(registered_users) as total_users
-            FROM aggregated_user
-            GROUP BY state
-            ORDER BY total_users DESC
-            LIMIT 10
-        """,
-        "Top 10 Districts by App Opens": """
-            SELECT district, SUM(app_opens) as total_app_opens
-            FROM map_user
-            GROUP BY district
-            ORDER BY total_app_opens DESC
-            LIMIT 10
-        """,
-        "User Brand Distribution": """
-            SELECT brand, SUM(device_count) as user_count
-            FROM aggregated_user
-            GROUP BY brand
-            ORDER BY user_count DESC
-        """,
-        "User Growth by Quarter": """
-            SELECT year, quarter, SUM(registered_users) as new_users
-            FROM aggregated_user
-            GROUP BY year, quarter
-            ORDER BY year, quarter
-        """,
-        "States with Highest User Engagement": """
-            SELECT state, SUM(registered_users) as total_users, 
-            SUM(app_opens) as total_app_opens,
-            SUM(app_opens)/ SUM(registered_users) as engagement_ratio
-            FROM aggregated_user 
-            GROUP BY state
-            ORDER BY engagement_ratio DESC
-            LIMIT 10
-        """
-    }
-    
     # Select analysis type
-    selected_query = st.selectbox("Select Analysis Type", list(query_options.keys()), key="user_analysis")
+    selected_query = st.selectbox("Select Analysis Type", list(USER_QUERIES.keys()), key="user_analysis")
     
     # Execute selected query
-    results = execute_query(conn, query_options[selected_query])
+    df = query_dataframe(backend, USER_QUERIES[selected_query])
     
-    if not results:
+    if df.empty:
         st.warning("No data available for this analysis.")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(results)
-    
     # Display results based on query type
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        st.dataframe(df, use_container_width=True)
+        paged_table(backend, USER_QUERIES[selected_query], key="user_table")
     
     with col2:
         if selected_query == "Top 10 States by Registered Users":
             # Option 4: Sunburst Chart
             plot_df = df.copy()
+            plot_df['state'] = plot_df['state'].astype(str)
             # Add a central node for all states
             plot_df['country'] = 'India'
         
@@ -457,59 +734,32 @@ def user_analysis(conn):
             st.plotly_chart(fig, use_container_width=True)
 
 # Geographical Analysis
-def geographical_analysis(conn):
+def geographical_analysis(backend):
     st.markdown('<div class="sub-header">Geographical Analysis</div>', unsafe_allow_html=True)
     
     # Year and quarter selection for filtering
     col1, col2 = st.columns(2)
     with col1:
-        year = st.selectbox("Select Year", [2018, 2019, 2020, 2021, 2022, 2023, 2024], index=4)
+        year = st.selectbox("Select Year", GEO_YEARS, index=GEO_YEARS.index(GEO_DEFAULT_YEAR))
     with col2:
-        quarter = st.selectbox("Select Quarter", [1, 2, 3, 4], index=3)
+        quarter = st.selectbox("Select Quarter", GEO_QUARTERS, index=GEO_QUARTERS.index(GEO_DEFAULT_QUARTER))
     
     # Analysis type selection - Added Insurance
     analysis_type = st.radio(
         "Select Analysis Type",
-        ["Transaction Count", "Transaction Amount", "Registered Users", "App Opens", "Insurance Policies", "Insurance Amount"]
+        GEO_ANALYSIS_TYPES
     )
     
-    # Build query based on selection
-    if analysis_type in ["Transaction Count", "Transaction Amount"]:
-        query = f"""
-            SELECT state, 
-                  {'SUM(count) as value' if analysis_type == "Transaction Count" else 'SUM(amount) as value'}
-            FROM {'aggregated_transaction' if analysis_type in ["Transaction Count", "Transaction Amount"] else 'map_transaction'}
-            WHERE year = {year} AND quarter = {quarter}
-            GROUP BY state
-        """
-    elif analysis_type in ["Registered Users", "App Opens"]:  # User-based metrics
-        query = f"""
-            SELECT state, 
-                  {'SUM(registered_users) as value' if analysis_type == "Registered Users" else 'SUM(app_opens) as value'}
-            FROM {'aggregated_user' if analysis_type == "Registered Users" else 'map_user'}
-            WHERE year = {year} AND quarter = {quarter}
-            GROUP BY state
-        """
-    else:  # Insurance metrics
-        
-        query = f"""
-            SELECT state, 
-                  {'SUM(count) as value' if analysis_type == "Insurance Policies" else 'SUM(amount) as value'}
-            FROM aggregated_insurance
-            WHERE year = {year} AND quarter = {quarter}
-            GROUP BY state
-        """
+    # Fixed statement for the metric, with year and quarter bound as parameters
+    query, params = geo_query(analysis_type, year, quarter)
     
     # Execute query
-    results = execute_query(conn, query)
+    df = query_dataframe(backend, query, params)
     
-    if not results:
+    if df.empty:
         st.warning("No data available for this analysis.")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(results)
-    
     # Display aggregate metrics
     total_value = df['value'].sum()
     
@@ -527,8 +777,9 @@ def geographical_analysis(conn):
     # Create India map with proper state names
     fig = px.choropleth(
         df,
-        geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson",
-        featureidkey='properties.ST_NM',
+        # fitbounds over India renders at about mapbox zoom 4
+        geojson=state_boundaries(zoom=4),
+        featureidkey=feature_id_key("states"),
         locations='state',  # Use the mapped state names
         color='value',
         color_continuous_scale='Purples' if not analysis_type.startswith("Insurance") else 'Teal',
@@ -584,20 +835,13 @@ def geographical_analysis(conn):
         st.subheader("Insurance Trends")
         
         # Query to get trend data
-        trend_query = f"""
-            SELECT year, quarter, SUM({'count' if analysis_type == "Insurance Policies" else 'amount'}) as value
-            FROM aggregated_insurance
-            GROUP BY year, quarter
-            ORDER BY year, quarter
-        """
+        trend_query = geo_trend_query(analysis_type)
         
-        trend_results = execute_query(conn, trend_query)
+        trend_df = query_dataframe(backend, trend_query)
         
-        if trend_results:
-            trend_df = pd.DataFrame(trend_results)
-            
+        if not trend_df.empty:
             # Create time period labels
-            trend_df['period'] = trend_df.apply(lambda x: f"{x['year']} Q{x['quarter']}", axis=1)
+            trend_df['period'] = trend_df['year'].astype(str) + ' Q' + trend_df['quarter'].astype(str)
             
             # Create line chart
             fig = px.line(
@@ -610,1062 +854,105 @@ def geographical_analysis(conn):
             
             st.plotly_chart(fig, use_container_width=True)
 
-def business_case_studies(conn):
-    st.markdown('<div class="sub-header">Business Case Studies</div>', unsafe_allow_html=True)
-    
-    # Define business case studies with descriptions and multiple SQL queries
-    case_studies = {
-        "1. Decoding Transaction Dynamics on PhonePe": {
-            "description": "Analyzing patterns and trends in user transactions to uncover key insights driving PhonePe's digital payment ecosystem.",
-            "queries": {
-                "State-wise Transaction Trends": {
-                    "query": """
-                        SELECT 
-                            state,
-                            year,
-                            quarter,
-                            SUM(count) AS total_transactions,
-                            SUM(amount) AS total_transaction_value
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            state, year, quarter
-                        ORDER BY 
-                            state, year, quarter;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "State-wise Transaction Trends"}
-                },
-                "Quarter-wise Transaction Trends": {
-                    "query": """
-                        SELECT 
-                            quarter,
-                            SUM(amount) AS total_value,
-                            SUM(count) AS total_count
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            quarter
-                        ORDER BY 
-                            quarter ASC;
-                    """,
-                    "viz_type": "dual_axis",
-                    "viz_params": {"x_col": "quarter", "y_col1": "total_count", "y_col2": "total_value", "title": "Quarter-wise Transaction Trends","y_title1": "Transaction Count","y_title2": "Transaction Value (₹)"}
-                },
-                "Payment Category-wise Trends": {
-                    "query": """
-                        SELECT 
-                            transaction_type,
-                            SUM(amount) AS total_value,
-                            SUM(count) AS total_count
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            transaction_type
-                        ORDER BY 
-                            total_value DESC;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "transaction_type", "y_col": "total_value", "title": "Payment Category-wise Trends"}
-                },
-                "State + Quarter Combination Analysis": {
-                    "query": """
-                        SELECT 
-                            state,
-                            year,
-                            quarter,
-                            SUM(amount) AS total_value,
-                            SUM(count) AS total_count
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            state, quarter,year
-                        ORDER BY 
-                            state, quarter,year;
-                    """,
-                    "viz_type": "group_bar_1",
-                    "viz_params": {"x_col": "state", "y_col": "total_value", "color": "year", "title": "Transaction Values by State, Year and Quarter"}
-                }
-            },
-            "insights": """
-                - Digital Commerce Leadership: Average transaction of ₹1.47K with Merchant Payments dominating indicates PhonePe has become essential infrastructure for everyday retail, from street vendors to small businesses across India.
-                - Economic Hub Concentration: Top states (Maharashtra, Karnataka, UP) align with major economic centers, while remote regions (Mizoram, Lakshadweep, Andaman) show significant growth potential in underserved markets.
-                - Mainstream Adoption: The moderate transaction value suggests successful penetration beyond urban elites into middle-class daily commerce, replacing cash for routine purchases and bill payments.
-            """
-        },
-        "2. User Engagement and Growth Strategy": {
-            "description": "Identifying user behavior patterns and strategic levers to enhance engagement, retention, and overall growth on the PhonePe platform.",
-            "queries": {
-                "State-wise Total Registered Users and App Opens": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(registered_users) AS total_registered_users,
-                            SUM(app_opens) AS total_app_opens
-                        FROM 
-                            aggregated_user
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_registered_users DESC;
-                        
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_registered_users", "title": "State-wise Total Registered Users and App Opens"}
-                },
-                "District-wise Total Registered Users": {
-                    "query": """
-                       SELECT 
-                            state,
-                            district,
-                            SUM(registered_users) AS total_registered_users
-                        FROM 
-                            map_user
-                        GROUP BY 
-                            state, district
-                        ORDER BY 
-                            total_registered_users DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "district", "y_col": "total_registered_users", "title": "District-wise Total Registered Users"}
-                },
-                "Top 10 States with Highest App Opens": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(app_opens) AS total_app_opens
-                        FROM 
-                            aggregated_user
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_app_opens DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_app_opens", "title": "Top 10 States with Highest App Opens"}
-                },
-                "States with Low Registered Users but High App Opens": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(registered_users) AS total_registered_users,
-                            SUM(app_opens) AS total_app_opens,
-                            (SUM(app_opens) - SUM(registered_users)) AS gap
-                        FROM 
-                            aggregated_user
-                        GROUP BY 
-                            state
-                        HAVING 
-                            gap > 0
-                        ORDER BY 
-                            gap DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "group_bar",
-                    "viz_params": {"x_col": "state", "y_cols": ["total_registered_users", "total_app_opens"],"title": "Top 10 States: App Opens vs Registered Users Gap","color_name": "Metric"}
-                }
-            },
-            "insights": """
-                - States like Maharashtra, Uttar Pradesh, and Karnataka have the highest number of registered users and app opens, indicating strong engagement
-                - Lower-performing states could be targeted for marketing campaigns
-                - Districts like Bangalore Urban and Pune dominate user registration, suggesting dense urban adoption
-                - States like Maharashtra and Karnataka show the maximum app activity, reflecting higher user engagement and potential for upselling services
-            """
-        },
-
-        "3. Insurance Engagement Analysis": {
-            "description": "Analyzing user interaction and adoption trends to evaluate the effectiveness and growth potential of insurance services on PhonePe.",
-            "queries": {
-                "State-wise Total Insurance Transactions and Values": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(count) AS total_insurance_transactions,
-                            SUM(amount) AS total_insurance_value
-                        FROM 
-                            aggregated_insurance
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_insurance_transactions DESC;
-                        
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_insurance_transactions", "title": "State-wise Total Insurance Transactions and Values"}
-                },
-                "District-wise Total Insurance Transactions": {
-                    "query": """
-                        SELECT 
-                            state,
-                            district,
-                            SUM(policy_count) AS total_insurance_transactions,
-                            SUM(insured_amount) AS total_insurance_value
-                        FROM 
-                            map_insurance
-                        GROUP BY 
-                            state, district
-                        ORDER BY 
-                            total_insurance_transactions DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "district", "y_col": "total_insurance_transactions", "title": "District-wise Total Insurance Transactions"}
-                },
-                "Top 10 States by Insurance Transaction Value": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(amount) AS total_insurance_value
-                        FROM 
-                            aggregated_insurance
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_insurance_value DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_insurance_value", "title": "Top 10 States by Insurance Transaction Value"}
-                },
-                "Find States with Low Insurance Uptake": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(count) AS total_insurance_transactions
-                        FROM 
-                            aggregated_insurance
-                        GROUP BY 
-                            state
-                        HAVING 
-                            SUM(count) < 50000
-                        ORDER BY 
-                            total_insurance_transactions ASC;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_insurance_transactions", "title": "States with Low Insurance Uptake"}
-                },
-                "State-wise Insurance Penetration (%)": {
-                    "query": """
-                        SELECT 
-                            ins.state,
-                            (SUM(ins.amount) / SUM(trx.amount)) * 100 AS insurance_percentage
-                        FROM 
-                            aggregated_insurance ins
-                        JOIN 
-                            aggregated_transaction trx 
-                        ON 
-                            ins.state = trx.state
-                        GROUP BY 
-                            ins.state
-                        ORDER BY 
-                            insurance_percentage DESC;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "insurance_percentage", "title": "State-wise Insurance Penetration (%)"}
-                }
-            },
-            "insights": """
-                - States like Karnataka, Maharashtra, and Tamil Nadu lead in insurance transactions and value, suggesting higher insurance awareness among users
-                - Urban centers like Bangalore Urban and Pune show high insurance engagement, aligning with financial literacy trends
-                - States with the highest insurance transaction value represent mature markets; further cross-selling of premium plans can be explored
-                - The analysis highlights that states like Lakshadweep, Ladakh, and others have the lowest insurance transaction counts. This indicates a major growth opportunity where PhonePe can target insurance marketing campaigns, customized offerings, or awareness programs to increase insurance penetration
-                - States with low insurance penetration (e.g., Andra Pradesh and Madhya Pradesh) represent significant opportunities for insurance marketing and user education
-            """
-        },
+# Scatter-style chart that is decimated when dense; a box selection redraws that region in detail
+def render_lod_chart(selected_case, query_name, query_info, df):
+    viz_type = query_info["viz_type"]
+    view_key = f"case_view_{selected_case}_{query_name}"
+    view = st.session_state.get(view_key)
+    fig_json = figure_json(viz_type, df, query_info["viz_params"],
+                            cache=get_figure_cache(), metrics=get_metrics(), view=view)
+    if fig_json is None:
+        return
+    st.subheader("Visualization")
+    dense = len(df) > CHART_LOD_MAX_POINTS
+    if view:
+        if st.button("Reset zoom", key=f"{view_key}_reset"):
+            del st.session_state[view_key]
+            st.rerun()
+    elif dense:
+        st.caption(f"{len(df):,} points, thinned for display. Box-select a region to see all of its points.")
+    fig = pio.from_json(fig_json, skip_invalid=True)
+    if not (dense or view):
+        st.plotly_chart(fig, use_container_width=uses_container_width(viz_type))
+        return
+    # A new key per view so the previous selection does not carry over
+    event = st.plotly_chart(
+        fig,
+        use_container_width=uses_container_width(viz_type),
+        key=f"{view_key}_{json.dumps(view, sort_keys=True)}",
+        on_select="rerun",
+        selection_mode="box"
+    )
+    boxes = event.selection.get("box", [])
+    if boxes:
+        st.session_state[view_key] = {"x": boxes[0].get("x"), "y": boxes[0].get("y")}
+        st.rerun()
 
-        "4.Transaction Analysis Across States and Districts": {
-            "description": "Examining regional transaction trends to uncover geographic patterns, usage intensity, and growth opportunities across Indian states and districts on PhonePe.",
-            "queries": {
-                "Top States by Total Transaction Value": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(count) AS total_transactions,
-                            SUM(amount) AS total_transaction_value
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_transaction_value DESC
-                        LIMIT 10;
-                        
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "Top States by Total Transaction Value"}
-                },
-                "Top Districts by Total Transaction Value": {
-                    "query": """
-                        SELECT 
-                            state,
-                            district,
-                            SUM(transaction_count) AS total_transactions,
-                            SUM(transaction_amount) AS total_transaction_value
-                        FROM 
-                            map_transaction
-                        GROUP BY 
-                            state, district
-                        ORDER BY 
-                            total_transaction_value DESC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "district", "y_col": "total_transaction_value", "title": "Top Districts by Total Transaction Value"}
-                },
-                "Bottom 10 States (Low Transaction Value)": {
-                    "query": """
-                        SELECT 
-                            state,
-                            SUM(count) AS total_transactions,
-                            SUM(amount) AS total_transaction_value
-                        FROM 
-                            aggregated_transaction
-                        GROUP BY 
-                            state
-                        ORDER BY 
-                            total_transaction_value ASC
-                        LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "state", "y_col": "total_transaction_value", "title": "Bottom 10 States (Low Transaction Value)"}
-                },
-                "contribution percentage of a district in state total!": {
-                    "query": """
-                        SELECT 
-                            m.state,
-                            m.district,
-                            SUM(m.transaction_amount) AS district_total,
-                            (SUM(m.transaction_amount) / s.state_total) * 100 AS contribution_percentage
-                        FROM 
-                            map_transaction m
-                        JOIN 
-                            (SELECT 
-                                state, 
-                                SUM(amount) AS state_total 
-                            FROM 
-                                aggregated_transaction 
-                            GROUP BY 
-                                state) s
-                            ON 
-                                m.state = s.state
-                            GROUP BY 
-                                m.state, m.district, s.state_total
-                            ORDER BY 
-                                contribution_percentage DESC
-                            LIMIT 10;
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "district", "y_col": "contribution_percentage", "title": "contribution percentage of a district in state total"}
-                }
-            },
-            "insights": """
-                - States like Maharashtra, Karnataka, and Telangana dominate the transaction value, indicating a mature and digitally active user base
-                - Districts like Bengaluru Urban, Pune, and Hyderabad are key transaction hubs — these regions can be leveraged for premium services
-                - States like Lakshadweep, Mizoram, and Andaman and Nicobar Island show low transaction volumes, suggesting a potential for targeted marketing campaigns and partnership building
-                - Some states show heavy dependence on just 1-2 districts (example: Chandigarh District drives a big chunk of Punjabs transactions). Such states should diversify focus beyond just top cities
-            """
-        },
+# Table, chart and CSV download for one case-study query result
+def render_case_query(backend, selected_case, query_name, query_info, df):
+    paged_table(backend, query_info["query"], key=f"case_table_{selected_case}_{query_name}")
+    
+    # Create visualization based on the specified type
+    if not df.empty:
+        viz_type = query_info["viz_type"]
+        if uses_level_of_detail(viz_type):
+            render_lod_chart(selected_case, query_name, query_info, df)
+        else:
+            fig_json = figure_json(viz_type, df, query_info["viz_params"],
+                                    cache=get_figure_cache(), metrics=get_metrics())
+            if fig_json is not None:
+                st.subheader("Visualization")
+                st.plotly_chart(pio.from_json(fig_json, skip_invalid=True), use_container_width=uses_container_width(viz_type))
+    
+    # Option to download the data
+    csv = df.to_csv(index=False)
+    st.download_button(
+        label="Download Data as CSV",
+        data=csv,
+        file_name=f"{selected_case}_{query_name}.csv",
+        mime='text/csv',
+    )
 
-        "5.User Registration Analysis": {
-            "description": "Analyzing user registration trends to understand adoption patterns, regional growth, and onboarding effectiveness on the PhonePe platform.",
-            "queries": {
-                "Brand Preference Analysis": {
-                    "query": """
-                        SELECT 
-                            brand,
-                            SUM(device_count) as total_devices,
-                            ROUND(AVG(device_percentage) * 100, 2) as average_percentage
-                        FROM aggregated_user
-                        GROUP BY brand
-                        ORDER BY total_devices DESC
-                        LIMIT 10;
-                        
-                    """,
-                    "viz_type": "bar",
-                    "viz_params": {"x_col": "brand", "y_col": "average_percentage", "title": "Top Brands by Registered Users on PhonePe"}
-                },
-                "Comprehensive Registration Analysis with Multiple Metrics": {
-                    "query": """
-                        SELECT 
-                            m.state,
-                            SUM(m.registered_users) as total_registered_users,
-                            COUNT(DISTINCT m.district) as districts_count,
-                            ROUND(SUM(m.registered_users) / COUNT(DISTINCT m.district), 0) as avg_users_per_district,
-                            (SELECT SUM(transaction_count) 
-                                FROM map_transaction mt 
-                                ) as total_transactions
-                        FROM map_user m
-                        GROUP BY m.state
-                        ORDER BY total_registered_users DESC;
-                    """,
-                    "viz_type": "combo_bar_line",
-                    "viz_params": {"x_col": "state", "y_col_bar": "total_registered_users","y_col_line": "avg_users_per_district","tooltip_cols": ["districts_count", "total_transactions"],"title": "State-wise User Registration with Average per District","y_title_bar": "Total Registered Users","y_title_line": "Avg Users per District"}
-                },
-                "Year-on-Year Growth in User Registration by State": {
-                    "query": """
-                        WITH yearly_registrations AS (
-                            SELECT 
-                                state,
-                                year,
-                                SUM(registered_users) as yearly_users
-                            FROM map_user
-                            GROUP BY state, year
-                        ),
-                        yearly_growth AS (
-                            SELECT 
-                                current.state,
-                                current.year as current_year,
-                                current.yearly_users as current_year_users,
-                                prev.year as previous_year,
-                                prev.yearly_users as previous_year_users,
-                                (current.yearly_users - prev.yearly_users) as absolute_growth,
-                                CASE 
-                                    WHEN prev.yearly_users > 0 
-                                    THEN ROUND((current.yearly_users - prev.yearly_users) * 100.0 / prev.yearly_users, 2)
-                                    ELSE NULL
-                                END as growth_percentage
-                            FROM yearly_registrations current
-                            LEFT JOIN yearly_registrations prev 
-                                ON current.state = prev.state AND current.year = prev.year + 1
-                            WHERE prev.yearly_users IS NOT NULL  -- Ensure there's a previous year to compare with
-                        )
-                        SELECT 
-                            state,
-                            current_year,
-                            previous_year,
-                            current_year_users,
-                            previous_year_users,
-                            absolute_growth,
-                            growth_percentage,
-                            CASE
-                                WHEN growth_percentage > 50 THEN 'High Growth'
-                                WHEN growth_percentage > 20 THEN 'Moderate Growth'
-                                WHEN growth_percentage > 0 THEN 'Low Growth'
-                                WHEN growth_percentage = 0 THEN 'Stagnant'
-                                ELSE 'Declining'
-                            END as growth_category
-                        FROM yearly_growth
-                        ORDER BY current_year, growth_percentage DESC;
-                    """,
-                    "viz_type": "scatter_categories",
-                    "viz_params": {"x_col": "growth_percentage", "y_col": "current_year_users","color_col": "growth_category","hover_name": "state","size_col": "absolute_growth","facet_col": "current_year","title": "User Growth Analysis by State and Year"}
-                },
-                "multi-dimensional cohort analysis of PhonePe user": {
-                    "query": """
-                        WITH registration_trends AS (
-                            -- Get registration data by state, year, quarter
-                            SELECT 
-                                mu.state,
-                                mu.year,
-                                mu.quarter,
-                                SUM(mu.registered_users) AS total_registrations,
-                                SUM(mu.app_opens) AS total_app_opens,
-                                COUNT(DISTINCT mu.district) AS active_districts
-                            FROM map_user mu
-                            GROUP BY mu.state, mu.year, mu.quarter
-                        ),
-                        transaction_metrics AS (
-                            -- Get transaction data by state, year, quarter
-                            SELECT 
-                                mt.state,
-                                mt.year,
-                                mt.quarter,
-                                SUM(mt.transaction_count) AS total_transactions,
-                                SUM(mt.transaction_amount) AS total_amount,
-                                SUM(mt.transaction_count)/COUNT(DISTINCT mt.district) AS avg_transactions_per_district
-                            FROM map_transaction mt
-                            GROUP BY mt.state, mt.year, mt.quarter
-                        ),
-                        device_distribution AS (
-                            -- Get device brand data
-                            SELECT 
-                                au.state,
-                                au.year,
-                                au.quarter,
-                                au.brand,
-                                SUM(au.device_count) AS total_devices,
-                                SUM(au.device_count*au.device_percentage)/SUM(au.device_count) AS weighted_percentage
-                            FROM aggregated_user au
-                            GROUP BY au.state, au.year, au.quarter, au.brand
-                        ),
-                        dominant_brands AS (
-                            -- Find dominant brand per state/period
-                            SELECT 
-                                state,
-                                year,
-                                quarter,
-                                FIRST_VALUE(brand) OVER (
-                                    PARTITION BY state, year, quarter 
-                                    ORDER BY total_devices DESC
-                                ) AS top_brand,
-                                FIRST_VALUE(weighted_percentage) OVER (
-                                    PARTITION BY state, year, quarter 
-                                    ORDER BY total_devices DESC
-                                ) AS top_brand_percentage
-                            FROM device_distribution
-                        ),
-                        insurance_adoption AS (
-                            -- Get insurance data where available
-                            SELECT
-                                mi.state,
-                                mi.year, 
-                                mi.quarter,
-                                SUM(mi.policy_count) AS total_policies,
-                                SUM(mi.insured_amount) AS total_insured_amount,
-                                COUNT(DISTINCT mi.district) AS districts_with_insurance
-                            FROM map_insurance mi
-                            GROUP BY mi.state, mi.year, mi.quarter
-                        )
-                        SELECT
-                            -- Basic identifiers
-                            rt.state,
-                            rt.year,
-                            rt.quarter,
-                            
-                            -- Registration metrics
-                            rt.total_registrations,
-                            rt.total_app_opens,
-                            rt.active_districts,
-                            ROUND(rt.total_app_opens/NULLIF(rt.total_registrations, 0), 2) AS app_opens_per_user,
-                            
-                            -- Transaction metrics
-                            tm.total_transactions,
-                            tm.total_amount,
-                            ROUND(tm.total_transactions/NULLIF(rt.total_registrations, 0), 2) AS transactions_per_user,
-                            tm.avg_transactions_per_district,
-                            
-                            -- Device metrics
-                            db.top_brand,
-                            ROUND(db.top_brand_percentage * 100, 1) AS top_brand_percentage,
-                            
-                            -- Insurance metrics
-                            ia.total_policies,
-                            ia.total_insured_amount,
-                            ROUND(ia.total_policies/NULLIF(rt.total_registrations, 0) * 1000, 2) AS policies_per_1000_users,
-                            
-                            -- Derived/calculated metrics
-                            CASE
-                                WHEN rt.total_registrations > 1000000 THEN 'Very High'
-                                WHEN rt.total_registrations > 500000 THEN 'High'
-                                WHEN rt.total_registrations > 100000 THEN 'Medium'
-                                ELSE 'Low'
-                            END AS registration_tier,
-                            
-                            CASE
-                                WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 5 THEN 'Highly Engaged'
-                                WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 2 THEN 'Moderately Engaged'
-                                WHEN tm.total_transactions/NULLIF(rt.total_registrations, 0) > 0 THEN 'Slightly Engaged'
-                                ELSE 'Not Engaged'
-                            END AS engagement_level,
-                            
-                            -- Market penetration metric (comparing districts with any activity vs districts with insurance)
-                            ROUND(ia.districts_with_insurance/NULLIF(rt.active_districts, 0) * 100, 1) AS insurance_district_coverage_percent
-                            
-                        FROM registration_trends rt
-                        LEFT JOIN transaction_metrics tm 
-                            ON rt.state = tm.state AND rt.year = tm.year AND rt.quarter = tm.quarter
-                        LEFT JOIN (
-                            SELECT DISTINCT state, year, quarter, top_brand, top_brand_percentage
-                            FROM dominant_brands
-                        ) db 
-                            ON rt.state = db.state AND rt.year = db.year AND rt.quarter = db.quarter
-                        LEFT JOIN insurance_adoption ia 
-                            ON rt.state = ia.state AND rt.year = ia.year AND rt.quarter = ia.quarter
-                        WHERE rt.year BETWEEN 2018 AND 2024  -- Adjust years as needed
-                        ORDER BY 
-                            rt.year DESC, 
-                            rt.quarter DESC, 
-                            rt.total_registrations DESC;
-                    """,
-                    "viz_type": "advanced_bubble",
-                    "viz_params": {
-                        "x_col": "transactions_per_user", 
-                        "y_col": "total_registrations",
-                        "size_col": "total_amount",
-                        "color_col": "engagement_level",
-                        "hover_name": "state",
-                        "animation_col": "year",
-                        "animation_group": "state",
-                        "facet_col": "quarter",
-                        "title": "State Performance Dashboard: Engagement vs Registration"
-                    }
-                }
-            },
-            "insights": """
-                - High users but low avg per district       --  Spread thin    --     User concentration is low; marketing can focus on dense areas
-                - High users, high transactions      --          Good conversion  --   Indicates strong onboarding and active users
-                - High districts, low total users    --          Untapped potential --   Launch district-focused campaigns
-                - Low/Negative growth -- Stagnation — investigate reasons (e.g., saturation, competition)
-                - Growth category -- Segment states for tailored marketing (e.g., retention in low-growth vs. onboarding in high-growth)
-            """
-        }
-       
-    }
+def business_case_studies(backend):
+    st.markdown('<div class="sub-header">Business Case Studies</div>', unsafe_allow_html=True)
     
     # Create a selection dropdown for the case studies
-    selected_case = st.selectbox("Select a Business Case Study", list(case_studies.keys()))
+    selected_case = st.selectbox("Select a Business Case Study", list(CASE_STUDIES.keys()))
     
     # Display the selected case study
     st.markdown("### " + selected_case)
-    st.write(case_studies[selected_case]["description"])
-    
-    # Create tabs for different queries within the case study
-    query_tabs = st.tabs(list(case_studies[selected_case]["queries"].keys()))
-    
-    # Process each query in its own tab
-    for i, (query_name, query_info) in enumerate(case_studies[selected_case]["queries"].items()):
-        with query_tabs[i]:
-            st.subheader(query_name)
-            
-            # Run the query
-            try:
-                df = pd.read_sql_query(query_info["query"], conn)
-                st.dataframe(df)
-                
-                # Create visualization based on the specified type
-                if not df.empty:
-                    st.subheader("Visualization")
-                    viz_type = query_info["viz_type"]
-                    params = query_info["viz_params"]
-                    
-                    if viz_type == "choropleth" and "state" in df.columns:
-                        fig = px.choropleth_mapbox(
-                            df, 
-                            geojson="https://gist.githubusercontent.com/jbrobst/56c13bbbf9d97d187fea01ca62ea5112/raw/e388c4cae20aa53cb5090210a42ebb9b765c0a36/india_states.geojson", 
-                            locations='state', 
-                            featureidkey='properties.ST_NM',
-                            color=params["color_col"],
-                            color_continuous_scale="Viridis",
-                            mapbox_style="carto-positron",
-                            zoom=3, center={"lat": 20.5937, "lon": 78.9629},
-                            opacity=0.7,
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-                    
-                    elif viz_type == "bar":
-                        fig = px.bar(
-                            df, 
-                            x=params["x_col"], 
-                            y=params["y_col"], 
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-
-                    elif viz_type == "advanced_bubble":
-                        # Create an animated bubble chart with facets
-                        fig = px.scatter(
-                            df,
-                            x=params["x_col"],
-                            y=params["y_col"],
-                            size=params["size_col"],
-                            color=params["color_col"],
-                            hover_name=params["hover_name"],
-                            animation_frame=params.get("animation_col"),
-                            animation_group=params.get("animation_group"),
-                            facet_col=params.get("facet_col"),
-                            size_max=60,
-                            title=params["title"],
-                            labels={
-                                col: col.replace('_', ' ').title() 
-                                for col in [params["x_col"], params["y_col"], params["size_col"], params["color_col"]]
-                            },
-                            color_discrete_map={
-                                'Highly Engaged': '#1a9850',     # Green
-                                'Moderately Engaged': '#91cf60', # Light green
-                                'Slightly Engaged': '#fee08b',   # Light yellow
-                                'Not Engaged': '#d73027'         # Red
-                            },
-                            height=600
-                        )
-                        
-                        # Customize hover information
-                        hover_template = (
-                            "<b>%{hovertext}</b><br><br>" +
-                            "Transactions per User: %{x:.2f}<br>" +
-                            "Total Registrations: %{y:,.0f}<br>" +
-                            "Transaction Amount: ₹%{marker.size:,.0f}<br>" +
-                            "Engagement: %{customdata[3]}<br><br>" +  # Store engagement_level in customdata
-                            
-                            "<extra></extra>"
-                        )
-
-                        # And update the customdata to include engagement_level
-                        fig.update_traces(
-                            customdata=df[[
-                                "top_brand", 
-                                "top_brand_percentage", 
-                                "policies_per_1000_users",
-                                params["color_col"]  # engagement_level
-                            ]],
-                            hovertemplate=hover_template
-                        )
-                        
-                        # Add reference quadrant lines
-                        fig.add_shape(type="line", x0=df[params["x_col"]].median(), y0=0, 
-                                    x1=df[params["x_col"]].median(), y1=df[params["y_col"]].max()*1.05,
-                                    line=dict(color="gray", width=1, dash="dash"))
-                        
-                        fig.add_shape(type="line", x0=0, y0=df[params["y_col"]].median(), 
-                                    x1=df[params["x_col"]].max()*1.05, y1=df[params["y_col"]].median(),
-                                    line=dict(color="gray", width=1, dash="dash"))
-                        
-                        # Add quadrant labels
-                        annotations = [
-                            dict(x=df[params["x_col"]].max()*0.25, y=df[params["y_col"]].max()*0.85, 
-                                text="High Registration<br>Low Engagement", showarrow=False, 
-                                font=dict(size=10, color="gray")),
-                            dict(x=df[params["x_col"]].max()*0.75, y=df[params["y_col"]].max()*0.85, 
-                                text="High Registration<br>High Engagement", showarrow=False, 
-                                font=dict(size=10, color="gray")),
-                            dict(x=df[params["x_col"]].max()*0.25, y=df[params["y_col"]].max()*0.15, 
-                                text="Low Registration<br>Low Engagement", showarrow=False, 
-                                font=dict(size=10, color="gray")),
-                            dict(x=df[params["x_col"]].max()*0.75, y=df[params["y_col"]].max()*0.15, 
-                                text="Low Registration<br>High Engagement", showarrow=False, 
-                                font=dict(size=10, color="gray"))
-                        ]
-                        fig.update_layout(annotations=annotations)
-                        
-                        # Improve layout
-                        fig.update_layout(
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                            margin=dict(l=20, r=20, t=60, b=20)
-                        )
-                        
-                        st.plotly_chart(fig)
-
-                    elif viz_type == "combo_bar_line":
-                        # Create figure with secondary y-axis
-                        fig = make_subplots(specs=[[{"secondary_y": True}]])
-    
-                        # Add bar chart on primary y-axis
-                        fig.add_trace(
-                            go.Bar(
-                                x=df[params["x_col"]],
-                                y=df[params["y_col_bar"]],
-                                name=params.get("y_title_bar", params["y_col_bar"]),
-                                marker_color='rgb(55, 83, 109)'
-                            ),
-                            secondary_y=False
-                        )
-    
-                        # Add line chart on secondary y-axis
-                        fig.add_trace(
-                            go.Scatter(
-                                x=df[params["x_col"]],
-                                y=df[params["y_col_line"]],
-                                name=params.get("y_title_line", params["y_col_line"]),
-                                marker_color='rgb(200, 50, 50)',
-                                mode='lines+markers'
-                            ),
-                            secondary_y=True
-                        )
-    
-                        # Add hover data if specified
-                        if "tooltip_cols" in params:
-                            hovertemplate = "<b>%{x}</b><br><br>"
-                            hovertemplate += f"{params.get('y_title_bar', params['y_col_bar'])}: %{{y:,.0f}}<br>"
-        
-                            for col in params["tooltip_cols"]:
-                                if col in df.columns:
-                                    fig.update_traces(
-                                        customdata=df[params["tooltip_cols"]],
-                                        selector=dict(type='bar')
-                                    )
-                
-                                    idx = params["tooltip_cols"].index(col)
-                                    hovertemplate += f"{col.replace('_', ' ').title()}: %{{customdata[{idx}]:,.0f}}<br>"
-                
-                            hovertemplate += "<extra></extra>"
-                            fig.update_traces(hovertemplate=hovertemplate, selector=dict(type='bar'))
-    
-                        # Update layout
-                        fig.update_layout(
-                            title_text=params["title"],
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                            margin=dict(l=20, r=20, t=60, b=20),
-                            xaxis=dict(
-                                title=params["x_col"].replace('_', ' ').title(),
-                                categoryorder='total descending'  # Sorts by bar height
-                            )
-                        )
-    
-                        # Update y-axes titles
-                        fig.update_yaxes(
-                            title_text=params.get("y_title_bar", params["y_col_bar"]), 
-                            secondary_y=False
-                        )
-                        fig.update_yaxes(
-                            title_text=params.get("y_title_line", params["y_col_line"]), 
-                            secondary_y=True
-                        )
-    
-                        st.plotly_chart(fig)
-
-                    elif viz_type == "dual_axis":
-                         # Create a figure with primary Y-axis
-                        fig = go.Figure()
-    
-                        # Add first trace - line for count
-                        fig.add_trace(go.Scatter(
-                            x=df[params["x_col"]],
-                            y=df[params["y_col1"]],
-                            name=params["y_col1"].replace('_', ' ').title(),
-                            mode='lines+markers',
-                            line=dict(color='#1f77b4', width=3),
-                            marker=dict(size=8)
-                        ))
-    
-                        # Add second trace - line for value on secondary y-axis
-                        fig.add_trace(go.Scatter(
-                            x=df[params["x_col"]],
-                            y=df[params["y_col2"]],
-                            name=params["y_col2"].replace('_', ' ').title(),
-                            mode='lines+markers',
-                            line=dict(color='#ff7f0e', width=3),
-                            marker=dict(size=8),
-                            yaxis="y2"
-                        ))
+    st.write(CASE_STUDIES[selected_case]["description"])
     
-                        # Set up the layout with a secondary y-axis
-                        fig.update_layout(
-                            title=params["title"],
-                            xaxis_title=params["x_col"].replace('_', ' ').title(),
-                            yaxis=dict(
-                                title=params.get("y_title1", params["y_col1"].replace('_', ' ').title()),
-                                side="left",
-                                showgrid=True
-                            ),
-                            yaxis2=dict(
-                                title=params.get("y_title2", params["y_col2"].replace('_', ' ').title()),
-                                side="right",
-                                showgrid=False,
-                                overlaying="y"
-                            ),
-                            legend=dict(x=0.01, y=0.99, bordercolor="Black", borderwidth=1),
-                            hovermode="x unified",
-                            template="plotly_white"
-                        )
+    # One query view at a time: only the viewed query blocks the page, the others
+    # are prefetched on the scheduler and cancelled if the user moves on
+    queries = CASE_STUDIES[selected_case]["queries"]
+    query_name = st.radio("Query", list(queries.keys()), horizontal=True, key=f"case_query_{selected_case}")
+    query_info = queries[query_name]
+    futures = schedule_case_queries(backend, selected_case, query_name)
     
-                        # Add range slider
-                        fig.update_layout(
-                            xaxis=dict(
-                            rangeslider=dict(visible=True),
-                            type="category"
-                            )
-                        )
-    
-                        st.plotly_chart(fig, use_container_width=True)
-
-                    elif viz_type == "scatter_categories":
-                        # Create scatter plot with categorial coloring
-                        fig = px.scatter(
-                            df,
-                            x=params["x_col"],
-                            y=params["y_col"],
-                            color=params["color_col"],
-                            size=params.get("size_col"),
-                            hover_name=params.get("hover_name"),
-                            facet_col=params.get("facet_col"),
-                            title=params["title"],
-                            labels={
-                                params["x_col"]: params["x_col"].replace('_', ' ').title(),
-                                params["y_col"]: params["y_col"].replace('_', ' ').title(),
-                                params["color_col"]: params["color_col"].replace('_', ' ').title()
-                            },
-                            # Define color scheme for growth categories
-                            color_discrete_map={
-                                'High Growth': '#1a9850',     # Green
-                                'Moderate Growth': '#91cf60', # Light green
-                                'Low Growth': '#d9ef8b',      # Yellow-green
-                                'Stagnant': '#fee08b',        # Light yellow
-                                'Declining': '#d73027'        # Red
-                            },
-                            # Add quadrant lines
-                            category_orders={
-                                "growth_category": ["High Growth", "Moderate Growth", "Low Growth", "Stagnant", "Declining"]
-                            }
-                        )
-    
-                        # Add reference line at 0% growth
-                        fig.add_shape(
-                            type="line", 
-                            x0=0, y0=0, 
-                            x1=0, y1=1, 
-                            xref="x", yref="paper",
-                            line=dict(color="black", width=1, dash="dash")
-                        )
-    
-                        # Improve layout
-                        fig.update_layout(
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                            margin=dict(l=20, r=20, t=60, b=20)
-                        )
-    
-                        # Add hover data for additional context
-                        fig.update_traces(
-                            hovertemplate="<b>%{hovertext}</b><br><br>" +
-                                        "Growth: %{x:.2f}%<br>" +
-                                        "Current Users: %{y:,.0f}<br>" +
-                                        "Absolute Growth: %{marker.size:,.0f}<br>" +
-                                        "<extra></extra>"
-                        )
-    
-                        st.plotly_chart(fig)
-                    
-                    elif viz_type == "group_bar_1":
-                        fig = px.bar(
-                            df, 
-                            x=params["x_col"], 
-                            y=params["y_col"], 
-                            color=params["color"],
-                            barmode="group",
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-
-                    elif viz_type == "group_bar":
-                        # Check if we're dealing with the specific case of registered users vs app opens
-                        if "y_cols" in params and isinstance(params["y_cols"], list):
-                            # For multiple y columns (like registered_users and app_opens)
-                            df_melted = pd.melt(
-                                df, 
-                                id_vars=["state", "gap"] if "gap" in df.columns else ["state"],
-                                value_vars=params["y_cols"],
-                                var_name="metric", 
-                                value_name="value"
-                            )
-        
-                            fig = px.bar(
-                                df_melted,
-                                x="state",
-                                y="value",
-                                color="metric",
-                                barmode="group",
-                                title=params["title"],
-                                labels={"value": "Count", "state": "State", "metric": params.get("color_name", "Metric")}
-                            )
-        
-                            # If gap exists, sort by it
-                            if "gap" in df.columns:
-                                fig.update_layout(xaxis={'categoryorder':'array', 'categoryarray': df.sort_values("gap", ascending=False)["state"]})
-        
-                            st.plotly_chart(fig)
-                        else:
-                            # Standard grouped bar chart with a single y column and a color column
-                            fig = px.bar(
-                                df, 
-                                x=params["x_col"], 
-                                y=params["y_col"], 
-                                color=params.get("color"),
-                                title=params["title"],
-                                barmode="group"
-                            )
-                            st.plotly_chart(fig)
-
-                    elif viz_type == "dual_axis_horizontal_bar":
-                        # Create the first horizontal bar trace
-                        fig = go.Figure()
-    
-                        # First trace - primary x-axis
-                        fig.add_trace(
-                            go.Bar(
-                                y=df[params["y_col"]],  # This is your category (quarters)
-                                x=df[params["x_col1"]], # First measure (total_count)
-                                name=params["x_title1"],
-                                orientation='h',        # Makes it horizontal
-                                marker=dict(color='blue')
-                            )
-                        )
-    
-                        # Create a secondary x-axis
-                        fig.add_trace(
-                            go.Bar(
-                                y=df[params["y_col"]],  # Same categories (quarters)
-                                x=df[params["x_col2"]], # Second measure (total_value)
-                                name=params["x_title2"],
-                                orientation='h',        # Makes it horizontal
-                                marker=dict(color='red'),
-                                xaxis='x2'              # Use secondary x-axis
-                            )
-                        )
-    
-                        # Update the layout to include both axes
-                        fig.update_layout(
-                            title=params["title"],
-                            xaxis=dict(
-                                title=params["x_title1"],
-                                side="bottom",
-                                anchor="y"
-                            ),
-                            xaxis2=dict(
-                                title=params["x_title2"],
-                                side="top",
-                                anchor="y",
-                                overlaying="x"
-                            ),
-                            barmode='group',  # Group the bars
-                            legend=dict(orientation="h", y=1.1)  # Horizontal legend at the top
-                        )
-    
-                        st.plotly_chart(fig)
-                    
-                    elif viz_type == "lineplot":
-                        fig = px.line(
-                            df, 
-                            x=params["x_col"], 
-                            y=params["y_col"], 
-                            color=params.get("color"),
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-                    
-                    elif viz_type == "pie":
-                        fig = px.pie(
-                            df, 
-                            values=params["values"], 
-                            names=params["names"], 
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-                    
-                    elif viz_type == "scatter":
-                        fig = px.scatter(
-                            df, 
-                            x=params["x_col"], 
-                            y=params["y_col"], 
-                            color=params.get("color"),
-                            size=params.get("size"),
-                            title=params["title"]
-                        )
-                        st.plotly_chart(fig)
-                
-                # Option to download the data
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Download Data as CSV",
-                    data=csv,
-                    file_name=f"{selected_case}_{query_name}.csv",
-                    mime='text/csv',
-                )
-                
-            except Exception as e:
-                st.error(f"Error executing query: {e}")
+    st.subheader(query_name)
+    try:
+        with st.spinner("Running query..."):
+            df = wait_for_query(backend, futures[query_name], query_info["query"])
+        render_case_query(backend, selected_case, query_name, query_info, df)
+    except Exception as e:
+        st.error(f"Error executing query: {e}")
     
     # Display overall business insights
     st.subheader("Business Insights")
-    st.markdown(case_studies[selected_case]["insights"])
+    st.markdown(CASE_STUDIES[selected_case]["insights"])
 
 # Main function
 def main():
-    # Create connection to MySQL database
-    conn = create_db_connection()
-    if not conn:
+    # Connect to the configured analytics backend
+    backend = get_backend()
+    if not backend:
         st.error("Failed to connect to the database. Please check your connection settings.")
         return
+    if WARMUP_ON_START:
+        get_warmup(backend)
+    if API_EMBEDDED:
+        get_api_server(backend)
     
     # Page header
     display_header()
@@ -1680,102 +967,36 @@ def main():
         "Business Case Studies"
     ])
     
+    # Drop case-study prefetches queued by this session once it leaves that page
+    if page != "Business Case Studies":
+        get_scheduler().cancel(session_group())
+    
+    # Time the page and attribute its queries to it
+    get_metrics().begin_page(page)
+    
     # Display selected page
     if page == "Dashboard":
-        display_key_metrics(conn)
-        
-        # Add quick insights
-        st.markdown('<div class="sub-header">Quick Insights</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Transaction type distribution
-            results = execute_query(conn, """
-                SELECT transaction_type, SUM(count) as total
-                FROM aggregated_transaction
-                GROUP BY transaction_type
-                ORDER BY total DESC
-            """)
-            df = pd.DataFrame(results)
-            
-            fig = px.pie(
-                df,
-                values='total',
-                names='transaction_type',
-                title='Transaction Type Distribution',
-                color_discrete_sequence=px.colors.sequential.Purples
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Brand distribution
-            results = execute_query(conn, """
-                SELECT brand, SUM(device_count) as total
-                FROM aggregated_user
-                GROUP BY brand
-                ORDER BY total DESC
-                LIMIT 10
-            """)
-            df = pd.DataFrame(results)
-            
-            fig = px.bar(
-                df,
-                x='brand',
-                y='total',
-                title='Top 10 Device Brands',
-                color='total',
-                color_continuous_scale='Purples'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Quarterly trends
-        results = execute_query(conn, """
-            SELECT year, quarter, SUM(count) as transactions, SUM(amount) as amount
-            FROM aggregated_transaction
-            GROUP BY year, quarter
-            ORDER BY year, quarter
-        """)
-        df = pd.DataFrame(results)
-        df['period'] = df['year'].astype(str) + ' Q' + df['quarter'].astype(str)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['period'],
-            y=df['transactions'],
-            mode='lines+markers',
-            name='Transaction Count',
-            line=dict(color='rgb(103, 57, 183)', width=3)
-        ))
-        fig.add_trace(go.Scatter(
-            x=df['period'],
-            y=df['amount'],
-            mode='lines+markers',
-            name='Transaction Amount',
-            line=dict(color='rgb(255, 161, 90)', width=3),
-            yaxis='y2'
-        ))
-        fig.update_layout(
-            title='Quarterly Transaction Trends',
-            xaxis=dict(title='Period'),
-            yaxis=dict(title='Transaction Count', side='left'),
-            yaxis2=dict(title='Transaction Amount (₹)', side='right', overlaying='y', showgrid=False),
-            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        dashboard(backend)
         
     elif page == "Transaction Analysis":
-        transaction_analysis(conn)
+        transaction_analysis(backend)
         
     elif page == "User Analysis":
-        user_analysis(conn)
+        user_analysis(backend)
         
     elif page == "Geographical Analysis":
-        geographical_analysis(conn)
+        geographical_analysis(backend)
         
     elif page == "Business Case Studies":
-        business_case_studies(conn)
+        business_case_studies(backend)
+    get_metrics().end_page()
+    
+    # Rendered after the page so the counts include this rerun
+    display_warmup_progress()
+    display_cache_stats()
+    display_datastore_stats(backend)
+    display_pool_stats(backend)
+    display_debug_panel()
     
     # Footer
     st.divider()
@@ -0,0 +1,94 @@
+# Fact table definitions, matching the CREATE TABLE statements in Phone_pay.ipynb.
+# "key" is the natural key each table is unique on (loads upsert on it).
+TABLES = {
+    "aggregated_transaction": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT",
+            "transaction_type": "VARCHAR(100)", "count": "BIGINT", "amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "transaction_type"],
+        "constraint": "unique_transaction",
+    },
+    "aggregated_insurance": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT",
+            "type": "VARCHAR(100)", "count": "BIGINT", "amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "type"],
+        "constraint": "unique_insurance",
+    },
+    "aggregated_user": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "brand": "VARCHAR(100)",
+            "device_count": "BIGINT", "device_percentage": "FLOAT",
+            "registered_users": "BIGINT", "app_opens": "BIGINT",
+        },
+        "key": ["state", "year", "quarter", "brand"],
+        "constraint": "unique_user",
+    },
+    "map_user": {
+        "columns": {
+            "state": "VARCHAR(100)", "district": "VARCHAR(100)", "year": "INT", "quarter": "INT",
+            "registered_users": "BIGINT", "app_opens": "BIGINT",
+        },
+        "key": ["state", "district", "year", "quarter"],
+        "constraint": "unique_map_user",
+    },
+    "map_transaction": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "district": "VARCHAR(100)",
+            "transaction_count": "BIGINT", "transaction_amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "district"],
+        "constraint": "unique_map_transaction",
+    },
+    "map_insurance": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "district": "VARCHAR(100)",
+            "policy_count": "BIGINT", "insured_amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "district"],
+        "constraint": "unique_map_insurance",
+    },
+    "top_user": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "district": "VARCHAR(100)",
+            "registered_users": "BIGINT",
+        },
+        "key": ["state", "year", "quarter", "district"],
+        "constraint": "unique_top_user",
+    },
+    "top_insurance": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "district": "VARCHAR(100)",
+            "policy_count": "BIGINT", "insured_amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "district"],
+        "constraint": "unique_top_insurance",
+    },
+    "top_transaction": {
+        "columns": {
+            "state": "VARCHAR(100)", "year": "INT", "quarter": "INT", "district": "VARCHAR(100)",
+            "transaction_count": "BIGINT", "transaction_amount": "DOUBLE",
+        },
+        "key": ["state", "year", "quarter", "district"],
+        "constraint": "unique_top_transaction",
+    },
+}
+
+def create_table_sql(table):
+    """CREATE TABLE statement for one fact table"""
+    spec = TABLES[table]
+    columns = [f"{col} {col_type}" for col, col_type in spec["columns"].items()]
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            {', '.join(columns)},
+            CONSTRAINT {spec["constraint"]} UNIQUE ({', '.join(spec["key"])})
+        )
+    """
+
+def measure_columns(table):
+    """Columns outside the natural key"""
+    spec = TABLES[table]
+    return [col for col in spec["columns"] if col not in spec["key"]]
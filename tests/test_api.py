@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import pandas as pd
+
+from api import AnalyticsService, slug
+from metrics import Metrics
+from query_cache import QueryCache
+
+class FakeBackend:
+    def __init__(self):
+        self.reads = 0
+
+    def read_frame(self, query, params=None):
+        self.reads += 1
+        return pd.DataFrame({"state": ["Goa"], "total": [1]})
+
+    def data_version(self):
+        return 1
+
+    def stats(self):
+        return None
+
+def _service(backend):
+    cache = QueryCache(max_bytes=1 << 20, ttl=60, version_check_interval=60)
+    return AnalyticsService(backend, cache, Metrics(), max_workers=1)
+
+def test_slug():
+    assert slug("Top 10 States by Transaction Volume") == "top-10-states-by-transaction-volume"
+
+def test_records_resubmits_when_a_shared_future_is_cancelled():
+    backend = FakeBackend()
+    service = _service(backend)
+    gate = threading.Event()
+    # Occupy the only worker so the API query stays queued and can be cancelled
+    service.scheduler.submit("block", gate.wait)
+
+    async def run():
+        task = asyncio.ensure_future(service.records("SELECT state, total FROM t"))
+        await asyncio.sleep(0.05)
+        assert service.scheduler.cancel("api") == 1
+        gate.set()
+        return await asyncio.wait_for(task, 5)
+
+    try:
+        assert asyncio.run(run()) == '[{"state":"Goa","total":1}]'
+        assert backend.reads == 1
+    finally:
+        gate.set()
+        service.scheduler.shutdown()
@@ -0,0 +1,22 @@
+import numpy as np
+
+from bench import REAL_ROW_COUNTS, compare, synthetic_table
+from tables import TABLES
+
+def _run(scale, **queries):
+    return {"scale": scale, "queries": queries}
+
+def test_compare_reports_p95_regressions_and_new_failures():
+    baseline = [_run(1, fast={"p95_ms": 10.0}, broken={"p95_ms": 5.0}, slow={"p95_ms": 10.0})]
+    runs = [_run(1, fast={"p95_ms": 12.0}, broken={"error": "boom"}, slow={"p95_ms": 30.0})]
+    assert compare(runs, baseline, tolerance=1.5) == [
+        "1x broken: now fails (boom)", "1x slow: p95 10.00 -> 30.00 ms"]
+
+def test_compare_ignores_scales_and_queries_without_a_baseline():
+    assert compare([_run(10, q={"p95_ms": 99.0})], [_run(1, q={"p95_ms": 1.0})], tolerance=1.5) == []
+
+def test_synthetic_table_schema_and_unique_natural_key():
+    df = synthetic_table("aggregated_user", 2, np.random.default_rng(0))
+    assert list(df.columns) == list(TABLES["aggregated_user"]["columns"])
+    assert len(df) == REAL_ROW_COUNTS["aggregated_user"] * 2
+    assert not df.duplicated(["state", "year", "quarter", "brand"]).any()
@@ -0,0 +1,81 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic_table
+from datastore import ANSWERS, STORE_TABLES, DataStore, _sum, build_topk, compact
+from queries import GEO_DEFAULT_QUARTER, GEO_DEFAULT_YEAR, GEO_QUERY_TEMPLATES, TRANSACTION_QUERIES
+from rollup import ROLLUPS, rollup_select_sql
+from topk import topk_view_sql
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(1)
+    return {table: synthetic_table(table, 1, rng) for table in STORE_TABLES}
+
+class FakeBackend:
+    def __init__(self, frames):
+        self.frames = frames
+        self.version = 1
+        self.reads = 0
+
+    def read_frame(self, query, params=None):
+        self.reads += 1
+        table = re.search(r"FROM (\w+)", query).group(1)
+        return self.frames[table].copy()
+
+    def data_version(self):
+        return self.version
+
+def test_compact_dictionary_encodes_and_narrows():
+    df = compact(pd.DataFrame({"state": ["Goa", "Goa"], "year": [2024, 2024], "quarter": [1, 2], "count": [1, 2]}))
+    assert str(df["state"].dtype) == "category"
+    assert df["year"].dtype == np.int16 and df["quarter"].dtype == np.int8
+    assert df["count"].dtype == np.int64
+
+def test_sum_groups_orders_and_returns_plain_keys():
+    df = compact(pd.DataFrame({"state": ["Goa", "Bihar", "Goa"], "count": [1, 5, 2]}))
+    result = _sum(df, ["state"], {"total": "count"}, "total", descending=True, limit=1)
+    assert result.to_dict("records") == [{"state": "Bihar", "total": 5}]
+    assert result["state"].dtype == object
+
+def test_answers_match_the_page_sql(frames):
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect()
+    for table, df in frames.items():
+        text = {col: str for col in df.columns if df[col].dtype == "category"}
+        conn.register(table, df.astype(text))
+    for name, spec in ROLLUPS.items():
+        conn.execute(f"CREATE VIEW {name} AS {rollup_select_sql(spec)}")
+    conn.execute(f"CREATE VIEW topk_index AS {topk_view_sql()}")
+    tables = {table: compact(df.copy()) for table, df in frames.items()}
+    tables["topk_index"] = build_topk(tables)
+
+    geo_queries = set(GEO_QUERY_TEMPLATES.values())
+    for query, answer in ANSWERS.items():
+        params = (GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER) if query in geo_queries else None
+        expected = conn.execute(query.replace("%s", "?"), list(params or [])).df()
+        result = answer(tables, params).reset_index(drop=True)
+        if "ORDER BY" not in query.upper():
+            expected = expected.sort_values(list(expected.columns)).reset_index(drop=True)
+            result = result.sort_values(list(result.columns)).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_exact=False, obj=query)
+
+def test_datastore_reloads_when_the_data_version_moves(frames):
+    backend = FakeBackend(frames)
+    store = DataStore(backend, version_check_interval=0)
+    query = TRANSACTION_QUERIES["Year-on-Year Growth"]
+    assert store.can_answer(query)
+    before = store.answer(query)
+    reads = backend.reads
+    store.answer(query)
+    assert backend.reads == reads
+
+    backend.frames = dict(frames, aggregated_transaction=frames["aggregated_transaction"].assign(count=0))
+    backend.version = 2
+    after = store.answer(query)
+    assert backend.reads == reads + len(STORE_TABLES)
+    assert before["total_transactions"].sum() > 0 and after["total_transactions"].sum() == 0
+    assert store.stats()["reloads"] == 1
@@ -0,0 +1,89 @@
+import pytest
+from mysql.connector.errors import InterfaceError, OperationalError
+
+from db_pool import ConnectionPool
+
+class FakeCursor:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, connection_id=1):
+        self.connection_id = connection_id
+        self.in_transaction = False
+        self.closed = False
+
+    def cursor(self, prepared=False):
+        return FakeCursor()
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+class FakePool(ConnectionPool):
+    """Pool handing out fake connections, recording each one it opens"""
+
+    def __init__(self, **kwargs):
+        super().__init__(size=2, timeout=0.1, ping_interval=30, **kwargs)
+        self.opened = []
+
+    def _connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        self._count("created")
+        return conn
+
+def test_prepared_reuses_cursor_per_statement():
+    pool = FakePool()
+    conn = FakeConnection()
+    first = pool.prepared(conn, "SELECT %s")
+    assert pool.prepared(conn, "SELECT %s") is first
+    assert pool.stats()["prepares"] == 1 and pool.stats()["prepared_hits"] == 1
+
+def test_prepared_evicts_least_recently_used_and_closes_it():
+    pool = FakePool(max_prepared=2)
+    conn = FakeConnection()
+    a = pool.prepared(conn, "a")
+    b = pool.prepared(conn, "b")
+    pool.prepared(conn, "a")  # b is now the least recently used
+    c = pool.prepared(conn, "c")
+    assert b[0].closed and not a[0].closed and not c[0].closed
+    assert pool.prepared(conn, "a") is a
+    assert pool.stats()["prepared_evictions"] == 1
+
+def test_prepared_starts_over_after_reconnect():
+    pool = FakePool()
+    conn = FakeConnection(connection_id=1)
+    first = pool.prepared(conn, "a")
+    conn.connection_id = 2
+    assert pool.prepared(conn, "a") is not first
+
+def test_run_retries_on_a_fresh_connection():
+    pool = FakePool()
+    calls = []
+
+    def fn(conn):
+        calls.append(conn)
+        if len(calls) == 1:
+            conn.closed = True
+            raise OperationalError("server has gone away")
+        return "ok"
+
+    assert pool.run(fn) == "ok"
+    assert calls[0] is not calls[1]
+    assert pool.stats()["discarded"] == 1 and pool.stats()["in_use"] == 0
+
+def test_run_gives_up_after_retries():
+    pool = FakePool()
+
+    def fn(conn):
+        raise InterfaceError("lost connection")
+
+    with pytest.raises(InterfaceError):
+        pool.run(fn, retries=1)
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from etl import build_chunk, columns_chunk, merge_chunks, parse_document, state_name
+
+def _transactions(*items):
+    return {"data": {"transactionData": list(items)}}
+
+def _item(name, count, amount):
+    return {"name": name, "paymentInstruments": [{"type": "TOTAL", "count": count, "amount": amount}]}
+
+def test_state_name():
+    assert state_name("andaman-&-nicobar-islands") == "Andaman & Nicobar Islands"
+
+def test_malformed_item_skips_only_itself():
+    content = _transactions(_item("Recharge", 5, 10.0), {"name": "Broken", "paymentInstruments": []},
+                            _item("Merchant", 7, 20.0))
+    errors = []
+    rows = parse_document("aggregated_transaction", content, errors)
+    assert rows == [("Recharge", 5, 10.0), ("Merchant", 7, 20.0)]
+    assert len(errors) == 1 and "IndexError" in errors[0]
+
+def test_malformed_hover_metric_skips_only_itself():
+    content = {"data": {"hoverDataList": [
+        {"name": "a district", "metric": []},
+        {"name": "b district", "metric": [{"count": 3, "amount": 4.5}]},
+    ]}}
+    assert parse_document("map_transaction", content) == [("b district", 3, 4.5)]
+
+def test_map_user_titles_district_names():
+    content = {"data": {"hoverData": {"north goa district": {"registeredUsers": 10, "appOpens": 20}}}}
+    assert parse_document("map_user", content) == [("North Goa District", 10, 20)]
+
+def test_build_chunk_reports_item_and_file_errors(tmp_path):
+    good = tmp_path / "1.json"
+    good.write_text(json.dumps(_transactions(_item("Recharge", 5, 10.0), {"name": "Broken"})))
+    bad = tmp_path / "2.json"
+    bad.write_text("{not json")
+    chunk, errors, failed = build_chunk("aggregated_transaction",
+                                        [("Goa", 2024, 1, str(good)), ("Goa", 2024, 2, str(bad))])
+    assert list(chunk["transaction_type"]) == ["Recharge"]
+    assert len(errors) == 2
+    assert failed == [str(bad)]
+
+def test_merge_chunks_orders_columns_and_widens_missing_ints():
+    first = columns_chunk("top_user", [("Goa", 2024, 1, [("Panaji", 10)])])
+    second = columns_chunk("top_user", [("Goa", 2024, 2, [("Margao", None)])])
+    df = merge_chunks("top_user", [first, second])
+    assert list(df.columns) == ["state", "year", "quarter", "district", "registered_users"]
+    assert df["registered_users"].dtype == np.float64 and np.isnan(df["registered_users"].iloc[1])
+    assert str(df["state"].dtype) == "category"
+
+def test_merge_chunks_of_nothing_has_the_table_columns():
+    assert list(merge_chunks("map_user", []).columns) == ["state", "district", "year", "quarter",
+                                                         "registered_users", "app_opens"]
@@ -0,0 +1,85 @@
+import pandas as pd
+
+import loader
+from loader import _upsert_sql, load_table, secondary_indexes
+
+CREATE_TABLE = """CREATE TABLE `map_user` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `state` varchar(100) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_map_user` (`state`,`district`,`year`,`quarter`),
+  KEY `idx_state_period` (`state`(20),`year` DESC,`quarter`) USING BTREE COMMENT 'pages',
+  KEY `idx_district` (`district`)
+) ENGINE=InnoDB"""
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        return ("map_user", CREATE_TABLE)
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+def _frame(rows):
+    return pd.DataFrame({
+        "state": ["Goa"] * rows, "district": [f"d{i}" for i in range(rows)], "year": 2024, "quarter": 1,
+        "registered_users": 1, "app_opens": 2,
+    })
+
+def _alters(conn):
+    return [sql for sql in conn.statements if sql.startswith("ALTER TABLE")]
+
+def test_secondary_indexes_keep_their_full_definitions():
+    indexes = secondary_indexes(FakeConnection(), "map_user")
+    assert indexes == {
+        "idx_state_period": "KEY `idx_state_period` (`state`(20),`year` DESC,`quarter`) USING BTREE COMMENT 'pages'",
+        "idx_district": "KEY `idx_district` (`district`)",
+    }
+
+def test_small_loads_keep_indexes_in_place():
+    conn = FakeConnection()
+    load_table(conn, "map_user", _frame(3), replace=[("Goa", 2024, 1)])
+    assert _alters(conn) == []
+    assert any(sql.startswith("DELETE FROM map_user") for sql in conn.statements)
+
+def test_bulk_loads_drop_and_restore_indexes(monkeypatch):
+    monkeypatch.setattr(loader, "DEFER_INDEXES_MIN_ROWS", 2)
+    conn = FakeConnection()
+    result = load_table(conn, "map_user", _frame(3))
+    drop, add = _alters(conn)
+    assert drop == "ALTER TABLE map_user DROP INDEX `idx_state_period`, DROP INDEX `idx_district`"
+    assert add.startswith("ALTER TABLE map_user ADD KEY `idx_state_period` (`state`(20),`year` DESC")
+    assert result["periods"] == [(2024, 1)]
+
+def test_explicit_flag_overrides_the_threshold():
+    conn = FakeConnection()
+    load_table(conn, "map_user", _frame(3), defer_indexes=True)
+    assert len(_alters(conn)) == 2
+    conn = FakeConnection()
+    load_table(conn, "map_user", _frame(3), defer_indexes=False)
+    assert _alters(conn) == []
+
+def test_upsert_updates_only_measures():
+    sql = _upsert_sql("map_user", ["state", "district", "year", "quarter", "registered_users", "app_opens"], 2)
+    assert sql.count("(%s, %s, %s, %s, %s, %s)") == 2
+    assert sql.endswith("ON DUPLICATE KEY UPDATE registered_users = VALUES(registered_users), "
+                        "app_opens = VALUES(app_opens)")
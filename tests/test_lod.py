@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from lod import lod_columns, reduce_points, zoom_frame
+
+PARAMS = {"x_col": "x", "y_col": "y", "size_col": "size", "color_col": "group"}
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": rng.random(n), "y": rng.random(n), "size": rng.random(n),
+        "group": rng.choice(["a", "b"], n), "label": [f"p{i}" for i in range(n)],
+    })
+
+def test_lod_columns():
+    assert lod_columns(PARAMS) == ("x", "y", "size", ["group"])
+
+def test_small_frames_are_untouched():
+    df = _points(50)
+    assert reduce_points(df, PARAMS, max_points=100) is df
+
+def test_reduce_points_fits_and_keeps_rows_whole():
+    df = _points(20000)
+    reduced = reduce_points(df, PARAMS, max_points=1000, bins=64)
+    assert 0 < len(reduced) <= 1000
+    assert list(reduced.columns) == list(df.columns)
+    assert reduced.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(reduced, df.loc[reduced.index])
+    assert set(reduced["group"]) == {"a", "b"}
+
+def test_reduce_points_keeps_the_largest_point_of_a_cell():
+    df = pd.DataFrame({"x": [0.0] * 3 + [1.0], "y": [0.0] * 3 + [1.0], "size": [1, 9, 5, 2], "group": "a"})
+    reduced = reduce_points(df, PARAMS, max_points=2, bins=2)
+    assert list(reduced["size"]) == [9, 2]
+
+def test_zoom_frame_selects_the_box():
+    df = pd.DataFrame({"x": [0.1, 0.5, 0.9], "y": [0.1, 0.5, 0.9]})
+    assert list(zoom_frame(df, PARAMS, {"x": [0.6, 0.2], "y": [0.0, 1.0]})["x"]) == [0.5]
@@ -0,0 +1,114 @@
+import json
+import os
+
+import manifest
+from etl import DATASETS
+from manifest import incremental_load, plan_changes, scan_pulse_tree
+
+def _write(root, state, year, quarter, content):
+    path = os.path.join(root, DATASETS["map_user"]["path"], state, str(year))
+    os.makedirs(path, exist_ok=True)
+    file_path = os.path.join(path, f"{quarter}.json")
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(content, f)
+    return file_path
+
+def _relative(path, root):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if sql.strip().startswith("INSERT INTO"):
+            self.conn.recorded.append(params[0])
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.recorded = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+def _manifest(files):
+    # What _record stores for every scanned file after a load
+    plan_changes(files, {}, full=True)
+    return {path: {key: entry[key] for key in ("dataset", "state", "year", "quarter", "size", "mtime_ns",
+                                                "content_hash")}
+            for path, entry in files.items()}
+
+def test_scan_uses_relative_paths_and_state_names(tmp_path):
+    root = str(tmp_path)
+    _write(root, "goa", 2024, 1, {"data": {}})
+    files = scan_pulse_tree(root, ["map_user"])
+    (path, entry), = files.items()
+    assert path == "map/user/hover/country/india/state/goa/2024/1.json"
+    assert (entry["dataset"], entry["state"], entry["year"], entry["quarter"]) == ("map_user", "Goa", 2024, 1)
+
+def test_plan_changes_new_changed_touched_and_removed(tmp_path):
+    root = str(tmp_path)
+    same = _write(root, "goa", 2024, 1, {"data": {"v": 1}})
+    edited = _write(root, "goa", 2024, 2, {"data": {"v": 2}})
+    touched = _write(root, "goa", 2024, 3, {"data": {"v": 3}})
+    gone = _write(root, "goa", 2024, 4, {"data": {"v": 4}})
+    manifest = _manifest(scan_pulse_tree(root, ["map_user"]))
+
+    _write(root, "goa", 2024, 2, {"data": {"v": 20}})
+    stat = os.stat(touched)
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    os.remove(gone)
+    new = _write(root, "bihar", 2024, 1, {"data": {}})
+
+    changed, touched_only, removed = plan_changes(scan_pulse_tree(root, ["map_user"]), manifest)
+    assert set(changed) == {_relative(edited, root), _relative(new, root)}
+    assert set(touched_only) == {_relative(touched, root)}
+    assert set(removed) == {_relative(gone, root)}
+    assert _relative(same, root) not in changed
+
+def test_full_plan_reloads_everything(tmp_path):
+    root = str(tmp_path)
+    _write(root, "goa", 2024, 1, {"data": {}})
+    files = scan_pulse_tree(root, ["map_user"])
+    manifest = _manifest(files)
+    changed, touched, removed = plan_changes(scan_pulse_tree(root, ["map_user"]), manifest, full=True)
+    assert set(changed) == set(manifest) and not touched and not removed
+
+def test_removed_only_counts_scanned_datasets(tmp_path):
+    manifest = {"other/1.json": {"dataset": "top_user", "size": 1, "mtime_ns": 1, "content_hash": "x"}}
+    _write(str(tmp_path), "goa", 2024, 1, {"data": {}})
+    _, _, removed = plan_changes(scan_pulse_tree(str(tmp_path), ["map_user"]), manifest)
+    assert not removed
+
+def test_corrupt_file_keeps_its_partition_and_stays_unrecorded(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    good = _write(root, "goa", 2024, 1, {"data": {"hoverData": {"north goa": {"registeredUsers": 1, "appOpens": 2}}}})
+    bad = _write(root, "goa", 2024, 2, {"data": {}})
+    manifest_rows = _manifest(scan_pulse_tree(root, ["map_user"]))
+    _write(root, "goa", 2024, 1, {"data": {"hoverData": {"north goa": {"registeredUsers": 3, "appOpens": 4}}}})
+    with open(bad, "w", encoding="utf-8") as f:
+        f.write("{truncated")
+
+    loads = []
+
+    def load_frames(conn, frames, method, replace=None, defer_indexes=None):
+        loads.append((frames, replace))
+        return []
+
+    monkeypatch.setattr(manifest, "create_manifest_table", lambda conn: None)
+    monkeypatch.setattr(manifest, "read_manifest", lambda conn: manifest_rows)
+    monkeypatch.setattr(manifest, "load_frames", load_frames)
+    conn = FakeConnection()
+    result = incremental_load(conn, root, ["map_user"])
+
+    (frames, replace), = loads
+    assert replace == {"map_user": [("Goa", 2024, 1)]}
+    assert list(frames["map_user"]["registered_users"]) == [3]
+    assert result["failed"] == [_relative(bad, root)]
+    assert conn.recorded == [_relative(good, root)]
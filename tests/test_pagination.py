@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from pagination import (
+    column_probe_sql, count_statement, filter_frame, numeric_columns, page_frame, page_statement, split_order_by
+)
+
+QUERY = "SELECT state, SUM(count) AS total FROM aggregated_transaction GROUP BY state ORDER BY total DESC"
+
+def _frame():
+    return pd.DataFrame({
+        "state": pd.Categorical(["Bihar", "Goa", "Kerala"]),
+        "brand": ["Xiaomi", "Apple", "Samsung"],
+        "total": [30, 10, 20],
+    })
+
+def test_numeric_columns_from_dtypes():
+    assert numeric_columns(_frame()) == ["total"]
+
+def test_numeric_columns_of_empty_probe():
+    probe = pd.DataFrame({"state": pd.Categorical([]), "total": pd.Series([], dtype="float64")})
+    assert numeric_columns(probe) == ["total"]
+
+@pytest.mark.parametrize("column", ["state", "brand"])
+@pytest.mark.parametrize("operator", [">=", "<="])
+def test_filter_frame_rejects_numeric_operator_on_text(column, operator):
+    with pytest.raises(ValueError, match="not a numeric column"):
+        filter_frame(_frame(), [(column, operator, "5")])
+
+def test_filter_frame_numeric_and_categorical():
+    df = _frame()
+    assert list(filter_frame(df, [("total", ">=", "20")])["state"]) == ["Bihar", "Kerala"]
+    assert list(filter_frame(df, [("state", "contains", "er")])["total"]) == [20]
+    assert list(filter_frame(df, [("state", "equals", "Goa")])["total"]) == [10]
+
+@pytest.mark.parametrize("statement", [count_statement, page_statement])
+def test_statements_reject_numeric_operator_on_text(statement):
+    with pytest.raises(ValueError, match="not a numeric column"):
+        statement(QUERY, None, ["state", "total"], filters=[("state", ">=", "5")], numeric=["total"])
+
+def test_split_order_by_takes_the_final_top_level_clause():
+    sql = "SELECT a FROM (SELECT a FROM t ORDER BY b) s ORDER BY rt.a DESC, b -- newest first\n;"
+    inner, order = split_order_by(sql)
+    assert inner == "SELECT a FROM (SELECT a FROM t ORDER BY b) s"
+    assert order == "a DESC, b"
+
+def test_split_order_by_ignores_quoted_text_and_keeps_limited_orders():
+    assert split_order_by("SELECT 'ORDER BY x' AS s FROM t") == ("SELECT 'ORDER BY x' AS s FROM t", None)
+    inner, order = split_order_by("SELECT a FROM t ORDER BY a DESC LIMIT 10")
+    assert inner == "SELECT a FROM t ORDER BY a DESC LIMIT 10" and order == "a DESC"
+
+def test_page_statement_sorts_filters_and_pages():
+    sql, params = page_statement(QUERY, [7], ["state", "total"], sort="state", filters=[("total", ">=", "5")],
+                                 page=2, page_size=10, numeric=["total"])
+    assert sql.endswith(" WHERE total >= %s ORDER BY state ASC, total DESC LIMIT %s OFFSET %s")
+    assert params == [7, 5.0, 10, 20]
+
+def test_page_statement_falls_back_to_the_first_column():
+    sql, _ = page_statement("SELECT state FROM t", None, ["state"])
+    assert "ORDER BY 1 LIMIT" in sql
+
+@pytest.mark.parametrize("kwargs", [{"sort": "missing"}, {"sort": "total; DROP TABLE t"},
+                                    {"filters": [("state", "like", "x")]}, {"filters": [("total", ">=", "ten")]}])
+def test_page_statement_rejects_bad_input(kwargs):
+    with pytest.raises(ValueError):
+        page_statement(QUERY, None, ["state", "total"], **kwargs)
+
+def test_count_statement_and_probe_drop_the_order():
+    sql, params = count_statement(QUERY, None, ["state", "total"], [("state", "contains", "go")])
+    assert "ORDER BY" not in sql and sql.endswith("WHERE LOWER(CAST(state AS CHAR)) LIKE LOWER(%s)")
+    assert params == ["%go%"]
+    assert "ORDER BY" not in column_probe_sql(QUERY) and column_probe_sql(QUERY).endswith("LIMIT 0")
+
+def test_page_frame_sorts_stably_and_slices():
+    df = pd.DataFrame({"state": ["a", "b", "c", "d"], "total": [2, 1, 2, 1]})
+    assert list(page_frame(df, "total", descending=True, page=0, page_size=3)["state"]) == ["a", "c", "b"]
+    assert list(page_frame(df, page=1, page_size=3)["state"]) == ["d"]
+    with pytest.raises(ValueError):
+        page_frame(df, "missing")
@@ -0,0 +1,27 @@
+from plan_audit import _subqueries, regressions
+
+def _plan(access=None, flags=(), rows=100):
+    return {"access": access or {"t": "ref"}, "flags": list(flags), "estimated_rows": rows}
+
+def test_unchanged_plans_pass():
+    assert regressions({"q": _plan()}, {"q": _plan()}) == []
+
+def test_new_flags_and_worse_access_are_reported():
+    problems = regressions({"q": _plan({"t": "ALL"}, ["full_scan", "filesort"])}, {"q": _plan(flags=["filesort"])})
+    assert problems == ["q: new full table scan", "q: t access ref -> ALL"]
+
+def test_better_access_and_unknown_queries_pass():
+    assert regressions({"q": _plan({"t": "const"}), "new": _plan({"t": "ALL"})}, {"q": _plan()}) == []
+
+def test_row_estimates_beyond_tolerance():
+    assert regressions({"q": _plan(rows=250)}, {"q": _plan(rows=100)}, tolerance=2.0) == [
+        "q: estimated rows 100 -> 250"]
+    assert regressions({"q": _plan(rows=150)}, {"q": _plan(rows=100)}, tolerance=2.0) == []
+
+def test_errors():
+    assert regressions({"q": {"error": "boom"}}, {"q": _plan()}) == ["q: EXPLAIN now fails (boom)"]
+    assert regressions({"q": _plan()}, {"q": {"error": "boom"}}) == []
+
+def test_subqueries_are_normalized():
+    sql = "SELECT * FROM t WHERE a IN (SELECT a FROM u) AND b IN (select  a\nFROM u)"
+    assert _subqueries(sql) == ["(select a from u)", "(select a from u)"]
@@ -0,0 +1,51 @@
+import pytest
+
+from indexes import INDEXES, PARTITIONED_TABLES
+from queries import (
+    GEO_ANALYSIS_TYPES, GEO_QUERY_TEMPLATES, TOP_N_ALL_TIME, TOP_N_MAX,
+    geo_query, registered_queries, top_n_metrics, top_n_query
+)
+from rollup import ROLLUPS
+from tables import TABLES
+
+def test_registered_query_names_are_unique():
+    names = [name for name, _, _ in registered_queries()]
+    assert len(names) == len(set(names))
+
+def test_geo_query_binds_the_period():
+    analysis_type = GEO_ANALYSIS_TYPES[0]
+    query, params = geo_query(analysis_type, "2024", 1)
+    assert query == GEO_QUERY_TEMPLATES[analysis_type] and params == (2024, 1)
+    with pytest.raises(ValueError):
+        geo_query("DROP TABLE", 2024, 1)
+
+def test_geo_templates_take_the_period_as_parameters():
+    for query in GEO_QUERY_TEMPLATES.values():
+        assert "year = %s AND quarter = %s" in query
+
+def test_top_n_query_params():
+    _, params = top_n_query("states", "transactions", 5)
+    assert params == ("states", "transactions") + TOP_N_ALL_TIME + (5,)
+    _, params = top_n_query("districts", "amount", 3, 2024, 2)
+    assert params == ("districts", "amount", 2024, 2, 3)
+
+@pytest.mark.parametrize("args", [
+    ("states", "unknown"), ("planets", "transactions"),
+    ("states", "transactions", 0), ("states", "transactions", TOP_N_MAX + 1),
+    ("states", "transactions", 10, 2024, None),
+])
+def test_top_n_query_rejects_bad_input(args):
+    with pytest.raises(ValueError):
+        top_n_query(*args)
+
+def test_every_ranking_has_a_known_rollup():
+    for level, metric, table, dimension, numerator, denominator in top_n_metrics():
+        assert dimension in ROLLUPS[table]["dimensions"]
+        assert numerator in ROLLUPS[table]["measures"]
+        assert denominator is None or denominator in ROLLUPS[table]["measures"]
+
+def test_indexes_cover_known_columns():
+    for table, indexes in INDEXES.items():
+        for name, columns in indexes.items():
+            assert set(columns) <= set(TABLES[table]["columns"]), name
+    assert set(PARTITIONED_TABLES) <= set(INDEXES)
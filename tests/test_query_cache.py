@@ -0,0 +1,80 @@
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from query_cache import QueryCache, normalize_sql
+
+def _cache(max_bytes=1 << 20, ttl=60, version_check_interval=60):
+    return QueryCache(max_bytes=max_bytes, ttl=ttl, version_check_interval=version_check_interval)
+
+def test_make_key_ignores_whitespace_and_keeps_namespaces_apart():
+    assert QueryCache.make_key("SELECT  1\n", [1]) == QueryCache.make_key("SELECT 1", (1,))
+    assert QueryCache.make_key("SELECT 1", None, "rows") != QueryCache.make_key("SELECT 1", None, "frame")
+    assert normalize_sql(" SELECT\n\t1 ") == "SELECT 1"
+
+def test_get_or_load_loads_once_and_returns_frame_copies():
+    cache = _cache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return pd.DataFrame({"a": [1, 2]})
+
+    first = cache.get_or_load("SELECT a", None, loader)
+    first["b"] = 0
+    second = cache.get_or_load("SELECT a", None, loader)
+    assert len(calls) == 1
+    assert list(second.columns) == ["a"]
+
+def test_lru_eviction_by_bytes():
+    # Room for two values, not three
+    cache = _cache(max_bytes=sys.getsizeof("x" * 100) * 5 // 2)
+    cache.put("a", "x" * 100)
+    cache.put("b", "x" * 100)
+    cache.get("a")  # b becomes the least recently used
+    cache.put("c", "x" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] >= 1
+
+def test_oversized_values_are_not_cached():
+    cache = _cache(max_bytes=10)
+    cache.put("a", "x" * 100)
+    assert cache.get("a") is None and cache.stats()["entries"] == 0
+
+def test_entries_expire_after_ttl():
+    cache = _cache(ttl=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_data_version_change_clears_the_cache():
+    cache = _cache(version_check_interval=0)
+    version = [1]
+    cache.get_or_load("SELECT 1", None, lambda: 1, version_fn=lambda: version[0])
+    version[0] = 2
+    assert cache.get_or_load("SELECT 1", None, lambda: 2, version_fn=lambda: version[0]) == 2
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["data_version"] == 2
+
+def test_concurrent_callers_run_one_version_probe():
+    cache = _cache(version_check_interval=60)
+    probes = []
+    start = threading.Barrier(8)
+
+    def version():
+        probes.append(1)
+        time.sleep(0.05)
+        return 1
+
+    def worker():
+        start.wait()
+        cache.get_or_load("SELECT 1", None, lambda: 1, version_fn=version)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(probes) == 1
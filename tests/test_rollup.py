@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+
+from rollup import ROLLUPS, create_rollup_tables, refresh_rollups
+
+duckdb = pytest.importorskip("duckdb")
+
+PERIOD = (2022, 4)
+
+# Two periods of each source table, with only the columns the rollups read
+SOURCES = {
+    "aggregated_transaction": pd.DataFrame({
+        "state": ["Goa", "Goa", "Bihar", "Bihar"] * 2, "year": [2022] * 4 + [2023] * 4,
+        "quarter": [4] * 4 + [1] * 4, "transaction_type": ["Recharge", "Merchant"] * 4,
+        "count": [1, 2, 3, 4, 5, 6, 7, 8], "amount": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5],
+    }),
+    "aggregated_user": pd.DataFrame({
+        "state": ["Goa", "Goa", "Bihar", "Bihar"] * 2, "year": [2022] * 4 + [2023] * 4,
+        "quarter": [4] * 4 + [1] * 4, "brand": ["Xiaomi", "Apple"] * 4,
+        "device_count": [10, 20, 30, 40, 50, 60, 70, 80], "registered_users": [100, 100, 200, 200] * 2,
+        "app_opens": [5, 5, 7, 7, 9, 9, 11, 11],
+    }),
+    "map_transaction": pd.DataFrame({
+        "state": ["Goa", "Goa", "Bihar", "Bihar"] * 2, "district": ["North Goa", "South Goa", "Patna", "Gaya"] * 2,
+        "year": [2022] * 4 + [2023] * 4, "quarter": [4] * 4 + [1] * 4,
+        "transaction_count": [1, 2, 3, 4, 5, 6, 7, 8], "transaction_amount": [2.0, 4.0, 6.0, 8.0] * 2,
+    }),
+    "map_user": pd.DataFrame({
+        "state": ["Goa", "Goa", "Bihar", "Bihar"] * 2, "district": ["North Goa", "South Goa", "Patna", "Gaya"] * 2,
+        "year": [2022] * 4 + [2023] * 4, "quarter": [4] * 4 + [1] * 4,
+        "registered_users": [10, 20, 30, 40] * 2, "app_opens": [1, 2, 3, 4, 5, 6, 7, 8],
+    }),
+}
+
+class DuckCursor:
+    """The part of a MySQL connector cursor the refresh functions use, over DuckDB"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+
+    def execute(self, sql, params=None):
+        self._cursor.execute(sql.replace("%s", "?"), list(params or []))
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+class DuckConnection:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return DuckCursor(self.conn)
+
+    def commit(self):
+        pass
+
+@pytest.fixture
+def db():
+    conn = duckdb.connect()
+    for table, df in SOURCES.items():
+        conn.register(f"{table}_frame", df)
+        conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {table}_frame")
+        conn.unregister(f"{table}_frame")
+    yield DuckConnection(conn)
+    conn.close()
+
+def _sorted(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def _expected(spec, source):
+    keys = list(spec["dimensions"]) + ["year", "quarter"]
+    return _sorted(source.groupby(keys)[list(spec["measures"])].sum().reset_index())
+
+def _rollup(db, name, spec):
+    columns = list(spec["dimensions"]) + ["year", "quarter"] + list(spec["measures"])
+    return _sorted(db.conn.execute(f"SELECT {', '.join(columns)} FROM {name}").df())
+
+def test_full_refresh_sums_every_rollup(db):
+    create_rollup_tables(db)
+    refresh_rollups(db)
+    for name, spec in ROLLUPS.items():
+        pd.testing.assert_frame_equal(_rollup(db, name, spec), _expected(spec, SOURCES[spec["source"]]),
+                                      check_dtype=False, obj=name)
+
+def test_refresh_one_period_of_one_source(db):
+    create_rollup_tables(db)
+    refresh_rollups(db)
+    db.conn.execute("UPDATE aggregated_transaction SET count = count * 3 WHERE year = ? AND quarter = ?", PERIOD)
+    db.conn.execute("UPDATE map_user SET app_opens = 0")
+    refresh_rollups(db, [PERIOD], sources={"aggregated_transaction"})
+
+    updated = SOURCES["aggregated_transaction"].copy()
+    in_period = (updated["year"] == PERIOD[0]) & (updated["quarter"] == PERIOD[1])
+    updated.loc[in_period, "count"] *= 3
+    for name, spec in ROLLUPS.items():
+        # Rollups of other sources keep their rows until those sources are refreshed
+        source = updated if spec["source"] == "aggregated_transaction" else SOURCES[spec["source"]]
+        pd.testing.assert_frame_equal(_rollup(db, name, spec), _expected(spec, source), check_dtype=False, obj=name)
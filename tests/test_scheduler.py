@@ -0,0 +1,49 @@
+import threading
+
+from scheduler import QueryScheduler
+
+def test_identical_keys_share_one_future():
+    scheduler = QueryScheduler(max_workers=1)
+    gate = threading.Event()
+    try:
+        scheduler.submit("block", gate.wait)
+        first = scheduler.submit("q", lambda: 1, group="a")
+        assert scheduler.submit("q", lambda: 2, group="b") is first
+        gate.set()
+        assert first.result(5) == 1
+        assert scheduler.stats()["shared"] == 1
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+def test_cancel_only_touches_the_group_and_spares_kept_keys():
+    scheduler = QueryScheduler(max_workers=1)
+    gate = threading.Event()
+    try:
+        scheduler.submit("block", gate.wait)
+        mine = scheduler.submit("mine", lambda: 1, group="a")
+        kept = scheduler.submit("kept", lambda: 2, group="a")
+        theirs = scheduler.submit("theirs", lambda: 3, group="b")
+        assert scheduler.cancel("a", keep=["kept"]) == 1
+        gate.set()
+        assert mine.cancelled() and kept.result(5) == 2 and theirs.result(5) == 3
+        # A cancelled key is submitted afresh rather than shared
+        assert scheduler.submit("mine", lambda: 4).result(5) == 4
+    finally:
+        gate.set()
+        scheduler.shutdown()
+
+def test_cancel_spares_keys_another_group_still_needs():
+    scheduler = QueryScheduler(max_workers=1)
+    gate = threading.Event()
+    try:
+        scheduler.submit("block", gate.wait)
+        shared = scheduler.submit("shared", lambda: 1, group="a")
+        assert scheduler.submit("shared", lambda: 2, group="b") is shared
+        assert scheduler.cancel("a") == 0
+        assert not shared.cancelled()
+        assert scheduler.cancel("b") == 1
+        assert shared.cancelled()
+    finally:
+        gate.set()
+        scheduler.shutdown()
@@ -0,0 +1,60 @@
+import json
+import os
+
+import snapshot
+from etl import DATASETS, extract_all
+from snapshot import _decode_batch, extract_snapshot, load_index, pack
+
+def _write(root, dataset, state, year, quarter, content):
+    path = os.path.join(root, DATASETS[dataset]["path"], state, str(year))
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, f"{quarter}.json"), "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content, indent=2))
+
+def _transactions(count):
+    return {"data": {"transactionData": [
+        {"name": "Recharge", "paymentInstruments": [{"type": "TOTAL", "count": count, "amount": count * 1.5}]},
+    ]}}
+
+def _pulse_tree(root):
+    _write(root, "aggregated_transaction", "goa", 2024, 1, _transactions(1))
+    _write(root, "aggregated_transaction", "goa", 2024, 2, _transactions(2))
+    _write(root, "aggregated_transaction", "andaman-&-nicobar-islands", 2023, 4, _transactions(3))
+
+def test_decode_batch_reads_a_run_of_lines_with_one_parse():
+    data = b'{"a":1}\n{"a":2}\n'
+    batch = [["Goa", 2024, 1, 0, 7], ["Goa", 2024, 2, 8, 7]]
+    assert _decode_batch(data, batch) == [{"a": 1}, {"a": 2}]
+
+def test_decode_batch_falls_back_per_line_on_a_bad_document():
+    data = b'{"a":1}\n{"a":\n{"a":3}\n'
+    batch = [["Goa", 2024, 1, 0, 7], ["Goa", 2024, 2, 8, 5], ["Goa", 2024, 3, 14, 7]]
+    assert _decode_batch(data, batch) == [{"a": 1}, None, {"a": 3}]
+
+def test_decode_batch_without_orjson(monkeypatch):
+    monkeypatch.setattr(snapshot, "orjson", None)
+    assert _decode_batch(b'{"a":1}\n', [["Goa", 2024, 1, 0, 7]]) == [{"a": 1}]
+
+def test_pack_and_extract_match_the_json_tree(tmp_path):
+    pulse_root, snapshot_dir = str(tmp_path / "pulse"), str(tmp_path / "snapshot")
+    _pulse_tree(pulse_root)
+    index = pack(pulse_root, snapshot_dir, ["aggregated_transaction"], max_workers=1)
+    entries = index["datasets"]["aggregated_transaction"]["entries"]
+    assert {tuple(entry[:3]) for entry in entries} == {
+        ("Goa", 2024, 1), ("Goa", 2024, 2), ("Andaman & Nicobar Islands", 2023, 4)}
+    assert load_index(snapshot_dir) == index
+
+    packed = extract_snapshot(snapshot_dir, ["aggregated_transaction"], max_workers=1, batch_size=2)
+    tree = extract_all(pulse_root, ["aggregated_transaction"], max_workers=1)
+    key = ["state", "year", "quarter"]
+    left = packed["aggregated_transaction"].sort_values(key).reset_index(drop=True)
+    right = tree["aggregated_transaction"].sort_values(key).reset_index(drop=True)
+    assert left.astype(str).equals(right.astype(str))
+
+def test_pack_skips_unreadable_files(tmp_path, capsys):
+    pulse_root, snapshot_dir = str(tmp_path / "pulse"), str(tmp_path / "snapshot")
+    _pulse_tree(pulse_root)
+    _write(pulse_root, "aggregated_transaction", "goa", 2024, 3, "{truncated")
+    index = pack(pulse_root, snapshot_dir, ["aggregated_transaction"], max_workers=1)
+    assert len(index["datasets"]["aggregated_transaction"]["entries"]) == 3
+    assert "3.json" in capsys.readouterr().out
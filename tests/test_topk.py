@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic_table
+from datastore import STORE_TABLES, build_topk, compact
+from queries import TOP_N_ALL_TIME
+from rollup import ROLLUPS, rollup_select_sql
+from topk import TOPK_TABLE, ensure_topk, refresh_topk, topk_select_sql, topk_view_sql
+
+duckdb = pytest.importorskip("duckdb")
+
+PERIOD = (2022, 4)
+
+class DuckCursor:
+    """The part of a MySQL connector cursor the refresh functions use, over DuckDB"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+
+    def execute(self, sql, params=None):
+        self._cursor.execute(sql.replace("%s", "?"), list(params or []))
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+class DuckConnection:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def cursor(self):
+        return DuckCursor(self.conn)
+
+    def commit(self):
+        pass
+
+@pytest.fixture(scope="module")
+def frames():
+    rng = np.random.default_rng(0)
+    return {table: synthetic_table(table, 1, rng) for table in STORE_TABLES}
+
+@pytest.fixture
+def db(frames):
+    conn = duckdb.connect()
+    for table, df in frames.items():
+        # Plain text columns, as in the MySQL tables, rather than DuckDB enums
+        text = {col: str for col in df.columns if df[col].dtype == "category"}
+        conn.register(f"{table}_frame", df.astype(text))
+        conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {table}_frame")
+        conn.unregister(f"{table}_frame")
+    yield DuckConnection(conn)
+    conn.close()
+
+def _sorted(conn, sql):
+    df = conn.execute(sql).df()
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def test_topk_ranks_ties_by_name_and_zero_denominators_last():
+    conn = duckdb.connect()
+    conn.execute("""
+        CREATE TABLE rollup_user_state AS SELECT * FROM (VALUES
+            ('Goa', 2024, 1, 10, 0), ('Bihar', 2024, 1, 4, 2), ('Assam', 2024, 1, 8, 4), ('Kerala', 2024, 1, 1, 2)
+        ) t(state, year, quarter, app_opens, registered_users)
+    """)
+    ranked = conn.execute(topk_select_sql("states", "engagement", "rollup_user_state", "state",
+                                          "app_opens", "registered_users") + " ORDER BY rank_no").fetchall()
+    assert [(row[4], row[5], row[6]) for row in ranked] == [
+        (1, "Assam", 2.0), (2, "Bihar", 2.0), (3, "Kerala", 0.5), (4, "Goa", None)]
+
+def _create_rollup_views(conn):
+    for name, spec in ROLLUPS.items():
+        conn.execute(f"CREATE VIEW {name} AS {rollup_select_sql(spec)}")
+
+def test_topk_view_matches_in_memory_rankings(db, frames):
+    _create_rollup_views(db.conn)
+    view = db.conn.execute(topk_view_sql()).df()
+    tables = {table: compact(df.copy()) for table, df in frames.items()}
+    index = build_topk(tables)
+    assert len(index) == len(view.groupby(["level", "metric", "year", "quarter"]))
+    for (level, metric, year, quarter), rows in view.groupby(["level", "metric", "year", "quarter"]):
+        rows = rows.sort_values("rank_no")
+        expected = index[(level, metric, year, quarter)]
+        assert list(rows["name"]) == list(expected["name"])
+        np.testing.assert_allclose(rows["value"].astype(float), expected["value"].astype(float))
+
+def test_refresh_topk_one_period_matches_a_full_rebuild(db):
+    _create_rollup_views(db.conn)
+    ensure_topk(db)
+    db.conn.execute("UPDATE map_user SET app_opens = app_opens * 5 WHERE state = 'State 0001' "
+                    "AND year = ? AND quarter = ?", PERIOD)
+    refresh_topk(db, [PERIOD], sources={"map_user"})
+    pd.testing.assert_frame_equal(_sorted(db.conn, f"SELECT * FROM {TOPK_TABLE}"),
+                                  _sorted(db.conn, topk_view_sql()), check_dtype=False)
+    all_time = db.conn.execute(f"SELECT COUNT(*) FROM {TOPK_TABLE} WHERE year = ? AND quarter = ?",
+                               TOP_N_ALL_TIME).fetchone()[0]
+    assert all_time > 0
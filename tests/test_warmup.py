@@ -0,0 +1,39 @@
+import time
+
+from warmup import Warmup, warmup_queries
+
+def _wait(warmup, timeout=5):
+    deadline = time.monotonic() + timeout
+    while warmup.progress()["running"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return warmup.progress()
+
+def _fail(error):
+    def loader():
+        raise error
+    return loader
+
+def test_failing_loaders_are_counted_and_warmup_finishes():
+    tasks = [("ok", lambda: None), ("key", _fail(KeyError("state"))), ("value", _fail(ValueError("bad")))]
+    progress = _wait(Warmup(tasks, workers=1).start())
+    assert not progress["running"]
+    assert (progress["done"], progress["total"], progress["failed"]) == (3, 3, 2)
+    assert [name for name, _ in progress["errors"]] == ["key", "value"]
+
+def test_no_tasks_finishes_immediately():
+    progress = Warmup([], workers=2).start().progress()
+    assert not progress["running"] and progress["total"] == 0
+
+def test_warmup_queries_are_unique_and_start_with_registered_queries():
+    queries = list(warmup_queries())
+    keys = [(sql, tuple(params or ())) for _, sql, params, _ in queries]
+    assert len(keys) == len(set(keys))
+    assert queries[0][3] == "rows"
+
+def test_throttle_holds_tasks_until_released():
+    busy = [True]
+    warmup = Warmup([("a", lambda: None)], workers=1, throttle=lambda: busy[0]).start()
+    time.sleep(0.3)
+    assert warmup.progress()["done"] == 0
+    busy[0] = False
+    assert _wait(warmup)["done"] == 1
@@ -0,0 +1,134 @@
+import argparse
+
+import mysql.connector
+from mysql.connector import Error
+
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASS
+from query_cache import bump_data_version
+from rollup import ROLLUPS
+from queries import TOP_N_MAX, TOP_N_ALL_TIME, top_n_metrics
+
+TOPK_TABLE = "topk_index"
+TOPK_COLUMNS = ["level", "metric", "year", "quarter", "rank_no", "name", "value", "numerator", "denominator"]
+
+def create_topk_table(conn):
+    """Create the top-K index table if it doesn't exist"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TOPK_TABLE} (
+            level VARCHAR(20),
+            metric VARCHAR(40),
+            year INT,
+            quarter INT,
+            rank_no INT,
+            name VARCHAR(100),
+            value DOUBLE,
+            numerator DOUBLE,
+            denominator DOUBLE,
+            PRIMARY KEY (level, metric, year, quarter, rank_no)
+        )
+    """)
+    cursor.close()
+
+def topk_select_sql(level, metric, table, dimension, numerator, denominator=None, per_period=True, where=""):
+    """SELECT producing the top TOP_N_MAX rows of one ranking, per period or all-time, from its rollup"""
+    # NULLIF makes a zero denominator NULL on every backend (DuckDB would give infinity)
+    value = f"SUM({numerator}) / NULLIF(SUM({denominator}), 0)" if denominator else f"SUM({numerator})"
+    denominator_sum = f"SUM({denominator})" if denominator else "NULL"
+    if per_period:
+        period, partition, group = "year, quarter", "PARTITION BY year, quarter", f"year, quarter, {dimension}"
+    else:
+        year, quarter = TOP_N_ALL_TIME
+        period, partition, group = f"{year} AS year, {quarter} AS quarter", "", dimension
+    # Ratios with a zero denominator rank last; the name breaks ties
+    return f"""
+        SELECT '{level}' AS level, '{metric}' AS metric, year, quarter, rank_no, name, value, numerator, denominator
+        FROM (
+            SELECT {period}, {dimension} AS name, {value} AS value,
+                SUM({numerator}) AS numerator, {denominator_sum} AS denominator,
+                ROW_NUMBER() OVER ({partition} ORDER BY {value} IS NULL, {value} DESC, {dimension}) AS rank_no
+            FROM {table}
+            {where}
+            GROUP BY {group}
+        ) ranked
+        WHERE rank_no <= {TOP_N_MAX}
+    """
+
+def topk_view_sql(available_tables=None):
+    """One statement with every ranking, for backends that keep topk_index as a view"""
+    selects = [
+        topk_select_sql(level, metric, table, dimension, numerator, denominator, per_period)
+        for level, metric, table, dimension, numerator, denominator in top_n_metrics()
+        if available_tables is None or table in available_tables
+        for per_period in (True, False)
+    ]
+    return " UNION ALL ".join(selects)
+
+def refresh_topk(conn, periods=None, sources=None):
+    """Re-rank the given (year, quarter) periods, or every period when periods is None.
+
+    All-time rankings are re-ranked from the rollups either way, since any new
+    period shifts them. Pass the loaded tables as sources to limit the refresh
+    to rankings built from them.
+    """
+    insert = f"INSERT INTO {TOPK_TABLE} ({', '.join(TOPK_COLUMNS)})"
+    cursor = conn.cursor()
+    for level, metric, table, dimension, numerator, denominator in top_n_metrics():
+        if sources is not None and ROLLUPS[table]["source"] not in sources:
+            continue
+        ranking = (level, metric)
+        spec = (level, metric, table, dimension, numerator, denominator)
+        if periods is None:
+            cursor.execute(f"DELETE FROM {TOPK_TABLE} WHERE level = %s AND metric = %s", ranking)
+            cursor.execute(f"{insert} {topk_select_sql(*spec)}")
+        else:
+            period_sql = topk_select_sql(*spec, where="WHERE year = %s AND quarter = %s")
+            for period in list(periods) + [TOP_N_ALL_TIME]:
+                cursor.execute(
+                    f"DELETE FROM {TOPK_TABLE} WHERE level = %s AND metric = %s AND year = %s AND quarter = %s",
+                    ranking + tuple(period)
+                )
+                if tuple(period) != TOP_N_ALL_TIME:
+                    cursor.execute(f"{insert} {period_sql}", tuple(period))
+        cursor.execute(f"{insert} {topk_select_sql(*spec, per_period=False)}")
+    conn.commit()
+    cursor.close()
+
+def ensure_topk(conn):
+    """Create the top-K index and build it if it is still empty"""
+    create_topk_table(conn)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT 1 FROM {TOPK_TABLE} LIMIT 1")
+    empty = not cursor.fetchall()
+    cursor.close()
+    if empty:
+        refresh_topk(conn)
+
+def main():
+    """Re-rank the top-K index, e.g. `python topk.py --year 2024 --quarter 4` after loading that quarter"""
+    parser = argparse.ArgumentParser(description="Refresh the precomputed top-N rankings")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--quarter", type=int)
+    args = parser.parse_args()
+
+    if (args.year is None) != (args.quarter is None):
+        parser.error("--year and --quarter must be given together")
+    periods = [(args.year, args.quarter)] if args.year is not None else None
+
+    try:
+        connection = mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASS,
+            database=DB_NAME
+        )
+        create_topk_table(connection)
+        refresh_topk(connection, periods)
+        bump_data_version(connection)
+        connection.close()
+        print("Top-K index refreshed" + (f" for {args.year} Q{args.quarter}." if periods else "."))
+    except Error as e:
+        print(f"Error refreshing the top-K index: {e}")
+
+if __name__ == "__main__":
+    main()
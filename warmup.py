@@ -0,0 +1,112 @@
+import threading
+import time
+
+from config import TABLE_PAGE_SIZE, WARMUP_WORKERS, WARMUP_BACKOFF
+from pagination import column_probe_sql, count_statement, page_statement
+from queries import (
+    KEY_METRICS_QUERY, TRANSACTION_QUERIES, USER_QUERIES,
+    GEO_YEARS, GEO_QUARTERS, GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER, GEO_ANALYSIS_TYPES,
+    geo_query, registered_queries, CASE_STUDIES
+)
+
+def _table_statements(name, query):
+    # What paged_table runs for a result table's first, unsorted and unfiltered page
+    yield f"{name} (columns)", column_probe_sql(query), None
+    yield (f"{name} (count)",) + count_statement(query, None, [])
+    yield (f"{name} (page 1)",) + page_statement(query, None, [], page=0, page_size=TABLE_PAGE_SIZE)
+
+def warmup_queries(years=GEO_YEARS, quarters=GEO_QUARTERS):
+    """(name, sql, params, namespace) for what the pages run on first view, most visited first.
+
+    Every registered query at the default period comes first, then the first
+    page of each result table, then the rest of the geo filter space, newest
+    period first. Params are in the form the pages pass them, so keys match.
+    """
+    for name, query, params in registered_queries(GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER):
+        yield name, query, params, "rows" if query == KEY_METRICS_QUERY else "frame"
+    tables = [(f"Transaction Analysis / {name}", query) for name, query in TRANSACTION_QUERIES.items()]
+    tables += [(f"User Analysis / {name}", query) for name, query in USER_QUERIES.items()]
+    tables += [
+        (f"{case_name} / {query_name}", query_info["query"])
+        for case_name, case in CASE_STUDIES.items()
+        for query_name, query_info in case["queries"].items()
+    ]
+    for name, query in tables:
+        for statement_name, sql, params in _table_statements(name, query):
+            yield statement_name, sql, params, "frame"
+    for year in sorted(years, reverse=True):
+        for quarter in sorted(quarters, reverse=True):
+            if (year, quarter) == (GEO_DEFAULT_YEAR, GEO_DEFAULT_QUARTER):
+                continue
+            for analysis_type in GEO_ANALYSIS_TYPES:
+                query, params = geo_query(analysis_type, year, quarter)
+                yield f"Geographical Analysis / {analysis_type} {year} Q{quarter}", query, params, "frame"
+
+class Warmup:
+    """Runs cache-filling loaders on background threads, in the order given, and tracks progress.
+
+    tasks are (name, loader) pairs; a loader that fails is counted and skipped.
+    While throttle() returns true, workers wait before starting their next task,
+    so warm-up runs at a lower priority than interactive queries.
+    """
+
+    def __init__(self, tasks, workers=WARMUP_WORKERS, throttle=None):
+        self._tasks = list(tasks)
+        self._workers = workers
+        self._throttle = throttle
+        self._lock = threading.Lock()
+        self._next = 0
+        self._done = 0
+        self._errors = []
+        self._current = set()
+        self._started_at = None
+        self._finished_at = None
+
+    def start(self):
+        self._started_at = time.monotonic()
+        if not self._tasks:
+            self._finished_at = self._started_at
+        for i in range(self._workers):
+            threading.Thread(target=self._run, name=f"warmup-{i}", daemon=True).start()
+        return self
+
+    def _run(self):
+        finished = False
+        while True:
+            while self._throttle is not None and self._throttle():
+                time.sleep(WARMUP_BACKOFF)
+            with self._lock:
+                if self._next >= len(self._tasks):
+                    break
+                name, loader = self._tasks[self._next]
+                self._next += 1
+                self._current.add(name)
+            try:
+                loader()
+            except Exception as e:
+                # Any failure, not only a backend error, must not end the worker before the count completes
+                with self._lock:
+                    self._errors.append((name, f"{type(e).__name__}: {e}"))
+            finally:
+                with self._lock:
+                    self._current.discard(name)
+                    self._done += 1
+                    finished = self._done == len(self._tasks)
+                    if finished:
+                        self._finished_at = time.monotonic()
+        if finished:
+            print(f"Cache warm-up finished: {self._done} queries in {self._finished_at - self._started_at:.1f}s, "
+                  f"{len(self._errors)} failed")
+
+    def progress(self):
+        with self._lock:
+            end = self._finished_at or time.monotonic()
+            return {
+                "total": len(self._tasks),
+                "done": self._done,
+                "failed": len(self._errors),
+                "errors": list(self._errors),
+                "current": sorted(self._current),
+                "running": self._started_at is not None and self._finished_at is None,
+                "seconds": end - self._started_at if self._started_at is not None else 0.0,
+            }